@@ -1,7 +1,19 @@
 # agents/__init__.py
-from Docs2KG.agents.cloud import CloudAgent
-from Docs2KG.agents.hf import HuggingFaceAgent
-from Docs2KG.agents.manager import AgentManager
-from Docs2KG.agents.quantization import QuantizationAgent
+# The agents are imported on first access, so importing the package does not
+# load the backends (openai, huggingface_hub, llama_cpp) that are not used.
+from Docs2KG.utils.lazy_import import import_object
+
+_LAZY_EXPORTS = {
+    "AgentManager": "Docs2KG.agents.manager:AgentManager",
+    "CloudAgent": "Docs2KG.agents.cloud:CloudAgent",
+    "QuantizationAgent": "Docs2KG.agents.quantization:QuantizationAgent",
+    "HuggingFaceAgent": "Docs2KG.agents.hf:HuggingFaceAgent",
+}
 
 __all__ = ["AgentManager", "CloudAgent", "QuantizationAgent", "HuggingFaceAgent"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return import_object(_LAZY_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Set
 
 
 class BaseAgent(ABC):
     def __init__(self, name: str):
         self.name = name
+        # prefixes cached by this agent, see AgentManager.cache_prefix
+        self.cached_prefixes: Set[str] = set()
 
     @abstractmethod
     def process(self, input_data: Any) -> Any:
         pass
+
+    def cache_prefix(self, prefix: str) -> bool:
+        """
+        Prepare the backend to reuse the computation for a shared prompt prefix.
+
+        Args:
+            prefix: Static prefix that subsequent prompts start with
+
+        Returns:
+            bool: True if the backend cached the prefix, False if unsupported
+        """
+        return False
@@ -0,0 +1,104 @@
+import json
+from itertools import count
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+
+def empty_entities_responder(body: Dict[str, Any]) -> str:
+    """Default responder, answers every request with an empty JSON list"""
+    return "[]"
+
+
+class LocalBatchClient:
+    """
+    In-process stand-in for the OpenAI Files and Batches endpoints.
+
+    Batches are executed synchronously on `batches.create` by calling the
+    responder with each request body, so the submit/poll/download flow of
+    `CloudAgent` can run offline without an API key.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+    ):
+        """
+        Initialize the stub client.
+
+        Args:
+            responder: Callable receiving a chat completion request body and
+                returning the message content to answer it with
+        """
+        self.responder = responder or empty_entities_responder
+        self._ids = count(1)
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(
+            create=self._create_batch, retrieve=self._retrieve_batch
+        )
+
+    def _create_file(self, file: Any, purpose: str) -> SimpleNamespace:
+        file_id = f"file-local-{next(self._ids)}"
+        data = file.read()
+        self._files[file_id] = data.decode("utf-8") if isinstance(data, bytes) else data
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _content(self, file_id: str) -> SimpleNamespace:
+        return SimpleNamespace(text=self._files[file_id])
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            content = self.responder(request["body"])
+        except Exception as e:
+            logger.error(f"Local batch responder failed: {str(e)}")
+            return {
+                "custom_id": request["custom_id"],
+                "response": None,
+                "error": {"message": str(e)},
+            }
+        return {
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"role": "assistant", "content": content}}],
+                    "usage": None,
+                },
+            },
+            "error": None,
+        }
+
+    def _create_batch(
+        self, input_file_id: str, endpoint: str, completion_window: str
+    ) -> SimpleNamespace:
+        requests = [
+            json.loads(line)
+            for line in self._files[input_file_id].splitlines()
+            if line.strip()
+        ]
+        output = [self._answer(request) for request in requests]
+        output_file_id = f"file-local-{next(self._ids)}"
+        self._files[output_file_id] = "\n".join(json.dumps(line) for line in output)
+
+        batch = SimpleNamespace(
+            id=f"batch-local-{next(self._ids)}",
+            status="completed",
+            endpoint=endpoint,
+            completion_window=completion_window,
+            input_file_id=input_file_id,
+            output_file_id=output_file_id,
+            error_file_id=None,
+            request_counts=SimpleNamespace(
+                total=len(output),
+                completed=sum(1 for line in output if line["error"] is None),
+                failed=sum(1 for line in output if line["error"] is not None),
+            ),
+        )
+        self._batches[batch.id] = batch
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        return self._batches[batch_id]
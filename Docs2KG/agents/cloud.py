@@ -1,22 +1,38 @@
-from typing import Any
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from loguru import logger
 from openai import OpenAI
 
 from Docs2KG.agents.base import BaseAgent
+from Docs2KG.agents.exceptions import AgentError
 from Docs2KG.utils.config import PROJECT_CONFIG
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FAILED_STATUSES = {"failed", "expired", "cancelling", "cancelled"}
+
 
 class CloudAgent(BaseAgent):
-    def __init__(self, name: str):
+    def __init__(
+        self,
+        name: str,
+        client: Optional[Any] = None,
+        api_base: Optional[str] = None,
+    ):
         """
         Initialize CloudAgent with model name and optional API key.
 
         Args:
             name: Name of the model to use (e.g., 'gpt-4')
+            client: Optional pre-built client exposing the OpenAI chat, files and
+                batches interfaces (e.g. `LocalBatchClient` for offline runs)
+            api_base: OpenAI compatible endpoint to use instead of the configured one
         """
         super().__init__(name)
-        self.client = self._init_openai_client()
+        self.api_base = api_base or PROJECT_CONFIG.openai.api_base
+        self.client = client or self._init_openai_client()
 
     def _init_openai_client(self) -> OpenAI:
         """
@@ -29,7 +45,7 @@ class CloudAgent(BaseAgent):
             # Initialize client with config
             client = OpenAI(
                 api_key=PROJECT_CONFIG.openai.api_key.get_secret_value(),
-                base_url=PROJECT_CONFIG.openai.api_base,
+                base_url=self.api_base,
                 timeout=PROJECT_CONFIG.openai.timeout,
                 max_retries=PROJECT_CONFIG.openai.max_retries,
             )
@@ -41,6 +57,14 @@ class CloudAgent(BaseAgent):
             logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             raise
 
+    def _build_request_body(self, input_data: Any) -> Dict[str, Any]:
+        return {
+            "model": self.name,
+            "messages": [{"role": "user", "content": str(input_data)}],
+            "max_tokens": PROJECT_CONFIG.openai.max_tokens,
+            "temperature": PROJECT_CONFIG.openai.temperature,
+        }
+
     def process(self, input_data: Any) -> Any:
         """
         Process input using the OpenAI client.
@@ -56,10 +80,7 @@ class CloudAgent(BaseAgent):
         try:
             # Create chat completion with proper error handling
             response = self.client.chat.completions.create(
-                model=self.name,
-                messages=[{"role": "user", "content": str(input_data)}],
-                max_tokens=PROJECT_CONFIG.openai.max_tokens,
-                temperature=PROJECT_CONFIG.openai.temperature,
+                **self._build_request_body(input_data)
             )
 
             return {
@@ -73,3 +94,120 @@ class CloudAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Error processing input with OpenAI: {str(e)}")
             raise
+
+    def build_batch_request(self, custom_id: str, input_data: Any) -> Dict[str, Any]:
+        """
+        Build one line of a Batch API input file.
+
+        Args:
+            custom_id: Identifier used to match the result back to its request
+            input_data: The input to be processed by the model
+
+        Returns:
+            Dict to be serialised as a single JSONL line
+        """
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": self._build_request_body(input_data),
+        }
+
+    def submit_batch(self, batch_file: Path) -> str:
+        """
+        Upload a JSONL batch input file and create a batch job for it.
+
+        Args:
+            batch_file: Path to the JSONL file built from `build_batch_request`
+
+        Returns:
+            The id of the created batch
+        """
+        try:
+            with open(batch_file, "rb") as f:
+                batch_input = self.client.files.create(file=f, purpose="batch")
+
+            batch = self.client.batches.create(
+                input_file_id=batch_input.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            )
+            logger.info(f"Submitted batch {batch.id} from {batch_file}")
+            return batch.id
+
+        except Exception as e:
+            logger.error(f"Failed to submit batch {batch_file}: {str(e)}")
+            raise
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Poll a batch until it completes.
+
+        Args:
+            batch_id: Id returned by `submit_batch`
+            poll_interval: Seconds to wait between status checks
+            timeout: Maximum seconds to wait, None to wait until the batch ends
+
+        Returns:
+            The completed batch object
+
+        Raises:
+            AgentError: If the batch fails, expires, is cancelled or times out
+        """
+        started = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            logger.info(f"Batch {batch_id} status: {batch.status}")
+            if batch.status == "completed":
+                return batch
+            if batch.status in BATCH_FAILED_STATUSES:
+                raise AgentError(f"Batch {batch_id} ended with status {batch.status}")
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise AgentError(f"Timed out waiting for batch {batch_id}")
+            time.sleep(poll_interval)
+
+    def fetch_batch_results(self, batch: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Download the output of a completed batch.
+
+        Args:
+            batch: Completed batch object returned by `wait_for_batch`
+
+        Returns:
+            Dict mapping each custom_id to a result shaped like `process` output
+        """
+        results = {}
+        if not batch.output_file_id:
+            logger.warning(f"Batch {batch.id} has no output file")
+            return results
+
+        content = self.client.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            custom_id = record["custom_id"]
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                logger.error(
+                    f"Batch request {custom_id} failed: "
+                    f"{record.get('error') or response.get('body')}"
+                )
+                continue
+
+            body = response["body"]
+            results[custom_id] = {
+                "model": self.name,
+                "input": custom_id,
+                "status": "processed",
+                "response": body["choices"][0]["message"]["content"],
+                "usage": body.get("usage"),
+            }
+
+        logger.info(f"Fetched {len(results)} results from batch {batch.id}")
+        return results
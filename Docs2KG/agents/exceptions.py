@@ -14,3 +14,9 @@ class ConfigurationError(AgentError):
     """Raised when there's an error in agent configuration"""
 
     pass
+
+
+class NoHealthyBackend(AgentError):
+    """Raised when no backend of an agent pool can serve a request"""
+
+    pass
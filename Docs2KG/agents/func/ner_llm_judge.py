@@ -5,7 +5,9 @@ from Docs2KG.agents.manager import AgentManager
 
 class NERLLMJudge:
     def __init__(self, agent_name="phi3.5", agent_type="ollama", **kwargs):
-        self.llm = AgentManager(agent_name, agent_type, **kwargs)
+        self.llm = AgentManager(
+            agent_name, agent_type, stage=self.__class__.__name__, **kwargs
+        )
 
     def judge(self, ner, ner_type, text):
         prompt = f"""You are a expert judge to evaluate whether within the following text: '{text}'
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from huggingface_hub import InferenceClient
 from loguru import logger
@@ -17,6 +17,8 @@ class HuggingFaceAgent(BaseAgent):
         """
         super().__init__(name)
         self.client = self._init_huggingface_client()
+        self._tokenizer = None
+        self._tokenizer_loaded = False
 
     def _init_huggingface_client(self) -> InferenceClient:
         """
@@ -40,6 +42,30 @@ class HuggingFaceAgent(BaseAgent):
             logger.error(f"Failed to initialize HuggingFace client: {str(e)}")
             raise
 
+    def _get_tokenizer(self) -> Optional[Any]:
+        """
+        Load the tokenizer of the model on first use, if transformers is installed
+        and the model publishes one.
+        """
+        if not self._tokenizer_loaded:
+            self._tokenizer_loaded = True
+            try:
+                from transformers import AutoTokenizer
+
+                self._tokenizer = AutoTokenizer.from_pretrained(self.name)
+            except Exception as e:
+                logger.warning(
+                    f"No tokenizer for {self.name}, counting prompt tokens "
+                    f"by whitespace: {str(e)}"
+                )
+        return self._tokenizer
+
+    def count_tokens(self, text: str) -> int:
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer.encode(text))
+
     def process(self, input_data: Any) -> Any:
         """
         Process input using the HuggingFace client.
@@ -60,16 +86,21 @@ class HuggingFaceAgent(BaseAgent):
                 return_full_text=False,  # Only return generated text, not the prompt
             )
 
+            prompt_tokens = self.count_tokens(str(input_data))
+            if response.details is not None:
+                completion_tokens = response.details.generated_tokens
+            else:
+                completion_tokens = self.count_tokens(response.generated_text)
+
             return {
                 "model": self.name,
                 "input": input_data,
                 "status": "processed",
                 "response": response.generated_text,
                 "usage": {
-                    "prompt_tokens": len(str(input_data).split()),
-                    "completion_tokens": len(response.generated_text.split()),
-                    "total_tokens": len(str(input_data).split())
-                    + len(response.generated_text.split()),
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
                 },
             }
 
@@ -0,0 +1,211 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_cpp import Llama
+from loguru import logger
+
+_MODELS: Dict[Tuple, Llama] = {}
+_WORKERS: Dict[int, "LlamaInferenceWorker"] = {}
+_LOCK = threading.Lock()
+
+
+def available_cpu_count() -> int:
+    """Number of CPU cores this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def load_llama_model(
+    model_path: str,
+    n_ctx: int,
+    n_threads: Optional[int] = None,
+    n_gpu_layers: int = 0,
+) -> Llama:
+    """
+    Load a GGUF model once per process and reuse it afterwards.
+
+    Args:
+        model_path: Path to the quantized model file
+        n_ctx: Context length
+        n_threads: CPU threads, None to use all available cores
+        n_gpu_layers: Number of layers to offload to GPU
+
+    Returns:
+        The shared llama.cpp model
+    """
+    n_threads = n_threads or available_cpu_count()
+    key = (model_path, n_ctx, n_threads, n_gpu_layers)
+    with _LOCK:
+        if key not in _MODELS:
+            logger.info(f"Loading {model_path} with {n_threads} threads")
+            _MODELS[key] = Llama(
+                model_path=model_path,
+                n_ctx=n_ctx,
+                n_threads=n_threads,
+                n_threads_batch=n_threads,
+                n_gpu_layers=n_gpu_layers,
+                verbose=False,
+            )
+        return _MODELS[key]
+
+
+def get_llama_worker(client: Llama, sort_window: int = 8) -> "LlamaInferenceWorker":
+    """
+    Get the inference worker serving a loaded model, starting it if needed.
+
+    Args:
+        client: Model returned by `load_llama_model`
+        sort_window: Maximum number of queued prompts reordered by prefix at once
+
+    Returns:
+        The worker bound to this model
+    """
+    with _LOCK:
+        worker = _WORKERS.get(id(client))
+        if worker is None:
+            worker = LlamaInferenceWorker(client, sort_window=sort_window)
+            _WORKERS[id(client)] = worker
+        return worker
+
+
+class LlamaInferenceWorker:
+    """
+    Serve completions for one llama.cpp model from a single background thread.
+
+    This is a serialized queue, not batched decoding: llama.cpp contexts are not
+    thread-safe and llama-cpp-python's high-level API evaluates one sequence at
+    a time, so concurrent callers enqueue their prompts, get a Future back, and
+    the worker completes them one after the other. It takes up to `sort_window`
+    waiting prompts at once and runs them sorted by prompt, so prompts sharing
+    an instruction prefix run back to back and llama.cpp only evaluates the
+    tokens after the prefix already held in its KV cache. Prefixes registered
+    with `cache_prefix` keep a saved model state that is restored whenever
+    another prompt evicted them.
+    """
+
+    def __init__(self, client: Llama, sort_window: int = 8):
+        self.client = client
+        self.sort_window = sort_window
+        self.prefix_states: Dict[str, Tuple[List[int], Any]] = {}
+        self.queue: "queue.Queue[Tuple[str, Optional[Dict[str, Any]], Future]]" = (
+            queue.Queue()
+        )
+        self.thread = threading.Thread(
+            target=self._run, name="llama-inference-worker", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, prompt: str, **params) -> Future:
+        """
+        Queue a prompt for completion.
+
+        Args:
+            prompt: Prompt to complete
+            **params: Keyword arguments for `Llama.create_completion`
+
+        Returns:
+            Future resolving to a dict with the completion text, usage and timings
+        """
+        future = Future()
+        self.queue.put((prompt, params, future))
+        return future
+
+    def cache_prefix(self, prefix: str) -> Future:
+        """
+        Queue the evaluation of a shared prompt prefix and save its state.
+
+        Args:
+            prefix: Static prefix that subsequent prompts start with
+
+        Returns:
+            Future resolving to True once the prefix state is saved
+        """
+        future = Future()
+        self.queue.put((prefix, None, future))
+        return future
+
+    def _drain_queue(self) -> List[Tuple[str, Optional[Dict[str, Any]], Future]]:
+        """Wait for a prompt, then take the others already waiting, sorted by prompt"""
+        waiting = [self.queue.get()]
+        while len(waiting) < self.sort_window:
+            try:
+                waiting.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return sorted(waiting, key=lambda request: request[0])
+
+    def _save_prefix_state(self, prefix: str) -> bool:
+        tokens = self.client.tokenize(prefix.encode("utf-8"))
+        self.client.reset()
+        self.client.eval(tokens)
+        self.prefix_states[prefix] = (tokens, self.client.save_state())
+        logger.info(f"Saved llama.cpp state for a {len(tokens)} token prompt prefix")
+        return True
+
+    def _restore_prefix_state(self, prompt: str) -> bool:
+        for prefix, (tokens, state) in self.prefix_states.items():
+            if not prompt.startswith(prefix):
+                continue
+            held = self.client.input_ids[: self.client.n_tokens][: len(tokens)]
+            if list(held) != tokens:
+                self.client.load_state(state)
+            return True
+        return False
+
+    def _complete(self, prompt: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        prefix_cache_hit = self._restore_prefix_state(prompt)
+        started = time.perf_counter()
+        time_to_first_token = None
+        pieces = []
+        for chunk in self.client.create_completion(
+            prompt=prompt, stream=True, **params
+        ):
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - started
+            pieces.append(chunk["choices"][0]["text"])
+        elapsed = time.perf_counter() - started
+        text = "".join(pieces)
+
+        prompt_tokens = len(self.client.tokenize(prompt.encode("utf-8")))
+        completion_tokens = (
+            len(self.client.tokenize(text.encode("utf-8"), add_bos=False))
+            if text
+            else 0
+        )
+        decode_time = elapsed - (time_to_first_token or elapsed)
+        return {
+            "text": text,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            "elapsed": elapsed,
+            "time_to_first_token": time_to_first_token or elapsed,
+            "tokens_per_second": (
+                completion_tokens / decode_time if decode_time > 0 else 0.0
+            ),
+            "prefix_cache_hit": prefix_cache_hit,
+        }
+
+    def _run(self) -> None:
+        while True:
+            waiting = self._drain_queue()
+            # completed one at a time, the sort only groups shared prefixes
+            for prompt, params, future in waiting:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if params is None:
+                        future.set_result(self._save_prefix_state(prompt))
+                        continue
+                    result = self._complete(prompt, params)
+                    result["queued_with"] = len(waiting)
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
@@ -1,33 +1,85 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional, Set, Union
 
 from loguru import logger
 
 from Docs2KG.agents.base import BaseAgent
-from Docs2KG.agents.cloud import CloudAgent
-from Docs2KG.agents.exceptions import InvalidAgentType
-from Docs2KG.agents.hf import HuggingFaceAgent
-from Docs2KG.agents.ollama import OllamaAgent
-from Docs2KG.agents.quantization import QuantizationAgent
+from Docs2KG.agents.exceptions import ConfigurationError, InvalidAgentType
+from Docs2KG.agents.metrics import RUN_METRICS, AgentMetrics
+from Docs2KG.agents.pool import AgentBackend, AgentPool, agent_label
+from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.lazy_import import import_object
 
 
 class AgentManager:
-    def __init__(self, agent_name: str, agent_type: str, **kwargs):
+    # prefixes cached on remote backends in this process, by backend label
+    _server_prefixes: Dict[str, Set[str]] = {}
+    # backends are imported when an agent of their type is created
+    AGENT_TYPES = {
+        "cloud": "Docs2KG.agents.cloud:CloudAgent",
+        "quantization": "Docs2KG.agents.quantization:QuantizationAgent",
+        "ollama": "Docs2KG.agents.ollama:OllamaAgent",
+        "hf": "Docs2KG.agents.hf:HuggingFaceAgent",
+    }
+
+    @classmethod
+    def register_agent_type(
+        cls, agent_type: str, agent_class: Union[type, str]
+    ) -> None:
+        """
+        Make an agent implementation available under an agent_type name.
+
+        Args:
+            agent_type: Name used as agent_type, e.g. in the CLI or pool config
+            agent_class: BaseAgent subclass, or its "module:Class" path to import
+                it lazily, created as agent_class(agent_name, **kwargs)
         """
-        Initialize AgentManager with a specific agent.
+        cls.AGENT_TYPES[agent_type.lower()] = agent_class
+
+    def __init__(
+        self,
+        agent_name: str,
+        agent_type: str,
+        backends: Optional[List[Dict[str, Any]]] = None,
+        stage: Optional[str] = None,
+        metrics: Optional[AgentMetrics] = None,
+        **kwargs,
+    ):
+        """
+        Initialize AgentManager with a specific agent, or a pool of backends.
 
         Args:
             agent_name: Name for the agent (e.g., 'gpt-4', 'gpt-4-turbo')
-            agent_type: Type of agent ('cloud', 'quantization', or 'hf')
+            agent_type: Type of agent ('cloud', 'quantization', 'ollama', 'hf'),
+                or 'pool' to use the backends from the agent_pool config
+            backends: Optional list of backends to load balance over, each a dict
+                with agent_name, agent_type, an optional fallback flag and extra
+                agent kwargs such as api_base
+            stage: Pipeline stage the calls are recorded under in the metrics
+            metrics: Metrics collector, defaults to the process wide RUN_METRICS
         """
-        self.agent_types = {
-            "cloud": CloudAgent,
-            "quantization": QuantizationAgent,
-            "ollama": OllamaAgent,
-            "hf": HuggingFaceAgent,
-        }
-        self.agent_type = agent_type
+        self.agent_types = self.AGENT_TYPES
+        self.pool: Optional[AgentPool] = None
+        self.stage = stage or "default"
+        self.metrics = metrics or RUN_METRICS
+
+        if backends is None and agent_type.lower() == "pool":
+            backends = [
+                backend.model_dump(exclude_none=True)
+                for backend in PROJECT_CONFIG.agent_pool.backends
+            ]
+            if not backends:
+                raise ConfigurationError("No backends configured in agent_pool")
 
-        self.agent = self._init_agent(agent_name, agent_type, **kwargs)
+        if backends is None:
+            self.agent_type = agent_type
+            self.agent = self._init_agent(agent_name, agent_type, **kwargs)
+            return
+
+        self.pool = self._init_pool(backends)
+        # the first backend is the preferred one
+        self.agent = self.pool.backends[0].agent
+        self.agent_type = self.pool.backends[0].agent_type
 
     def _init_agent(self, agent_name: str, agent_type: str, **kwargs) -> BaseAgent:
         agent_type = agent_type.lower()
@@ -37,18 +89,127 @@ class AgentManager:
             )
 
         agent_class = self.agent_types[agent_type]
+        if isinstance(agent_class, str):
+            agent_class = import_object(agent_class)
         return agent_class(agent_name, **kwargs)
 
+    def _init_pool(self, backends: List[Dict[str, Any]]) -> AgentPool:
+        if not backends:
+            raise ConfigurationError("Agent pool needs at least one backend")
+        pool_backends = []
+        for backend in backends:
+            backend = dict(backend)
+            agent_name = backend.pop("agent_name")
+            agent_type = backend.pop("agent_type").lower()
+            fallback = backend.pop("fallback", False)
+            pool_backends.append(
+                AgentBackend(
+                    self._init_agent(agent_name, agent_type, **backend),
+                    agent_type,
+                    fallback=fallback,
+                    failure_threshold=PROJECT_CONFIG.agent_pool.failure_threshold,
+                    recovery_timeout=PROJECT_CONFIG.agent_pool.recovery_timeout,
+                )
+            )
+        return AgentPool(pool_backends)
+
+    def _process_with(
+        self, agent: BaseAgent, agent_type: str, input_data: Any, reset_session: bool
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            if agent_type == "ollama":
+                result = agent.process(input_data, reset_session)
+            else:
+                result = agent.process(input_data)
+        except Exception:
+            self.metrics.record(
+                self.stage,
+                agent_label(agent_type, agent),
+                time.perf_counter() - started,
+                error=True,
+            )
+            raise
+
+        self.metrics.record(
+            self.stage,
+            agent_label(agent_type, agent),
+            time.perf_counter() - started,
+            usage=result.get("usage"),
+            cache_hit=result.get("prefix_cache_hit"),
+        )
+        return result
+
     def process_input(self, input_data: Any, reset_session: bool = False) -> Any:
-        if self.agent_type == "ollama":
-            return self.agent.process(input_data, reset_session)
-        return self.agent.process(input_data)
+        if self.pool is None:
+            return self._process_with(
+                self.agent, self.agent_type, input_data, reset_session
+            )
+        return self.pool.process(
+            lambda backend: self._process_with(
+                backend.agent, backend.agent_type, input_data, reset_session
+            )
+        )
 
-    def get_agent_info(self) -> Dict[str, str]:
+    def cache_prefix(self, prefix: str) -> bool:
+        """
+        Ask the agent, or every backend of the pool, to cache a prompt prefix.
+
+        A prefix is cached once per backend and process: on the server of a
+        remote backend, which keeps it for every agent talking to it, and on
+        the agent itself otherwise. Later calls for the same backend and
+        prefix return without evaluating it again.
+
+        Args:
+            prefix: Static prefix that subsequent prompts start with
+
+        Returns:
+            bool: True if at least one backend cached the prefix
+        """
+        agents = (
+            [(self.agent_type, self.agent)]
+            if self.pool is None
+            else [(backend.agent_type, backend.agent) for backend in self.pool.backends]
+        )
+        cached = False
+        for agent_type, agent in agents:
+            cached_prefixes = self._cached_prefixes(agent_type, agent)
+            if prefix in cached_prefixes:
+                cached = True
+                continue
+            try:
+                if agent.cache_prefix(prefix):
+                    cached_prefixes.add(prefix)
+                    cached = True
+            except Exception as e:
+                logger.warning(f"Failed to cache prompt prefix on {agent.name}: {e}")
+        return cached
+
+    def _cached_prefixes(self, agent_type: str, agent: BaseAgent) -> Set[str]:
+        """Prefixes already cached where the agent keeps its prefix cache"""
+        if getattr(agent, "api_base", None):
+            return self._server_prefixes.setdefault(
+                agent_label(agent_type, agent), set()
+            )
+        return agent.cached_prefixes
+
+    def get_backend_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get load, health and latency percentiles for each backend of the pool.
+
+        Returns:
+            List of per-backend stats, empty when no pool is configured
+        """
+        if self.pool is None:
+            return []
+        return self.pool.stats()
+
+    def get_agent_info(self) -> Dict[str, Any]:
         return {
             "name": self.agent.name,
             "type": type(self.agent).__name__,
             "config": getattr(self.agent, "model", None),
+            "backends": self.get_backend_stats(),
         }
 
 
@@ -61,6 +222,28 @@ if __name__ == "__main__":
     output = agent_manager.process_input("Hello, how are you?")
     logger.info(f"Output: {output}")
 
+    # least-outstanding-requests balancing over two Ollama hosts, cloud fallback
+    agent_manager = AgentManager(
+        agent_name="phi3.5",
+        agent_type="ollama",
+        backends=[
+            {
+                "agent_name": "phi3.5",
+                "agent_type": "ollama",
+                "api_base": "http://gpu-1:11434",
+            },
+            {
+                "agent_name": "phi3.5",
+                "agent_type": "ollama",
+                "api_base": "http://gpu-2:11434",
+            },
+            {"agent_name": "gpt-4o", "agent_type": "cloud", "fallback": True},
+        ],
+    )
+    output = agent_manager.process_input("Hello, how are you?")
+    logger.info(f"Output: {output}")
+    logger.info(f"Backends: {agent_manager.get_backend_stats()}")
+
     agent_manager = AgentManager(agent_name="openai-community/gpt2", agent_type="hf")
     output = agent_manager.process_input("Hello, how are you?")
     logger.info(f"Output: {output}")
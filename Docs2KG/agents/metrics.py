@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def normalise_usage(usage: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Get (prompt_tokens, completion_tokens) from the usage of any agent.
+
+    Args:
+        usage: Usage dict returned by an agent, OpenAI or Ollama style
+
+    Returns:
+        Tuple of prompt and completion token counts, zero when unknown
+    """
+    if not usage:
+        return 0, 0
+    prompt_tokens = usage.get("prompt_tokens", usage.get("prompt_eval_count", 0))
+    completion_tokens = usage.get("completion_tokens", usage.get("eval_count", 0))
+    return int(prompt_tokens or 0), int(completion_tokens or 0)
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value for the OpenMetrics text format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _CallStats:
+    def __init__(self, latency_window: int):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_sum = 0.0
+        self.latencies = deque(maxlen=latency_window)
+
+    def quantile(self, q: float) -> Optional[float]:
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[round(q * (len(samples) - 1))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_seconds": {
+                "sum": self.latency_sum,
+                "mean": self.latency_sum / self.calls if self.calls else None,
+                **{f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES},
+            },
+        }
+
+
+class AgentMetrics:
+    """
+    Collect per-call telemetry of the agent layer.
+
+    Every call made through an `AgentManager` records its latency, token usage,
+    prefix cache hit and error status under its (stage, backend) pair. The
+    collected data can be summarised as a dict or exported as
+    Prometheus/OpenMetrics text.
+    """
+
+    def __init__(self, latency_window: int = 10000):
+        self.latency_window = latency_window
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+
+    def record(
+        self,
+        stage: str,
+        backend: str,
+        latency: float,
+        usage: Optional[Dict[str, Any]] = None,
+        cache_hit: Optional[bool] = None,
+        error: bool = False,
+    ) -> None:
+        """
+        Record one agent call.
+
+        Args:
+            stage: Pipeline stage that made the call (e.g. NERLLMPromptExtractor)
+            backend: Backend that served the call
+            latency: Wall time of the call in seconds
+            usage: Usage dict returned by the agent
+            cache_hit: Whether the backend reused a cached prompt prefix,
+                None when it cannot tell, which is not counted as a hit
+            error: Whether the call failed
+        """
+        prompt_tokens, completion_tokens = normalise_usage(usage)
+        with self._lock:
+            stats = self._stats.get((stage, backend))
+            if stats is None:
+                stats = _CallStats(self.latency_window)
+                self._stats[(stage, backend)] = stats
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.cache_hits += int(cache_hit is True)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.latency_sum += latency
+            stats.latencies.append(latency)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+            self.started_at = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarise the run per stage and backend.
+
+        Returns:
+            Dict with run totals and a list of per (stage, backend) stats
+        """
+        with self._lock:
+            entries = [
+                {"stage": stage, "backend": backend, **stats.to_dict()}
+                for (stage, backend), stats in sorted(self._stats.items())
+            ]
+        totals = {
+            key: sum(entry[key] for entry in entries)
+            for key in (
+                "calls",
+                "errors",
+                "cache_hits",
+                "prompt_tokens",
+                "completion_tokens",
+            )
+        }
+        return {
+            "duration_seconds": time.time() - self.started_at,
+            "totals": totals,
+            "stages": entries,
+        }
+
+    @staticmethod
+    def _labels(stage: str, backend: str, **extra) -> str:
+        labels = {"stage": stage, "backend": backend, **extra}
+        return (
+            "{"
+            + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            + "}"
+        )
+
+    def to_openmetrics(self, prefix: str = "docs2kg_agent") -> str:
+        """
+        Export the collected metrics in the OpenMetrics text format.
+
+        Args:
+            prefix: Metric family name prefix
+
+        Returns:
+            str: OpenMetrics exposition, also readable by Prometheus
+        """
+        counters = {
+            "requests": "calls",
+            "errors": "errors",
+            "cache_hits": "cache_hits",
+            "prompt_tokens": "prompt_tokens",
+            "completion_tokens": "completion_tokens",
+        }
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+            for family, attribute in counters.items():
+                lines.append(f"# TYPE {prefix}_{family} counter")
+                for (stage, backend), stats in items:
+                    lines.append(
+                        f"{prefix}_{family}_total{self._labels(stage, backend)} "
+                        f"{getattr(stats, attribute)}"
+                    )
+
+            lines.append(f"# TYPE {prefix}_latency_seconds summary")
+            lines.append(f"# UNIT {prefix}_latency_seconds seconds")
+            for (stage, backend), stats in items:
+                for q in QUANTILES:
+                    value = stats.quantile(q)
+                    if value is None:
+                        continue
+                    labels = self._labels(stage, backend, quantile=q)
+                    lines.append(f"{prefix}_latency_seconds{labels} {value}")
+                labels = self._labels(stage, backend)
+                lines.append(
+                    f"{prefix}_latency_seconds_sum{labels} {stats.latency_sum}"
+                )
+                lines.append(f"{prefix}_latency_seconds_count{labels} {stats.calls}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def export(self, folder: Path, name: str = "agent_metrics") -> Tuple[Path, Path]:
+        """
+        Write the run summary as JSON and the OpenMetrics text next to it.
+
+        Args:
+            folder: Folder to write the files to
+            name: Base name of the files
+
+        Returns:
+            Tuple of the JSON summary path and the OpenMetrics path
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        summary_path = folder / f"{name}.json"
+        openmetrics_path = folder / f"{name}.prom"
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        openmetrics_path.write_text(self.to_openmetrics(), encoding="utf-8")
+        logger.info(f"Exported agent metrics to {summary_path} and {openmetrics_path}")
+        return summary_path, openmetrics_path
+
+
+# shared by every AgentManager of the process unless one is given explicitly
+RUN_METRICS = AgentMetrics()
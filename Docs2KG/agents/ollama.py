@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Dict, Optional
 
 import requests
 from loguru import logger
@@ -9,14 +9,16 @@ from Docs2KG.utils.config import PROJECT_CONFIG
 
 
 class OllamaAgent(BaseAgent):
-    def __init__(self, name: str):
+    def __init__(self, name: str, api_base: Optional[str] = None):
         """
         Initialize OllamaAgent with model name and optional API base URL.
 
         Args:
             name: Name of the Ollama model to use (e.g., 'llama2', 'mistral')
+            api_base: Ollama host to use instead of the configured one
         """
         super().__init__(name)
+        self.api_base = api_base or PROJECT_CONFIG.ollama.api_base
         self.session = self._init_session()
 
     def _init_session(self) -> requests.Session:
@@ -35,11 +37,9 @@ class OllamaAgent(BaseAgent):
             session.mount("http://", HTTPAdapter(max_retries=retries))
             session.mount("https://", HTTPAdapter(max_retries=retries))
 
-            # Set base URL
-            self.api_base = PROJECT_CONFIG.ollama.api_base
-
             logger.info(
-                f"Successfully initialized Ollama session for model {self.name}"
+                f"Successfully initialized Ollama session for model {self.name} "
+                f"at {self.api_base}"
             )
             return session
 
@@ -52,6 +52,65 @@ class OllamaAgent(BaseAgent):
         self.session.close()
         self.session = self._init_session()
 
+    def cache_prefix(self, prefix: str) -> bool:
+        """
+        Warm the Ollama prompt cache with a shared prefix.
+
+        Ollama reuses the KV cache for the longest common prefix of consecutive
+        prompts as long as the model stays loaded, so the prefix is evaluated once
+        here and `keep_alive` keeps the model resident between requests.
+
+        Args:
+            prefix: Static prefix that subsequent prompts start with
+
+        Returns:
+            bool: True if the prefix was evaluated
+        """
+        try:
+            response = self.session.post(
+                f"{self.api_base}/api/generate",
+                json={
+                    "model": self.name,
+                    "prompt": prefix,
+                    "stream": False,
+                    "keep_alive": PROJECT_CONFIG.ollama.keep_alive,
+                    "options": {"num_predict": 1},
+                },
+                timeout=PROJECT_CONFIG.ollama.timeout,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Failed to warm Ollama prompt cache: {str(e)}")
+            return False
+
+        return True
+
+    @staticmethod
+    def prompt_cache_hit(result: Dict[str, Any]) -> Optional[bool]:
+        """
+        Whether Ollama reused cached KV entries for part of the prompt.
+
+        `prompt_eval_count` only counts the prompt tokens that were evaluated,
+        while `context` holds the tokens of the whole templated prompt and of
+        the response, so fewer evaluated tokens than prompt tokens means the
+        rest came from the cache.
+
+        Args:
+            result: Response of /api/generate
+
+        Returns:
+            bool: Whether the cache was hit, None when the response does not
+                report the counts needed to tell
+        """
+        context = result.get("context")
+        prompt_eval_count = result.get("prompt_eval_count")
+        if context is None or prompt_eval_count is None:
+            return None
+        prompt_tokens = len(context) - result.get("eval_count", 0)
+        if prompt_tokens <= 0:
+            return None
+        return prompt_eval_count < prompt_tokens
+
     def process(self, input_data: Any, reset_session: bool = False) -> Any:
         """
         Process input using the Ollama API.
@@ -75,6 +134,7 @@ class OllamaAgent(BaseAgent):
                 "temperature": PROJECT_CONFIG.ollama.temperature,
                 "stream": False,
                 "format": PROJECT_CONFIG.ollama.format,
+                "keep_alive": PROJECT_CONFIG.ollama.keep_alive,
             }
 
             # Make the API call
@@ -86,6 +146,10 @@ class OllamaAgent(BaseAgent):
             response.raise_for_status()
 
             result = response.json()
+            # durations are reported in nanoseconds
+            time_to_first_token = (
+                result.get("load_duration", 0) + result.get("prompt_eval_duration", 0)
+            ) / 1e9
 
             return {
                 "model": self.name,
@@ -93,10 +157,18 @@ class OllamaAgent(BaseAgent):
                 "status": "processed",
                 "response": result.get("response", ""),
                 "usage": {
+                    "prompt_tokens": result.get("prompt_eval_count", 0),
+                    "completion_tokens": result.get("eval_count", 0),
+                    "total_tokens": result.get("prompt_eval_count", 0)
+                    + result.get("eval_count", 0),
                     "eval_count": result.get("eval_count", 0),
                     "eval_duration": result.get("eval_duration", 0),
+                    "prompt_eval_count": result.get("prompt_eval_count", 0),
+                    "prompt_eval_duration": result.get("prompt_eval_duration", 0),
                     "total_duration": result.get("total_duration", 0),
+                    "time_to_first_token": time_to_first_token,
                 },
+                "prefix_cache_hit": self.prompt_cache_hit(result),
             }
 
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from Docs2KG.agents.base import BaseAgent
+from Docs2KG.agents.exceptions import NoHealthyBackend
+
+
+def agent_label(agent_type: str, agent: BaseAgent) -> str:
+    """Readable identifier of an agent endpoint, e.g. ollama:phi3.5@http://gpu-1"""
+    api_base = getattr(agent, "api_base", None)
+    suffix = f"@{api_base}" if api_base else ""
+    return f"{agent_type}:{agent.name}{suffix}"
+
+
+class AgentBackend:
+    """
+    One endpoint of an agent pool, tracking its load and health.
+
+    The backend follows a circuit breaker: after `failure_threshold` consecutive
+    failures it is ejected (open) for `recovery_timeout` seconds, then a single
+    trial request is let through (half-open) to decide whether it rejoins.
+    Fallback backends only receive traffic when no primary backend is available.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        agent_type: str,
+        fallback: bool = False,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        latency_window: int = 1000,
+    ):
+        self.agent = agent
+        self.agent_type = agent_type
+        self.fallback = fallback
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.latencies = deque(maxlen=latency_window)
+
+    @property
+    def label(self) -> str:
+        return agent_label(self.agent_type, self.agent)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half-open"
+        return "open"
+
+    def is_available(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        return state == "half-open" and not self.trial_in_flight
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logger.info(f"Backend {self.label} recovered, closing circuit")
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        if self.opened_at is not None or (
+            self.consecutive_failures >= self.failure_threshold
+        ):
+            logger.warning(
+                f"Ejecting backend {self.label} for {self.recovery_timeout}s "
+                f"after {self.consecutive_failures} consecutive failures"
+            )
+            self.opened_at = time.monotonic()
+
+    def latency_percentiles(
+        self, percentiles: tuple = (50, 90, 99)
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get latency percentiles (seconds) over the recent successful requests.
+
+        Args:
+            percentiles: Percentiles to report
+
+        Returns:
+            Dict keyed by p50, p90, ... with None when there is no sample yet
+        """
+        samples = sorted(self.latencies)
+        result = {}
+        for percentile in percentiles:
+            if not samples:
+                result[f"p{percentile}"] = None
+                continue
+            rank = round(percentile / 100 * (len(samples) - 1))
+            result[f"p{percentile}"] = samples[rank]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.label,
+            "fallback": self.fallback,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "requests": self.total_requests,
+            "failures": self.total_failures,
+            "latency": self.latency_percentiles(),
+        }
+
+
+class AgentPool:
+    """
+    Distribute requests over several agent backends.
+
+    Each request goes to the available backend with the fewest outstanding
+    requests (ties resolved by the configured order, so the first backend is the
+    preferred one). A failed request fails over to the next best backend.
+    """
+
+    def __init__(self, backends: List[AgentBackend]):
+        self.backends = backends
+        self._lock = threading.Lock()
+
+    def _acquire(self, exclude: List[AgentBackend]) -> Optional[AgentBackend]:
+        with self._lock:
+            candidates = [
+                backend
+                for backend in self.backends
+                if backend not in exclude and backend.is_available()
+            ]
+            if not candidates:
+                return None
+            primaries = [
+                candidate for candidate in candidates if not candidate.fallback
+            ]
+            candidates = primaries or candidates
+            backend = min(candidates, key=lambda candidate: candidate.outstanding)
+            if backend.state == "half-open":
+                backend.trial_in_flight = True
+            backend.outstanding += 1
+            backend.total_requests += 1
+            return backend
+
+    def _release(
+        self, backend: AgentBackend, latency: float, error: Optional[Exception]
+    ) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            backend.trial_in_flight = False
+            if error is None:
+                backend.record_success(latency)
+            else:
+                backend.record_failure()
+
+    def process(self, call: Callable[[AgentBackend], Any]) -> Any:
+        """
+        Run a request on the pool, failing over until a backend succeeds.
+
+        Args:
+            call: Function sending the request through the given backend
+
+        Returns:
+            The result of the first successful call
+
+        Raises:
+            NoHealthyBackend: If every available backend failed or none is available
+        """
+        tried = []
+        last_error = None
+        while True:
+            backend = self._acquire(exclude=tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            started = time.perf_counter()
+            try:
+                result = call(backend)
+            except Exception as e:
+                self._release(backend, time.perf_counter() - started, e)
+                logger.error(f"Backend {backend.label} failed: {str(e)}")
+                last_error = e
+                continue
+            self._release(backend, time.perf_counter() - started, None)
+            return result
+
+        raise NoHealthyBackend(
+            f"No healthy backend could process the request "
+            f"(tried: {', '.join(backend.label for backend in tried) or 'none'})"
+        ) from last_error
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [backend.stats() for backend in self.backends]
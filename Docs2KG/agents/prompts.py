@@ -0,0 +1,83 @@
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    Prompt split into a static prefix and a per-call body.
+
+    The prefix (instructions, entity types, output format) is identical across
+    calls and always comes first, so backends can reuse the KV cache computed
+    for it and only evaluate the body.
+    """
+
+    prefix: str
+    body: str
+
+    def render(self, **kwargs) -> str:
+        """Render the prompt with the static prefix first"""
+        return self.prefix + self.body.format(**kwargs)
+
+    def render_static_last(self, **kwargs) -> str:
+        """Render the prompt with the static prefix after the body, which defeats
+        prefix caching. Only used as a baseline when measuring the savings."""
+        return self.body.format(**kwargs) + self.prefix
+
+
+def _time_to_first_token(result: Dict[str, Any], elapsed: float) -> float:
+    usage = result.get("usage") or {}
+    return usage.get("time_to_first_token", elapsed)
+
+
+def _summarise(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"mean": None, "median": None}
+    return {"mean": statistics.mean(samples), "median": statistics.median(samples)}
+
+
+def measure_prefix_cache_savings(
+    agent_manager: Any, template: PromptTemplate, texts: List[str], field: str
+) -> Dict[str, Any]:
+    """
+    Measure the time-to-first-token saved by prefix caching for a template.
+
+    The texts are first sent with the static block last (no shared prefix), then
+    the prefix is cached and the same texts are sent static-first. Backends that
+    do not report time to first token fall back to the request wall time.
+
+    Args:
+        agent_manager: AgentManager to send the prompts through
+        template: Template whose prefix is cached
+        texts: Values for the template body
+        field: Name of the body placeholder the texts fill in
+
+    Returns:
+        Dict with the mean/median time to first token of both runs and the
+        relative saving of the median
+    """
+    baseline, cached = [], []
+    for text in texts:
+        started = time.perf_counter()
+        result = agent_manager.process_input(
+            template.render_static_last(**{field: text})
+        )
+        baseline.append(_time_to_first_token(result, time.perf_counter() - started))
+
+    agent_manager.cache_prefix(template.prefix)
+    for text in texts:
+        started = time.perf_counter()
+        result = agent_manager.process_input(template.render(**{field: text}))
+        cached.append(_time_to_first_token(result, time.perf_counter() - started))
+
+    baseline_summary, cached_summary = _summarise(baseline), _summarise(cached)
+    saving = None
+    if baseline_summary["median"]:
+        saving = 1 - cached_summary["median"] / baseline_summary["median"]
+    return {
+        "static_last": baseline_summary,
+        "static_first_cached": cached_summary,
+        "median_saving": saving,
+    }
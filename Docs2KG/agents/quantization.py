@@ -4,6 +4,7 @@ from llama_cpp import Llama
 from loguru import logger
 
 from Docs2KG.agents.base import BaseAgent
+from Docs2KG.agents.llama_worker import get_llama_worker, load_llama_model
 from Docs2KG.utils.config import PROJECT_CONFIG
 
 
@@ -17,14 +18,19 @@ class QuantizationAgent(BaseAgent):
         """
         super().__init__(name)
         self.client = self._init_llama_client()
+        self.worker = get_llama_worker(
+            self.client, sort_window=PROJECT_CONFIG.llamacpp.sort_window
+        )
 
     def _init_llama_client(self) -> Llama:
         """
         Initialize llama.cpp client with the quantized model.
+
+        The model is loaded once per process and shared by all agents using it.
         """
         try:
             # Initialize client with config
-            client = Llama(
+            client = load_llama_model(
                 model_path=self.name or PROJECT_CONFIG.llamacpp.model_path,
                 n_ctx=PROJECT_CONFIG.llamacpp.context_length,
                 n_threads=PROJECT_CONFIG.llamacpp.num_threads,
@@ -40,6 +46,18 @@ class QuantizationAgent(BaseAgent):
             logger.error(f"Failed to initialize llamacpp.cpp client: {str(e)}")
             raise
 
+    def cache_prefix(self, prefix: str) -> bool:
+        """
+        Evaluate a shared prompt prefix once and keep its llama.cpp state.
+
+        Args:
+            prefix: Static prefix that subsequent prompts start with
+
+        Returns:
+            bool: True once the prefix state is saved
+        """
+        return self.worker.cache_prefix(prefix).result()
+
     def process(self, input_data: Any) -> Any:
         """
         Process input using the llamacpp.cpp client.
@@ -53,30 +71,29 @@ class QuantizationAgent(BaseAgent):
         logger.info(f"Processing input with llamacpp.cpp: {input_data}")
 
         try:
-            # Create completion with proper error handling
-            response = self.client.create_completion(
-                prompt=str(input_data),
+            # Queue the completion on the shared inference worker
+            completion = self.worker.submit(
+                str(input_data),
                 max_tokens=PROJECT_CONFIG.llamacpp.max_tokens,
                 temperature=PROJECT_CONFIG.llamacpp.temperature,
                 top_p=PROJECT_CONFIG.llamacpp.top_p,
                 stop=PROJECT_CONFIG.llamacpp.stop_tokens,
                 echo=False,  # Don't include prompt in the response
-            )
-
-            # Extract completion tokens used from response metadata
-            completion_tokens = len(response["choices"][0]["text"].split())
-            prompt_tokens = len(str(input_data).split())
+            ).result()
 
             return {
                 "model": self.name,
                 "input": input_data,
                 "status": "processed",
-                "response": response["choices"][0]["text"],
+                "response": completion["text"],
+                # token counts come from the model tokenizer
                 "usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": prompt_tokens + completion_tokens,
+                    **completion["usage"],
+                    "elapsed": completion["elapsed"],
+                    "time_to_first_token": completion["time_to_first_token"],
+                    "tokens_per_second": completion["tokens_per_second"],
                 },
+                "prefix_cache_hit": completion["prefix_cache_hit"],
             }
 
         except Exception as e:
@@ -0,0 +1,36 @@
+"""
+Benchmarks of the Docs2KG pipeline.
+
+A synthetic corpus (markdown, HTML, DOCX and EPUB documents, an entity list and
+a metadata table) of a configurable size is run through every stage, with a
+fake LLM backend and a stub Neo4j driver, to report throughput and peak memory
+per stage and flag regressions against a saved baseline.
+
+Run it with `docs2kg benchmark`.
+"""
+
+# synthetic corpus sizes, kept here so the CLI can list them without importing
+# the benchmark dependencies
+SIZES = {
+    "small": {
+        "documents": 2,
+        "sections": 10,
+        "paragraphs": 3,
+        "entities": 50,
+        "metadata_rows": 1000,
+    },
+    "medium": {
+        "documents": 5,
+        "sections": 50,
+        "paragraphs": 5,
+        "entities": 200,
+        "metadata_rows": 20000,
+    },
+    "large": {
+        "documents": 10,
+        "sections": 200,
+        "paragraphs": 8,
+        "entities": 1000,
+        "metadata_rows": 200000,
+    },
+}
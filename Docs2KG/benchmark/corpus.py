@@ -0,0 +1,301 @@
+"""
+Synthetic documents, entity lists and metadata tables for the benchmarks.
+
+Everything is generated from a seed, so two runs with the same size produce
+byte-identical inputs and their timings can be compared.
+"""
+
+import html
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from ebooklib import epub
+
+WORDS = (
+    "the drilling program at the tenement returned gold and nickel intercepts "
+    "from several holes while the survey mapped the basalt and granite units "
+    "along the shear zone north of the project area with assays pending"
+).split()
+
+ENTITY_TYPES = ["MINERAL", "ROCK", "LOCATION", "COMPANY", "METHOD"]
+
+
+def generate_entities(num_entities: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Generate (entity, entity_type) pairs.
+
+    Args:
+        num_entities: Number of entities
+        seed: Random seed
+
+    Returns:
+        List of entity text and entity type pairs
+    """
+    rng = random.Random(seed)
+    return [
+        (f"entity{idx} {rng.choice(WORDS)}", ENTITY_TYPES[idx % len(ENTITY_TYPES)])
+        for idx in range(num_entities)
+    ]
+
+
+def _sentence(rng: random.Random, entities: List[Tuple[str, str]]) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    if entities:
+        words.insert(rng.randrange(len(words)), rng.choice(entities)[0])
+    return " ".join(words).capitalize() + "."
+
+
+def generate_sections(
+    num_sections: int,
+    paragraphs_per_section: int,
+    entities: List[Tuple[str, str]],
+    seed: int = 0,
+) -> List[Dict]:
+    """
+    Generate the logical content shared by every synthetic format.
+
+    Args:
+        num_sections: Number of H1 sections
+        paragraphs_per_section: Paragraphs per section, each section also
+            gets a sub section and a short list
+        entities: Entities sprinkled over the sentences
+        seed: Random seed
+
+    Returns:
+        List of sections with title, paragraphs, sub section and list items
+    """
+    rng = random.Random(seed)
+    sections = []
+    for idx in range(num_sections):
+        sections.append(
+            {
+                "title": f"Section {idx + 1}",
+                "paragraphs": [
+                    " ".join(_sentence(rng, entities) for _ in range(3))
+                    for _ in range(paragraphs_per_section)
+                ],
+                "subtitle": f"Section {idx + 1}.1",
+                "items": [_sentence(rng, entities) for _ in range(3)],
+            }
+        )
+    return sections
+
+
+def to_markdown(sections: List[Dict]) -> str:
+    lines = []
+    for section in sections:
+        lines.append(f"# {section['title']}\n")
+        lines.extend(f"{paragraph}\n" for paragraph in section["paragraphs"])
+        lines.append(f"## {section['subtitle']}\n")
+        lines.extend(f"- {item}" for item in section["items"])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def to_html_body(sections: List[Dict]) -> str:
+    parts = []
+    for section in sections:
+        parts.append(f"<h1>{html.escape(section['title'])}</h1>")
+        parts.extend(
+            f'<p class="para" style="margin:0">{html.escape(paragraph)}</p>'
+            for paragraph in section["paragraphs"]
+        )
+        parts.append(f"<h2>{html.escape(section['subtitle'])}</h2>")
+        parts.append(
+            "<ul>"
+            + "".join(f"<li>{html.escape(item)}</li>" for item in section["items"])
+            + "</ul>"
+        )
+    return "\n".join(parts)
+
+
+def write_markdown(sections: List[Dict], path: Path) -> Path:
+    path.write_text(to_markdown(sections), encoding="utf-8")
+    return path
+
+
+def write_html(sections: List[Dict], path: Path) -> Path:
+    """Write a web page with navigation, scripts and styles around the content."""
+    page = (
+        "<!DOCTYPE html><html><head><title>Synthetic report</title>"
+        "<style>.para { color: #333; }</style>"
+        "<script>window.analytics = {};</script></head><body>"
+        '<nav id="menu"><a href="/">Home</a></nav>'
+        f"<main>{to_html_body(sections)}</main>"
+        "<footer>Synthetic footer</footer></body></html>"
+    )
+    path.write_text(page, encoding="utf-8")
+    return path
+
+
+def generate_scraped_page(size_kb: int, seed: int = 0) -> str:
+    """
+    Generate a large web page like a scraped news or report site: most of the
+    bytes are scripts, styles, attributes and navigation around the content.
+
+    Args:
+        size_kb: Approximate size of the page in kilobytes
+        seed: Random seed
+
+    Returns:
+        str: The HTML page
+    """
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><title>Scraped page</title>",
+        "<style>" + ".c{margin:0 auto;padding:4px}" * 200 + "</style></head><body>",
+    ]
+    size = sum(len(part) for part in parts)
+    idx = 0
+    while size < size_kb * 1024:
+        block = (
+            f'<div class="row card" id="block-{idx}" data-idx="{idx}" '
+            f'style="display:flex;margin:{rng.randrange(9)}px">'
+            f'<nav class="menu"><a class="link" href="/p/{idx}">Link {idx}</a></nav>'
+            f'<h2 class="title">Heading {idx}</h2>'
+            f'<p class="para" style="color:#333">{_sentence(rng, [])} '
+            f'<span class="hl">{_sentence(rng, [])}</span></p>'
+            f"<ul><li>{_sentence(rng, [])}</li><li>{_sentence(rng, [])}</li></ul>"
+            f"<script>window.track({{block: {idx}}}); /* analytics */</script>"
+            "<!-- ad slot --></div>"
+        )
+        parts.append(block)
+        size += len(block)
+        idx += 1
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _docx_paragraph(text: str, style: str = None) -> str:
+    style_xml = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return (
+        f'<w:p>{style_xml}<w:r><w:t xml:space="preserve">'
+        f"{html.escape(text)}</w:t></w:r></w:p>"
+    )
+
+
+def write_docx(sections: List[Dict], path: Path) -> Path:
+    """Write a minimal WordprocessingML package, headings use the built-in styles."""
+    body = []
+    for section in sections:
+        body.append(_docx_paragraph(section["title"], "Heading1"))
+        body.extend(_docx_paragraph(paragraph) for paragraph in section["paragraphs"])
+        body.append(_docx_paragraph(section["subtitle"], "Heading2"))
+        body.extend(_docx_paragraph(item) for item in section["items"])
+
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{namespace}"><w:body>{"".join(body)}</w:body>'
+        "</w:document>"
+    )
+    styles = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:styles xmlns:w="{namespace}">'
+        + "".join(
+            f'<w:style w:type="paragraph" w:styleId="Heading{level}">'
+            f'<w:name w:val="heading {level}"/></w:style>'
+            for level in (1, 2)
+        )
+        + "</w:styles>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/styles.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+        "</Types>"
+    )
+    package_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    document_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/></Relationships>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", content_types)
+        docx.writestr("_rels/.rels", package_rels)
+        docx.writestr("word/document.xml", document)
+        docx.writestr("word/styles.xml", styles)
+        docx.writestr("word/_rels/document.xml.rels", document_rels)
+    return path
+
+
+def write_epub(sections: List[Dict], path: Path) -> Path:
+    """Write an EPUB with one chapter per section."""
+    book = epub.EpubBook()
+    book.set_identifier("docs2kg-benchmark")
+    book.set_title("Synthetic report")
+    book.set_language("en")
+    book.add_author("Docs2KG benchmark")
+
+    chapters = []
+    for idx, section in enumerate(sections):
+        chapter = epub.EpubHtml(
+            title=section["title"], file_name=f"chapter_{idx}.xhtml", lang="en"
+        )
+        chapter.content = to_html_body([section])
+        book.add_item(chapter)
+        chapters.append(chapter)
+
+    book.toc = chapters
+    book.spine = ["nav", *chapters]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    epub.write_epub(str(path), book)
+    return path
+
+
+def write_entity_list(entities: List[Tuple[str, str]], path: Path) -> Path:
+    pd.DataFrame(entities, columns=["entity", "entity_type"]).to_csv(path, index=False)
+    return path
+
+
+def generate_metadata(
+    num_rows: int, seed: int = 0, missing: float = 0.0
+) -> pd.DataFrame:
+    """
+    Generate a document metadata table with categorical and continuous columns.
+
+    Args:
+        num_rows: Number of documents
+        seed: Random seed
+        missing: Fraction of metadata cells left empty
+
+    Returns:
+        DataFrame with a name column and metadata columns
+    """
+    rng = random.Random(seed)
+    metadata = pd.DataFrame(
+        {
+            "name": [f"report_{idx}" for idx in range(num_rows)],
+            "commodity": [
+                rng.choice(["gold", "nickel", "iron"]) for _ in range(num_rows)
+            ],
+            "company": [f"company_{rng.randrange(50)}" for _ in range(num_rows)],
+            "year": [rng.randrange(1990, 2025) for _ in range(num_rows)],
+            "latitude": [rng.uniform(-35, -14) for _ in range(num_rows)],
+            "longitude": [rng.uniform(113, 129) for _ in range(num_rows)],
+        }
+    )
+    if missing:
+        for column in metadata.columns[1:]:
+            empty = [rng.random() < missing for _ in range(num_rows)]
+            metadata[column] = metadata[column].mask(empty)
+    return metadata
@@ -0,0 +1,101 @@
+"""
+In-process stand-ins for the LLM and Neo4j backends used by the benchmarks.
+
+They answer instantly, so the benchmarks measure the cost of Docs2KG itself
+rather than the latency of a model server or database.
+"""
+
+import json
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from Docs2KG.agents.base import BaseAgent
+
+
+class FakeLLMAgent(BaseAgent):
+    """
+    Agent answering NER prompts with the known entities found in the text.
+
+    Entities are looked up in the text after the "Text:" marker of the NER
+    prompt, judge prompts are always answered as correct.
+    """
+
+    def __init__(self, name: str, entities: Optional[List[Tuple[str, str]]] = None):
+        super().__init__(name)
+        self.entities = [(text.lower(), label) for text, label in entities or []]
+
+    def process(self, input_data: Any) -> Any:
+        prompt = str(input_data)
+        if "Text:\n" in prompt:
+            text = prompt.rsplit("Text:\n", 1)[1]
+            response = json.dumps(
+                [
+                    {"text": entity, "label": label, "confidence": 1.0}
+                    for entity, label in self.entities
+                    if entity in text
+                ]
+            )
+        else:
+            response = "correct"
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(response.split())
+        return {
+            "model": self.name,
+            "input": input_data,
+            "status": "processed",
+            "response": response,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class StubResult:
+    def __init__(self, records: Optional[List[Dict[str, Any]]] = None):
+        self.records = records or []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records)
+
+    def single(self) -> Optional[Dict[str, Any]]:
+        return self.records[0] if self.records else None
+
+    def data(self) -> List[Dict[str, Any]]:
+        return list(self.records)
+
+
+class StubSession:
+    def __init__(self, driver: "StubNeo4jDriver"):
+        self.driver = driver
+
+    def __enter__(self) -> "StubSession":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        return None
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs) -> Any:
+        self.driver.queries += 1
+        self.driver.statements[" ".join(query.split())[:40]] += 1
+        return StubResult()
+
+
+class StubNeo4jDriver:
+    """
+    Neo4j driver that accepts every query and returns empty results.
+
+    It counts the statements sent, so the benchmark reports the number of
+    round trips a load needs alongside its client side cost.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.statements: Counter = Counter()
+
+    def session(self, database: Optional[str] = None) -> StubSession:
+        return StubSession(self)
+
+    def close(self) -> None:
+        return None
@@ -0,0 +1,103 @@
+"""
+Cleaning and markdown conversion of large scraped pages by HTMLDocling.
+
+The previous implementation is kept here as the reference: it parsed with
+`html.parser`, walked the tree once per kind of clean up, serialized the tree
+and ran regexes over the string before markdownify parsed it again.
+"""
+
+import re
+import time
+from typing import Any, Dict, List
+
+from bs4 import BeautifulSoup
+from markdownify import MarkdownConverter, markdownify
+
+from Docs2KG.benchmark import corpus
+from Docs2KG.digitization.native.html_parser import HTML_PARSER, HTMLDocling
+
+
+def legacy_html_to_markdown(html_content: str) -> str:
+    soup = BeautifulSoup(html_content, "html.parser")
+    for style in soup.find_all("style"):
+        style.decompose()
+    for script in soup.find_all("script"):
+        script.decompose()
+    for tag in soup.find_all(True):
+        if "style" in tag.attrs:
+            del tag["style"]
+    for tag in soup.find_all(True):
+        if "class" in tag.attrs:
+            del tag["class"]
+        if "id" in tag.attrs:
+            del tag["id"]
+    cleaned_html = str(soup)
+    cleaned_html = re.sub(r"<style[^>]*>[\s\S]*?</style>", "", cleaned_html)
+    cleaned_html = re.sub(r"/\*[\s\S]*?\*/", "", cleaned_html)
+    cleaned_html = re.sub(r"{\s*[^}]*}", "", cleaned_html)
+    return markdownify(cleaned_html, heading_style="ATX", bullets="-", autolinks=True)
+
+
+def single_pass_html_to_markdown(html_content: str) -> str:
+    return MarkdownConverter(
+        heading_style="ATX", bullets="-", autolinks=True
+    ).convert_soup(HTMLDocling.clean_soup(html_content))
+
+
+def benchmark_html_cleaning(
+    pages: int = 3, size_kb: int = 2048, seed: int = 0, repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Convert synthetic scraped pages with the legacy and the single-pass cleaner.
+
+    Args:
+        pages: Number of pages
+        size_kb: Size of each page in kilobytes
+        seed: Seed of the synthetic pages
+        repeat: Runs per page, the fastest one is reported
+
+    Returns:
+        One row per cleaner with its seconds, KB/s and output size
+    """
+    html_pages = [
+        corpus.generate_scraped_page(size_kb, seed + idx) for idx in range(pages)
+    ]
+    kilobytes = sum(len(page.encode("utf-8")) for page in html_pages) / 1024
+    rows = []
+    for name, convert in (
+        ("legacy", legacy_html_to_markdown),
+        (f"single-pass ({HTML_PARSER})", single_pass_html_to_markdown),
+    ):
+        seconds = 0.0
+        markdown_chars = 0
+        for page in html_pages:
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                markdown = convert(page)
+                runs.append(time.perf_counter() - started)
+            seconds += min(runs)
+            markdown_chars += len(markdown)
+        rows.append(
+            {
+                "cleaner": name,
+                "pages": pages,
+                "input_kb": kilobytes,
+                "seconds": seconds,
+                "kb_per_second": kilobytes / seconds if seconds else 0.0,
+                "markdown_chars": markdown_chars,
+            }
+        )
+    return rows
+
+
+def format_html_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'cleaner':<24} {'input KB':>9} {'seconds':>8} {'KB/s':>9} {'md chars':>9}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['cleaner']:<24} {row['input_kb']:>9.0f} {row['seconds']:>8.2f} "
+            f"{row['kb_per_second']:>9.0f} {row['markdown_chars']:>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,80 @@
+"""
+Layout KG construction from a Docling document, directly or through markdown.
+
+The markdown path is what every digitizer supports: export the document to
+markdown, convert it to HTML and walk the BeautifulSoup tree. Docling based
+digitizers can skip that round trip and hand the document over directly.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from Docs2KG.kg_construction.layout_kg.layout_kg import LayoutKGConstruction
+
+if TYPE_CHECKING:
+    from docling_core.types.doc import DoclingDocument
+
+
+def compare_layout_paths(
+    documents: Dict[str, "DoclingDocument"],
+    project_id: str,
+    repeat: int = 3,
+    conversion_paths: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Time both ways of building the layout of each document.
+
+    Args:
+        documents: Docling documents by filename
+        project_id: Project of the layout constructor
+        repeat: Runs per path, the fastest one is reported
+        conversion_paths: How each document was converted (docling, sharded,
+            text_layer or mixed, see `PDFDocling.conversion_path`)
+
+    Returns:
+        One row per document with its conversion path, the elements and
+        seconds of each layout path and the speedup of the direct path
+    """
+    conversion_paths = conversion_paths or {}
+    construction = LayoutKGConstruction(project_id)
+    rows = []
+    for filename, document in documents.items():
+        markdown_seconds, direct_seconds = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            markdown_kg = construction._process_document(
+                document.export_to_markdown(), filename
+            )
+            markdown_seconds.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            direct_kg = construction._process_docling_document(document, filename)
+            direct_seconds.append(time.perf_counter() - started)
+
+        rows.append(
+            {
+                "filename": filename,
+                "conversion": conversion_paths.get(filename, "docling"),
+                "markdown_elements": len(markdown_kg["data"]),
+                "direct_elements": len(direct_kg["data"]),
+                "markdown_seconds": min(markdown_seconds),
+                "direct_seconds": min(direct_seconds),
+                "speedup": min(markdown_seconds) / max(min(direct_seconds), 1e-9),
+            }
+        )
+    return rows
+
+
+def format_layout_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'document':<30} {'conversion':<10} {'md elements':>11} {'md s':>8} "
+        f"{'direct elements':>15} {'direct s':>9} {'speedup':>8}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['filename'][:30]:<30} {row['conversion']:<10} "
+            f"{row['markdown_elements']:>11} "
+            f"{row['markdown_seconds']:>8.3f} {row['direct_elements']:>15} "
+            f"{row['direct_seconds']:>9.3f} {row['speedup']:>7.1f}x"
+        )
+    return "\n".join(lines)
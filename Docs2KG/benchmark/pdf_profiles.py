@@ -0,0 +1,90 @@
+"""
+Throughput and memory of the PDF pipeline profiles on a sample corpus.
+
+Each profile runs in its own fresh process, so the peak RSS reported includes
+the models that profile loads and nothing left over from another profile.
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_profile(profile: str, pdf_paths: List[str]) -> Dict[str, Any]:
+    from Docs2KG.digitization.image.pdf_docling import (
+        build_pdf_converter,
+        count_pdf_pages,
+    )
+
+    started = time.perf_counter()
+    converter = build_pdf_converter(profile)
+    load_seconds = time.perf_counter() - started
+
+    pages = 0
+    started = time.perf_counter()
+    for pdf_path in pdf_paths:
+        result = converter.convert(pdf_path)
+        # export like PDFDocling does, so image serialisation is counted too
+        result.document.export_to_markdown()
+        pages += count_pdf_pages(Path(pdf_path))
+    convert_seconds = time.perf_counter() - started
+
+    return {
+        "profile": profile,
+        "documents": len(pdf_paths),
+        "pages": pages,
+        "load_seconds": load_seconds,
+        "convert_seconds": convert_seconds,
+        "pages_per_second": pages / convert_seconds if convert_seconds else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def benchmark_pdf_profiles(
+    pdf_paths: List[Path], profiles: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Convert the same PDFs with each profile and report pages/sec and peak RSS.
+
+    Args:
+        pdf_paths: Sample corpus
+        profiles: Names of the profiles to compare
+
+    Returns:
+        One row per profile with pages, timings, pages per second and peak RSS
+    """
+    rows = []
+    for profile in profiles:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            rows.append(
+                executor.submit(
+                    _run_profile, profile, [str(path) for path in pdf_paths]
+                ).result()
+            )
+    return rows
+
+
+def format_profile_table(rows: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'profile':<12} {'pages':>6} {'load s':>8} {'convert s':>10} "
+        f"{'pages/s':>8} {'peak RSS MB':>12}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['profile']:<12} {row['pages']:>6} {row['load_seconds']:>8.2f} "
+            f"{row['convert_seconds']:>10.2f} {row['pages_per_second']:>8.2f} "
+            f"{row['peak_rss_mb']:>12.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+"""
+Time to first token of the NER prompts with and without prefix caching.
+
+The NER prompt puts its static block (instructions and entity types) first so
+that backends can reuse the KV cache computed for it. The baseline sends the
+same prompts with the static block last, where nothing is shared between two
+prompts. The difference only shows on a real backend (Ollama or llama.cpp),
+the fake agent of the other benchmarks answers instantly.
+"""
+
+from typing import Any, Dict, List
+
+from Docs2KG.agents.manager import AgentManager
+from Docs2KG.agents.metrics import AgentMetrics
+from Docs2KG.agents.prompts import measure_prefix_cache_savings
+from Docs2KG.benchmark import corpus
+from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
+    NERLLMPromptExtractor,
+    ner_prompt_template,
+)
+
+
+def benchmark_prefix_cache(
+    agent_name: str, agent_type: str, samples: int = 20, seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Send synthetic NER chunks static-last, then static-first with the prefix
+    cached, and compare their time to first token.
+
+    Args:
+        agent_name: Model to send the prompts to
+        agent_type: Type of agent (ollama, quantization, ...)
+        samples: Number of text chunks sent in each run
+        seed: Seed of the synthetic text
+
+    Returns:
+        Report of `measure_prefix_cache_savings`, with the agent and samples
+    """
+    entities = corpus.generate_entities(20, seed)
+    sections = corpus.generate_sections(samples, 1, entities, seed)
+    texts: List[str] = []
+    for section in sections:
+        texts.extend(NERLLMPromptExtractor.split_text_chunks(section["paragraphs"][0]))
+    texts = texts[:samples]
+
+    agent_manager = AgentManager(
+        agent_name, agent_type, stage="PrefixCacheBenchmark", metrics=AgentMetrics()
+    )
+    template = ner_prompt_template(corpus.ENTITY_TYPES)
+    report = measure_prefix_cache_savings(agent_manager, template, texts, "text")
+    return {
+        "agent": f"{agent_type}:{agent_name}",
+        "samples": len(texts),
+        **report,
+    }
+
+
+def format_prefix_cache_table(report: Dict[str, Any]) -> str:
+    lines = [f"{'prompt order':<22} {'mean TTFT':>10} {'median TTFT':>12}"]
+    for name, key in (
+        ("static last", "static_last"),
+        ("static first, cached", "static_first_cached"),
+    ):
+        summary = report[key]
+        cells = [
+            f"{summary[stat]:.3f}s" if summary[stat] is not None else "-"
+            for stat in ("mean", "median")
+        ]
+        lines.append(f"{name:<22} {cells[0]:>10} {cells[1]:>12}")
+    saving = report["median_saving"]
+    lines.append(
+        f"median saving: {saving:.1%}" if saving is not None else "median saving: -"
+    )
+    return "\n".join(lines)
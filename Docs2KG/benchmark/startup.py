@@ -0,0 +1,114 @@
+"""
+Import-time benchmark of the CLI.
+
+Runs `python -X importtime` in a fresh interpreter, so the numbers are not
+affected by modules already imported in the current process.
+"""
+
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+# backends that must only be imported by the commands using them
+HEAVY_MODULES = [
+    "docling",
+    "spacy",
+    "pandas",
+    "torch",
+    "transformers",
+    "llama_cpp",
+    "huggingface_hub",
+    "openai",
+    "neo4j",
+    "mammoth",
+    "ebooklib",
+]
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse the "import time: self | cumulative | name" lines of -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_seconds": int(self_us) / 1e6,
+                "cumulative_seconds": int(cumulative_us) / 1e6,
+            }
+        )
+    return imports
+
+
+def measure_import_time(module: str = "Docs2KG.cli", runs: int = 3) -> Dict[str, Any]:
+    """
+    Measure the time to import a module in a fresh interpreter.
+
+    Args:
+        module: Module to import
+        runs: Number of interpreters to start, the fastest run is reported
+
+    Returns:
+        Dict with the import time of the module, the slowest imports and the
+        heavy backend modules that were loaded
+    """
+    code = (
+        f"import sys, json, {module}; "
+        "print(json.dumps(sorted(m.split('.')[0] for m in sys.modules)))"
+    )
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imports = _parse_importtime(completed.stderr)
+        total = next(
+            item["cumulative_seconds"] for item in imports if item["module"] == module
+        )
+        if best is None or total < best["seconds"]:
+            loaded = set(json.loads(completed.stdout.strip().splitlines()[-1]))
+            best = {
+                "module": module,
+                "seconds": total,
+                "slowest_imports": sorted(
+                    (item for item in imports if item["depth"] == 1),
+                    key=lambda item: item["cumulative_seconds"],
+                    reverse=True,
+                )[:10],
+                "heavy_modules_loaded": [
+                    name for name in HEAVY_MODULES if name in loaded
+                ],
+            }
+    return best
+
+
+def check_startup_budget(result: Dict[str, Any], budget: float) -> List[str]:
+    """
+    Check an import-time measurement against a budget.
+
+    Args:
+        result: Result of `measure_import_time`
+        budget: Maximum import time in seconds
+
+    Returns:
+        List of violations, empty when within the budget
+    """
+    violations = []
+    if result["seconds"] > budget:
+        violations.append(
+            f"importing {result['module']} took {result['seconds']:.3f}s "
+            f"> budget {budget:.3f}s"
+        )
+    if result["heavy_modules_loaded"]:
+        violations.append(
+            f"importing {result['module']} loads "
+            f"{', '.join(result['heavy_modules_loaded'])}"
+        )
+    return violations
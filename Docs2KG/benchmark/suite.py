@@ -0,0 +1,358 @@
+"""
+End-to-end benchmark of the Docs2KG stages on a synthetic corpus.
+
+Each stage is timed with `perf_counter` and its peak traced memory recorded,
+then compared to a saved baseline to catch throughput or memory regressions.
+"""
+
+import gc
+import json
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from Docs2KG.benchmark import SIZES, corpus
+from Docs2KG.benchmark.fakes import FakeLLMAgent, StubNeo4jDriver
+from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.timer import Profiler, timer
+
+BENCHMARK_PROJECT_ID = "benchmark"
+FAKE_AGENT_TYPE = "benchmark-fake"
+
+
+@dataclass
+class StageResult:
+    """Timing and memory of one benchmarked stage"""
+
+    stage: str
+    seconds: float
+    units: float
+    unit: str
+    peak_memory_bytes: Optional[int] = None
+    skipped: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        return self.units / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "throughput": self.throughput}
+
+
+@contextmanager
+def benchmark_workspace(workdir: Path) -> Iterator[Path]:
+    """
+    Point the data folders and semantic KG inputs of the configuration to a
+    scratch folder for the duration of the benchmark.
+
+    Args:
+        workdir: Scratch folder, input/output/ontology folders are created in it
+
+    Yields:
+        The scratch folder
+    """
+    saved_data = PROJECT_CONFIG.data.model_copy()
+    saved_semantic_kg = PROJECT_CONFIG.semantic_kg.model_copy()
+    for name in ("input", "output", "ontology"):
+        (workdir / name).mkdir(parents=True, exist_ok=True)
+    PROJECT_CONFIG.data.input_dir = workdir / "input"
+    PROJECT_CONFIG.data.output_dir = workdir / "output"
+    PROJECT_CONFIG.data.ontology_dir = workdir / "ontology"
+    PROJECT_CONFIG.semantic_kg.entity_list = str(workdir / "ontology" / "entities.csv")
+    PROJECT_CONFIG.semantic_kg.ontology = str(workdir / "ontology" / "ontology.json")
+    try:
+        yield workdir
+    finally:
+        PROJECT_CONFIG.data = saved_data
+        PROJECT_CONFIG.semantic_kg = saved_semantic_kg
+
+
+class BenchmarkSuite:
+    """
+    Generate a synthetic corpus and run every pipeline stage over it.
+
+    The LLM stages use `FakeLLMAgent` and the Neo4j load a `StubNeo4jDriver`, so
+    the numbers reflect Docs2KG's own processing cost and are stable enough
+    to compare between releases.
+    """
+
+    def __init__(self, workdir: Path, size: str = "small", seed: int = 0):
+        """
+        Args:
+            workdir: Scratch folder for the corpus and the outputs
+            size: One of SIZES
+            seed: Seed of the synthetic corpus
+        """
+        if size not in SIZES:
+            raise ValueError(f"Unknown size {size}, must be one of {list(SIZES)}")
+        self.workdir = workdir
+        self.size = size
+        self.params = SIZES[size]
+        self.seed = seed
+        self.profiler = Profiler()
+        self.profiler.enable_memory_tracing()
+        self.results: List[StageResult] = []
+        self.entities = corpus.generate_entities(self.params["entities"], seed)
+        self.documents: Dict[str, Dict[str, Path]] = {}
+
+    def measure(
+        self, stage: str, unit: str, units: float, func: Callable[[], Any]
+    ) -> StageResult:
+        """
+        Time a stage and record its peak traced memory.
+
+        Args:
+            stage: Stage name
+            unit: Name of the unit of work, used for the throughput
+            units: Amount of work done by the stage
+            func: Stage to run, returning an optional dict of counts for `extra`
+
+        Returns:
+            StageResult of the stage, also appended to `results`
+        """
+        gc.collect()
+        with timer(logger, f"Benchmark {stage}", "benchmark", self.profiler) as span:
+            extra = func()
+        result = StageResult(
+            stage=stage,
+            seconds=span.duration,
+            units=units,
+            unit=unit,
+            peak_memory_bytes=span.peak_memory,
+            extra=extra if isinstance(extra, dict) else {},
+        )
+        self.results.append(result)
+        return result
+
+    def skip(self, stage: str, unit: str, reason: str) -> None:
+        logger.warning(f"Skipping benchmark {stage}: {reason}")
+        self.results.append(StageResult(stage, 0.0, 0, unit, skipped=reason))
+
+    def generate_corpus(self) -> None:
+        input_dir = PROJECT_CONFIG.data.input_dir
+        for idx in range(self.params["documents"]):
+            sections = corpus.generate_sections(
+                self.params["sections"],
+                self.params["paragraphs"],
+                self.entities,
+                seed=self.seed + idx,
+            )
+            name = f"synthetic_{idx}"
+            self.documents[name] = {
+                "md": corpus.write_markdown(sections, input_dir / f"{name}.md"),
+                "html": corpus.write_html(sections, input_dir / f"{name}.html"),
+                "docx": corpus.write_docx(sections, input_dir / f"{name}.docx"),
+                "epub": corpus.write_epub(sections, input_dir / f"{name}.epub"),
+            }
+        corpus.write_entity_list(
+            self.entities, Path(PROJECT_CONFIG.semantic_kg.entity_list)
+        )
+        Path(PROJECT_CONFIG.semantic_kg.ontology).write_text(
+            json.dumps(
+                {
+                    "entity_types": corpus.ENTITY_TYPES,
+                    "relation_types": [],
+                    "connections": [],
+                }
+            )
+        )
+
+    def _input_kilobytes(self, fmt: str) -> float:
+        return (
+            sum(paths[fmt].stat().st_size for paths in self.documents.values()) / 1024
+        )
+
+    def _layout_paths(self) -> List[Path]:
+        layout_folder = (
+            PROJECT_CONFIG.data.output_dir
+            / "projects"
+            / BENCHMARK_PROJECT_ID
+            / "layout"
+        )
+        return sorted(
+            path for path in layout_folder.glob("*.json") if path.name != "schema.json"
+        )
+
+    def _layout_items(self) -> int:
+        return sum(
+            len(json.loads(path.read_text())["data"]) for path in self._layout_paths()
+        )
+
+    def bench_digitization(self) -> None:
+        from Docs2KG.digitization.native.ebook import EPUBDigitization
+        from Docs2KG.digitization.native.html_parser import HTMLDocling
+        from Docs2KG.digitization.native.word_docling import DOCXMammoth
+
+        for fmt, processor_class in (
+            ("html", HTMLDocling),
+            ("docx", DOCXMammoth),
+            ("epub", EPUBDigitization),
+        ):
+            self.measure(
+                f"digitization.{fmt}",
+                "KB",
+                self._input_kilobytes(fmt),
+                lambda: [
+                    processor_class(paths[fmt]).process()
+                    for paths in self.documents.values()
+                ],
+            )
+
+    def bench_layout(self) -> None:
+        from Docs2KG.kg_construction.layout_kg.layout_kg import LayoutKGConstruction
+
+        docs = [
+            {"content": paths["md"].read_text(), "filename": name}
+            for name, paths in self.documents.items()
+        ]
+
+        def construct() -> Dict[str, Any]:
+            layout_kg = LayoutKGConstruction(BENCHMARK_PROJECT_ID).construct(docs)
+            return {"elements": sum(len(doc["data"]) for doc in layout_kg.values())}
+
+        self.measure(
+            "layout_kg.construct", "KB", self._input_kilobytes("md"), construct
+        )
+
+    def bench_ner(self) -> None:
+        from Docs2KG.agents.manager import AgentManager
+        from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
+            NERLLMPromptExtractor,
+        )
+
+        AgentManager.register_agent_type(FAKE_AGENT_TYPE, FakeLLMAgent)
+        items = self._layout_items()
+
+        try:
+            from Docs2KG.kg_construction.semantic_kg.ner.ner_spacy_match import (
+                NERSpacyMatcher,
+            )
+
+            matcher = NERSpacyMatcher(
+                BENCHMARK_PROJECT_ID, agent_name="fake", agent_type=FAKE_AGENT_TYPE
+            )
+        except (ImportError, OSError) as e:
+            # spacy or its en_core_web_sm model is not installed
+            self.skip("ner.spacy_matcher", "items", str(e))
+        else:
+            self.measure(
+                "ner.spacy_matcher",
+                "items",
+                items,
+                lambda: matcher.construct_kg(self._layout_paths()),
+            )
+
+        extractor = NERLLMPromptExtractor(
+            BENCHMARK_PROJECT_ID,
+            agent_name="fake",
+            agent_type=FAKE_AGENT_TYPE,
+            entities=self.entities,
+        )
+        self.measure(
+            "ner.llm_prompt_extractor",
+            "items",
+            items,
+            lambda: extractor.construct_kg(self._layout_paths()),
+        )
+
+    def bench_metadata(self) -> None:
+        from Docs2KG.kg_construction.metadata_kg.metadata_kg import (
+            MetadataKGConstruction,
+        )
+
+        metadata = corpus.generate_metadata(self.params["metadata_rows"], self.seed)
+
+        def construct() -> Dict[str, Any]:
+            metadata_kg = MetadataKGConstruction(BENCHMARK_PROJECT_ID).construct(
+                metadata
+            )
+            return {
+                "nodes": len(metadata_kg["nodes"]),
+                "relationships": len(metadata_kg["relationships"]),
+            }
+
+        self.measure("metadata_kg.construct", "rows", len(metadata), construct)
+
+    def bench_neo4j(self) -> None:
+        from Docs2KG.utils.neo4j_loader import Neo4jTransformer
+
+        driver = StubNeo4jDriver()
+        transformer = Neo4jTransformer(
+            BENCHMARK_PROJECT_ID, uri="", username="", password="", driver=driver
+        )
+
+        def load() -> Dict[str, Any]:
+            for layout_path in self._layout_paths():
+                transformer.transform_and_load(layout_path)
+            return {"queries": driver.queries}
+
+        self.measure("neo4j.load", "items", self._layout_items(), load)
+
+    def run(self) -> List[StageResult]:
+        """
+        Run every stage in pipeline order.
+
+        Returns:
+            List of StageResult
+        """
+        with benchmark_workspace(self.workdir):
+            self.generate_corpus()
+            self.bench_digitization()
+            self.bench_layout()
+            self.bench_ner()
+            self.bench_metadata()
+            self.bench_neo4j()
+        return self.results
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "params": self.params,
+            "seed": self.seed,
+            "stages": {result.stage: result.to_dict() for result in self.results},
+        }
+
+
+def check_regressions(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2
+) -> List[str]:
+    """
+    Compare a benchmark report to a baseline report of the same size.
+
+    Args:
+        report: Report returned by `BenchmarkSuite.report`
+        baseline: Previously saved report
+        tolerance: Allowed relative throughput drop / peak memory growth
+
+    Returns:
+        List of regression descriptions, empty when within the thresholds
+    """
+    if baseline.get("size") != report.get("size"):
+        return [
+            f"Baseline size {baseline.get('size')} does not match {report.get('size')}"
+        ]
+    regressions = []
+    for stage, result in report["stages"].items():
+        reference = baseline["stages"].get(stage)
+        if reference is None or result["skipped"] or reference["skipped"]:
+            continue
+        if result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: throughput {result['throughput']:.1f} {result['unit']}/s "
+                f"< baseline {reference['throughput']:.1f} {reference['unit']}/s"
+            )
+        if (
+            result["peak_memory_bytes"] is not None
+            and reference["peak_memory_bytes"]
+            and result["peak_memory_bytes"]
+            > reference["peak_memory_bytes"] * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{stage}: peak memory {result['peak_memory_bytes'] / 2**20:.1f} MiB "
+                f"> baseline {reference['peak_memory_bytes'] / 2**20:.1f} MiB"
+            )
+    return regressions
@@ -1,41 +1,81 @@
+import json
 import os
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Optional, Type
+from typing import TYPE_CHECKING, Optional, Type, Union
 
 import click
 from loguru import logger
 
-from Docs2KG.digitization.image.pdf_docling import PDFDocling
-from Docs2KG.digitization.native.ebook import EPUBDigitization
-from Docs2KG.digitization.native.html_parser import HTMLDocling
-from Docs2KG.digitization.native.word_docling import DOCXMammoth
-from Docs2KG.kg_construction.layout_kg.layout_kg import LayoutKGConstruction
-from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
-    NERLLMPromptExtractor,
-)
-from Docs2KG.kg_construction.semantic_kg.ner.ner_spacy_match import NERSpacyMatcher
+from Docs2KG.agents.metrics import RUN_METRICS
+from Docs2KG.benchmark import SIZES
+from Docs2KG.digitization import registry
 from Docs2KG.utils.config import PROJECT_CONFIG
-from Docs2KG.utils.neo4j_loader import Neo4jTransformer
+from Docs2KG.utils.timer import PROFILER, timer
+
+if TYPE_CHECKING:
+    from Docs2KG.digitization.source import DocumentSource
+
+# The processors, KG constructors and backends are imported inside the commands
+# that use them, so the CLI starts without loading docling, spacy, pandas, ...
 
 
 class DocumentProcessor:
-    PROCESSORS = {
-        ".pdf": PDFDocling,
-        ".docx": DOCXMammoth,
-        ".html": HTMLDocling,
-        ".epub": EPUBDigitization,
-    }
+    PROCESSORS = registry.PROCESSORS
 
     @classmethod
     def get_processor(cls, file_path: Path) -> Optional[Type]:
         """Get the appropriate processor for the file type."""
-        return cls.PROCESSORS.get(file_path.suffix.lower())
+        return registry.get_processor_class(file_path)
 
     @classmethod
     def get_supported_formats(cls) -> str:
         """Get a string of supported file formats."""
-        return ", ".join(cls.PROCESSORS.keys())
+        return ", ".join(registry.supported_suffixes())
+
+
+def export_run_metrics(project_id: str):
+    """Log the agent telemetry of this run and export it to the project folder."""
+    summary = RUN_METRICS.summary()
+    totals = summary["totals"]
+    if not totals["calls"]:
+        return
+    logger.info(
+        f"Agent calls: {totals['calls']} ({totals['errors']} failed, "
+        f"{totals['cache_hits']} prefix cache hits), "
+        f"tokens: {totals['prompt_tokens']} prompt / "
+        f"{totals['completion_tokens']} completion"
+    )
+    for entry in summary["stages"]:
+        latency = entry["latency_seconds"]
+        logger.info(
+            f"  {entry['stage']} on {entry['backend']}: {entry['calls']} calls, "
+            f"p50 {latency['p50']:.3f}s, p99 {latency['p99']:.3f}s"
+        )
+    RUN_METRICS.export(
+        PROJECT_CONFIG.data.output_dir / "projects" / project_id / "metrics"
+    )
+
+
+def start_profiling(trace_memory: bool):
+    """Start a fresh profile for this run, optionally tracking peak memory."""
+    PROFILER.enable()
+    if trace_memory:
+        PROFILER.enable_memory_tracing()
+
+
+def export_run_profile(project_id: str):
+    """Log the slowest stages of this run and export its profile and trace."""
+    for stage in PROFILER.report()["stages"][:10]:
+        logger.info(
+            f"  [{stage['category']}] {stage['name']}: {stage['count']}x, "
+            f"{stage['total_seconds']:.3f}s total, {stage['self_seconds']:.3f}s self"
+        )
+    report_path, trace_path = PROFILER.export(
+        PROJECT_CONFIG.data.output_dir / "projects" / project_id / "profile"
+    )
+    logger.info(f"Profile written to {report_path}, trace to {trace_path}")
 
 
 @click.group()
@@ -53,9 +93,12 @@ def cli():
 
 
 def process_single_file(
-    file_path: Path, project_id: str, agent_name: str, agent_type: str
+    file_path: Union[Path, "DocumentSource"],
+    project_id: str,
+    agent_name: str,
+    agent_type: str,
 ):
-    """Process a single document file."""
+    """Process a single document file, or a DocumentSource read from an archive."""
     processor_class = DocumentProcessor.get_processor(file_path)
     if not processor_class:
         supported_formats = DocumentProcessor.get_supported_formats()
@@ -64,27 +107,72 @@ def process_single_file(
             f"Supported formats are: {supported_formats}"
         )
 
-    # Step 1: Process document
-    processor = processor_class(file_path=file_path)
-    processor.process()
+    with timer(
+        logger,
+        "Processing document",
+        category="document",
+        args={"file": file_path.name},
+    ):
+        _process_single_file(
+            file_path, processor_class, project_id, agent_name, agent_type
+        )
+
 
-    # Step 2: Get markdown file path
-    md_files = (
-        PROJECT_CONFIG.data.output_dir
-        / file_path.stem
-        / processor_class.__name__
-        / f"{file_path.stem}.md"
+def _process_single_file(
+    file_path: Union[Path, "DocumentSource"],
+    processor_class: Type,
+    project_id: str,
+    agent_name: str,
+    agent_type: str,
+):
+    from Docs2KG.digitization.store import digitize
+    from Docs2KG.kg_construction.layout_kg.layout_kg import LayoutKGConstruction
+    from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
+        NERLLMPromptExtractor,
     )
+    from Docs2KG.kg_construction.semantic_kg.ner.ner_spacy_match import NERSpacyMatcher
+
+    # Step 1: Process document, or reuse the outputs of an identical one
+    with timer(None, f"Digitizing with {processor_class.__name__}", "digitization"):
+        processor, md_files = digitize(file_path, processor_class)
 
+    # Step 2: Check the markdown file
     if not md_files.exists():
         logger.error(f"Markdown file not found: {md_files}")
         raise click.ClickException("Document processing failed")
 
-    # Step 3: Construct Layout KG
-    layout_kg_construction = LayoutKGConstruction(project_id)
-    layout_kg_construction.construct(
-        [{"content": md_files.read_text(), "filename": md_files.stem}]
-    )
+    # Step 3: Construct Layout KG, from the Docling document when the processor
+    # kept or saved one, which skips re-parsing the markdown
+    docling_document = getattr(processor, "document", None)
+    docling_path = md_files.with_suffix(".docling.json")
+    if docling_document is None and docling_path.exists():
+        from docling_core.types.doc import DoclingDocument
+
+        docling_document = DoclingDocument.model_validate_json(
+            docling_path.read_text(encoding="utf-8")
+        )
+    with timer(None, "Layout KG construction", category="layout"):
+        layout_kg_construction = LayoutKGConstruction(project_id)
+        if docling_document is not None:
+            layout_kg_construction.construct(
+                [
+                    {
+                        "document": docling_document,
+                        "filename": md_files.stem,
+                        "source": str(file_path),
+                    }
+                ]
+            )
+        else:
+            layout_kg_construction.construct(
+                [
+                    {
+                        "content": md_files.read_text(),
+                        "filename": md_files.stem,
+                        "source": str(file_path),
+                    }
+                ]
+            )
 
     # Step 4: Get JSON file path
     example_json = (
@@ -92,7 +180,7 @@ def process_single_file(
         / "projects"
         / project_id
         / "layout"
-        / f"{file_path.stem}.json"
+        / f"{md_files.stem}.json"
     )
 
     if not example_json.exists():
@@ -100,14 +188,16 @@ def process_single_file(
         raise click.ClickException("Layout KG construction failed")
 
     # Step 5: Extract entities
-    entity_extractor = NERSpacyMatcher(project_id)
-    entity_extractor.construct_kg([example_json])
+    with timer(None, "Spacy NER", category="ner"):
+        entity_extractor = NERSpacyMatcher(project_id)
+        entity_extractor.construct_kg([example_json])
 
     # Step 6: Extract via prompt-based NER
-    ner_extractor = NERLLMPromptExtractor(
-        project_id=project_id, agent_name=agent_name, agent_type=agent_type
-    )
-    ner_extractor.construct_kg([example_json])
+    with timer(None, "LLM prompt NER", category="ner"):
+        ner_extractor = NERLLMPromptExtractor(
+            project_id=project_id, agent_name=agent_name, agent_type=agent_type
+        )
+        ner_extractor.construct_kg([example_json])
 
     logger.info(f"Successfully processed {file_path.name}")
 
@@ -132,21 +222,41 @@ def process_single_file(
     default="ollama",
     help="Type of the agent to use for NER extraction",
 )
-def process_document(file_path, project_id, agent_name, agent_type):
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Export a per-stage profile and Chrome trace of the run",
+)
+@click.option(
+    "--trace-memory",
+    is_flag=True,
+    default=False,
+    help="Also record the peak memory of each stage (slower)",
+)
+def process_document(
+    file_path, project_id, agent_name, agent_type, profile, trace_memory
+):
     """Process a single document file.
 
     FILE_PATH: Path to the document file (PDF, DOCX, HTML, or EPUB)
     """
     file_path = Path(file_path)
     logger.info(f"Processing document: {file_path}")
-    process_single_file(file_path, project_id, agent_name, agent_type)
+    start_profiling(trace_memory)
+    try:
+        process_single_file(file_path, project_id, agent_name, agent_type)
+    finally:
+        export_run_metrics(project_id)
+        if profile:
+            export_run_profile(project_id)
 
 
 @cli.command()
 @click.argument(
     "input_dir",
     type=click.Path(exists=True),
-    default=PROJECT_CONFIG.data.input_dir.as_posix(),
+    required=False,
 )
 @click.option(
     "--project-id",
@@ -159,6 +269,18 @@ def process_document(file_path, project_id, agent_name, agent_type):
     "-f",
     help='Comma-separated list of file formats to process (e.g., "pdf,docx,html")',
 )
+@click.option(
+    "--recursive",
+    "-R",
+    is_flag=True,
+    default=False,
+    help="Also process the documents of sub directories",
+)
+@click.option(
+    "--archives/--no-archives",
+    default=True,
+    help="Process the documents inside zip and tar archives",
+)
 @click.option(
     "--agent-name",
     "-n",
@@ -171,17 +293,42 @@ def process_document(file_path, project_id, agent_name, agent_type):
     default="ollama",
     help="Type of the agent to use for NER extraction",
 )
-def batch_process(input_dir, project_id, formats, agent_name, agent_type):
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Export a per-stage profile and Chrome trace of the run",
+)
+@click.option(
+    "--trace-memory",
+    is_flag=True,
+    default=False,
+    help="Also record the peak memory of each stage (slower)",
+)
+def batch_process(
+    input_dir,
+    project_id,
+    formats,
+    recursive,
+    archives,
+    agent_name,
+    agent_type,
+    profile,
+    trace_memory,
+):
     """Process all supported documents in a directory.
 
-    INPUT_DIR: Directory containing documents to process
+    INPUT_DIR: Directory or zip/tar archive containing documents to process,
+    defaults to the configured input directory
     """
-    input_dir = Path(input_dir)
+    from Docs2KG.digitization.ingest import iter_documents
+
+    input_dir = Path(input_dir) if input_dir else PROJECT_CONFIG.data.input_dir
 
     # Filter formats if specified
     if formats:
         allowed_formats = {f".{fmt.lower().strip()}" for fmt in formats.split(",")}
-        supported_formats = set(DocumentProcessor.PROCESSORS.keys())
+        supported_formats = set(registry.supported_suffixes())
         invalid_formats = allowed_formats - supported_formats
         if invalid_formats:
             raise click.ClickException(
@@ -189,30 +336,454 @@ def batch_process(input_dir, project_id, formats, agent_name, agent_type):
                 f"Supported formats are: {DocumentProcessor.get_supported_formats()}"
             )
     else:
-        allowed_formats = set(DocumentProcessor.PROCESSORS.keys())
-
-    # Find all files with supported extensions
-    files_to_process = []
-    for ext in allowed_formats:
-        files_to_process.extend(input_dir.glob(f"*{ext}"))
+        allowed_formats = set(registry.supported_suffixes())
+
+    start_profiling(trace_memory)
+
+    # Documents are found by their sniffed format, so misnamed or
+    # extension-less files are picked up too. Archive members are streamed one
+    # at a time, never extracted to disk
+    processed = 0
+    for source in iter_documents(
+        input_dir, recursive=recursive, archives=archives, formats=allowed_formats
+    ):
+        processed += 1
+        try:
+            process_single_file(source, project_id, agent_name, agent_type)
+        except Exception as e:
+            logger.error(f"Error processing {source}: {str(e)}")
+            continue
 
-    if not files_to_process:
+    if not processed:
         logger.warning(
             f"No supported documents found in {input_dir}. "
             f"Looking for: {', '.join(allowed_formats)}"
         )
         return
 
-    logger.info(f"Found {len(files_to_process)} documents to process")
+    logger.info(f"Processed {processed} documents")
+    logger.info("Batch processing completed")
+    export_run_metrics(project_id)
+    if profile:
+        export_run_profile(project_id)
 
-    for file_path in files_to_process:
-        try:
-            process_single_file(file_path, project_id, agent_name, agent_type)
-        except Exception as e:
-            logger.error(f"Error processing {file_path.name}: {str(e)}")
+
+@cli.command()
+@click.argument("urls", nargs=-1)
+@click.option("--sitemap", "-s", multiple=True, help="Sitemap URL to crawl")
+@click.option(
+    "--url-file",
+    type=click.Path(exists=True),
+    help="File with one URL per line",
+)
+@click.option(
+    "--max-connections", default=8, help="Maximum number of concurrent requests"
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Download and convert every page, even unchanged ones",
+)
+@click.option(
+    "--no-convert",
+    is_flag=True,
+    default=False,
+    help="Only fetch the pages into the cache",
+)
+def crawl(urls, sitemap, url_file, max_connections, force, no_convert):
+    """Fetch web pages concurrently and convert the new and changed ones.
+
+    URLS: Pages to crawl, in addition to --sitemap and --url-file
+    """
+    from Docs2KG.digitization.native.html_crawler import HTMLCrawler
+
+    crawler = HTMLCrawler(max_connections=max_connections)
+    page_urls = list(urls)
+    if url_file:
+        page_urls.extend(
+            line.strip() for line in Path(url_file).read_text().splitlines()
+        )
+    for sitemap_url in sitemap:
+        page_urls.extend(crawler.expand_sitemap(sitemap_url))
+    page_urls = [url for url in page_urls if url and not url.startswith("#")]
+    if not page_urls:
+        raise click.ClickException("No URL to crawl")
+
+    results = crawler.crawl(page_urls, convert=not no_convert, force=force)
+    for result in results:
+        click.echo(f"{result.status:<10} {result.url} {result.markdown_path or ''}")
+    if any(result.status == "failed" for result in results):
+        raise click.ClickException("Some URLs could not be fetched")
+
+
+@cli.command()
+@click.argument("project_id", type=str)
+@click.option(
+    "--agent-name",
+    "-n",
+    default="gpt-4o-mini",
+    help="Name of the cloud model to use for NER extraction",
+)
+@click.option(
+    "--poll-interval",
+    default=60.0,
+    type=float,
+    help="Seconds to wait between batch status checks",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Run the batch against the local stub endpoint instead of the API",
+)
+def ner_batch(project_id, agent_name, poll_interval, dry_run):
+    """Re-extract entities for all layout KGs of a project via the Batch API.
+
+    PROJECT_ID: Project whose layout knowledge graphs will be processed
+    """
+    layout_dir = PROJECT_CONFIG.data.output_dir / "projects" / project_id / "layout"
+    layout_files = [
+        file_path
+        for file_path in layout_dir.glob("*.json")
+        if file_path.name != "schema.json"
+    ]
+    if not layout_files:
+        logger.warning(f"No layout knowledge graphs found in {layout_dir}")
+        return
+
+    from Docs2KG.agents.batch_stub import LocalBatchClient
+    from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
+        NERLLMPromptExtractor,
+    )
+
+    kwargs = {"client": LocalBatchClient()} if dry_run else {}
+    ner_extractor = NERLLMPromptExtractor(
+        project_id=project_id, agent_name=agent_name, agent_type="cloud", **kwargs
+    )
+    batch_id = ner_extractor.construct_kg_batch(
+        layout_files, poll_interval=poll_interval
+    )
+    logger.info(f"Batch {batch_id} merged into {len(layout_files)} layout KGs")
+
+
+@cli.command()
+@click.option(
+    "--size",
+    "-s",
+    type=click.Choice(list(SIZES)),
+    default="small",
+    help="Size of the synthetic corpus",
+)
+@click.option(
+    "--baseline",
+    "-b",
+    type=click.Path(exists=True),
+    help="Previous benchmark report to check for regressions against",
+)
+@click.option(
+    "--tolerance",
+    default=0.2,
+    help="Allowed relative throughput drop or peak memory growth per stage",
+)
+@click.option(
+    "--report",
+    "-r",
+    type=click.Path(),
+    help="Where to write the report, defaults to <output_dir>/benchmark/",
+)
+@click.option("--seed", default=0, help="Seed of the synthetic corpus")
+def benchmark(size, baseline, tolerance, report, seed):
+    """Benchmark every pipeline stage on a synthetic corpus."""
+    from Docs2KG.benchmark.suite import BenchmarkSuite, check_regressions
+
+    with tempfile.TemporaryDirectory(prefix="docs2kg-benchmark-") as workdir:
+        suite = BenchmarkSuite(Path(workdir), size=size, seed=seed)
+        suite.run()
+    result = suite.report()
+
+    for stage, stage_result in result["stages"].items():
+        if stage_result["skipped"]:
+            click.echo(f"{stage:<28} skipped ({stage_result['skipped']})")
             continue
+        peak = stage_result["peak_memory_bytes"] or 0
+        click.echo(
+            f"{stage:<28} {stage_result['seconds']:>8.3f}s "
+            f"{stage_result['throughput']:>12.1f} {stage_result['unit']}/s "
+            f"{peak / 2**20:>8.1f} MiB peak"
+        )
 
-    logger.info("Batch processing completed")
+    report_path = (
+        Path(report)
+        if report
+        else PROJECT_CONFIG.data.output_dir / "benchmark" / f"benchmark_{size}.json"
+    )
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(result, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+    if baseline:
+        regressions = check_regressions(
+            result, json.loads(Path(baseline).read_text()), tolerance
+        )
+        if regressions:
+            raise click.ClickException(
+                "Performance regressions:\n" + "\n".join(regressions)
+            )
+        click.echo(f"No regression against {baseline} (tolerance {tolerance:.0%})")
+
+
+@cli.command()
+@click.argument("input_dir", type=click.Path(exists=True))
+@click.option(
+    "--profiles",
+    default="text-only,tables,full",
+    help="Comma-separated PDF pipeline profiles to compare",
+)
+@click.option("--limit", default=10, help="Maximum number of PDFs to convert")
+def pdf_profile_benchmark(input_dir, profiles, limit):
+    """Compare pages/sec and peak RSS of the PDF pipeline profiles.
+
+    INPUT_DIR: Directory with sample PDFs
+    """
+    from Docs2KG.benchmark.pdf_profiles import (
+        benchmark_pdf_profiles,
+        format_profile_table,
+    )
+
+    pdf_paths = sorted(Path(input_dir).glob("*.pdf"))[:limit]
+    if not pdf_paths:
+        raise click.ClickException(f"No PDF found in {input_dir}")
+    profile_names = [profile.strip() for profile in profiles.split(",")]
+    for profile in profile_names:
+        try:
+            PROJECT_CONFIG.pdf.get_profile(profile)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    rows = benchmark_pdf_profiles(pdf_paths, profile_names)
+    click.echo(format_profile_table(rows))
+
+    report_path = PROJECT_CONFIG.data.output_dir / "benchmark" / "pdf_profiles.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(rows, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+
+@cli.command()
+@click.argument("input_dir", type=click.Path(exists=True))
+@click.option("--limit", default=5, help="Maximum number of PDFs to convert")
+@click.option("--repeat", default=3, help="Runs per path, the fastest is reported")
+def layout_benchmark(input_dir, limit, repeat):
+    """Compare building the layout KG from Docling documents and from markdown.
+
+    INPUT_DIR: Directory with sample PDFs
+    """
+    from Docs2KG.benchmark.layout_paths import compare_layout_paths, format_layout_table
+    from Docs2KG.digitization.image.pdf_docling import PDFDocling
+
+    pdf_paths = sorted(Path(input_dir).glob("*.pdf"))[:limit]
+    if not pdf_paths:
+        raise click.ClickException(f"No PDF found in {input_dir}")
+
+    documents, conversion_paths = {}, {}
+    for pdf_path in pdf_paths:
+        # converted as configured, every conversion path keeps the document
+        processor = PDFDocling(pdf_path)
+        processor.process()
+        documents[pdf_path.stem] = processor.document
+        conversion_paths[pdf_path.stem] = processor.conversion_path
+
+    rows = compare_layout_paths(documents, "benchmark", repeat, conversion_paths)
+    click.echo(format_layout_table(rows))
+
+    report_path = PROJECT_CONFIG.data.output_dir / "benchmark" / "layout_paths.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(rows, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+
+@cli.command()
+@click.option("--pages", default=3, help="Number of synthetic scraped pages")
+@click.option("--size-kb", default=2048, help="Size of each page in kilobytes")
+@click.option("--repeat", default=3, help="Runs per page, the fastest is reported")
+def html_benchmark(pages, size_kb, repeat):
+    """Compare the single-pass HTML cleaner with the previous implementation."""
+    from Docs2KG.benchmark.html_cleaning import (
+        benchmark_html_cleaning,
+        format_html_table,
+    )
+
+    rows = benchmark_html_cleaning(pages=pages, size_kb=size_kb, repeat=repeat)
+    click.echo(format_html_table(rows))
+
+    report_path = PROJECT_CONFIG.data.output_dir / "benchmark" / "html_cleaning.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(rows, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+
+@cli.command()
+@click.option(
+    "--rows",
+    "-r",
+    multiple=True,
+    type=int,
+    help="Number of metadata rows, repeatable, defaults to 10k, 100k and 1M",
+)
+@click.option(
+    "--legacy-max-rows",
+    default=1_000_000,
+    help="Skip the iterrows implementation on larger tables",
+)
+def metadata_benchmark(rows, legacy_max_rows):
+    """Compare the columnar metadata KG construction with iterrows."""
+    from Docs2KG.benchmark.metadata_kg import (
+        METADATA_ROWS,
+        benchmark_metadata_kg,
+        format_metadata_table,
+    )
+
+    results = benchmark_metadata_kg(
+        sizes=rows or METADATA_ROWS, legacy_max_rows=legacy_max_rows
+    )
+    click.echo(format_metadata_table(results))
+
+    report_path = PROJECT_CONFIG.data.output_dir / "benchmark" / "metadata_kg.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(results, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+
+@cli.command()
+@click.option(
+    "--agent-name",
+    "-n",
+    default="phi3.5",
+    help="Name of the agent to send the NER prompts to",
+)
+@click.option(
+    "--agent-type",
+    "-t",
+    default="ollama",
+    help="Type of the agent, one with a prompt cache (ollama or quantization)",
+)
+@click.option("--samples", default=20, help="Text chunks sent in each run")
+def prefix_cache_benchmark(agent_name, agent_type, samples):
+    """Compare the time to first token of NER prompts with the static block
+    first and cached against the static block last."""
+    from Docs2KG.benchmark.prefix_cache import (
+        benchmark_prefix_cache,
+        format_prefix_cache_table,
+    )
+
+    report = benchmark_prefix_cache(agent_name, agent_type, samples=samples)
+    click.echo(format_prefix_cache_table(report))
+
+    report_path = PROJECT_CONFIG.data.output_dir / "benchmark" / "prefix_cache.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2))
+    click.echo(f"Report written to {report_path}")
+
+
+@cli.command()
+@click.option(
+    "--budget",
+    default=0.5,
+    help="Maximum time in seconds to import the CLI",
+)
+@click.option("--runs", default=3, help="Number of fresh interpreters to time")
+def startup_benchmark(budget, runs):
+    """Check the CLI import time against a budget with python -X importtime."""
+    from Docs2KG.benchmark.startup import check_startup_budget, measure_import_time
+
+    result = measure_import_time("Docs2KG.cli", runs=runs)
+    click.echo(f"Docs2KG.cli imported in {result['seconds']:.3f}s")
+    for item in result["slowest_imports"]:
+        click.echo(f"  {item['module']:<40} {item['cumulative_seconds']:.3f}s")
+
+    violations = check_startup_budget(result, budget)
+    if violations:
+        raise click.ClickException("\n".join(violations))
+    click.echo(f"Within the {budget:.3f}s startup budget")
+
+
+@cli.command()
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--project-id",
+    "-p",
+    default="default",
+    help="Project ID for the knowledge graph construction",
+)
+@click.option(
+    "--id-column", "-i", default="name", help="Column containing the document IDs"
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Read the CSV in chunks and write NDJSON/Parquet records incrementally",
+)
+@click.option("--chunk-size", default=100_000, help="Rows per chunk when streaming")
+@click.option(
+    "--sample-rows",
+    default=100_000,
+    help="Rows used to infer the column types when streaming",
+)
+@click.option(
+    "--dtype",
+    "-d",
+    multiple=True,
+    help='Dtype of a column when streaming, as column=dtype (e.g. "year=Int64")',
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["ndjson", "parquet"]),
+    default="ndjson",
+    help="Format of the streamed records, parquet needs pyarrow",
+)
+def metadata_kg(
+    csv_path,
+    project_id,
+    id_column,
+    stream,
+    chunk_size,
+    sample_rows,
+    dtype,
+    output_format,
+):
+    """Construct the metadata KG of a document metadata CSV.
+
+    CSV_PATH: One row per document, categorical columns become metadata nodes
+    """
+    from Docs2KG.kg_construction.metadata_kg.metadata_kg import MetadataKGConstruction
+
+    construction = MetadataKGConstruction(project_id)
+    if not stream:
+        construction.construct(Path(csv_path), document_id_column=id_column)
+        return
+
+    dtypes = {}
+    for item in dtype:
+        column, separator, column_dtype = item.partition("=")
+        if not separator:
+            raise click.ClickException(f"Expected column=dtype, got {item}")
+        dtypes[column] = column_dtype
+    with timer(logger, "Streaming metadata KG construction", category="metadata"):
+        result = construction.construct_stream(
+            csv_path,
+            document_id_column=id_column,
+            chunk_size=chunk_size,
+            sample_rows=sample_rows,
+            dtype=dtypes or None,
+            output_format=output_format,
+        )
+    click.echo(
+        f"{result['rows']} rows: {result['node_count']} nodes in "
+        f"{result['nodes']}, {result['relationship_count']} relationships in "
+        f"{result['relationships']}"
+    )
 
 
 @cli.command()
@@ -367,6 +938,8 @@ volumes:
         logger.info("Neo4j container is stopping")
         return
 
+    from Docs2KG.utils.neo4j_loader import Neo4jTransformer
+
     # Initialize Neo4j transformer
     transformer = Neo4jTransformer(
         project_id=project_id,
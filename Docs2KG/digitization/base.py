@@ -3,11 +3,12 @@ Base class for digitization methods that handles conversion of various input for
 into standardized digital representations.
 """
 
-import json
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 
+from Docs2KG.digitization.source import DocumentSource
+from Docs2KG.digitization.writer import OutputWriter
 from Docs2KG.utils.config import PROJECT_CONFIG
 
 
@@ -28,13 +29,40 @@ class DigitizationBase(ABC):
 
     def __init__(
         self,
-        file_path: Path,
+        file_path: Union[Path, DocumentSource, bytes, BinaryIO],
         supported_formats: Optional[List[str]] = None,
     ):
-        self.file_path = file_path
-        self.filename = file_path.stem
+        """
+        Args:
+            file_path: Path of the document, or a DocumentSource, bytes or
+                binary file object for documents that are not local files
+            supported_formats: Formats the agent can process, e.g. ["pdf"]
+        """
+        self.input_source = DocumentSource.of(file_path)
+        # the name of in-memory documents stands in for their path in messages
+        self.file_path = self.input_source.path or Path(self.input_source.name)
+        self.filename = self.input_source.stem
         self.name = self.__class__.__name__
         self.supported_formats = supported_formats or []
+        self._writer: Optional[OutputWriter] = None
+
+    @property
+    def writer(self) -> OutputWriter:
+        """
+        Writer of the output folder of the document, created on first use.
+
+        It is created again only if the document name changes (see
+        `Docs2KG.digitization.store.digitize`).
+
+        Returns:
+            OutputWriter
+        """
+        output_dir = Path(PROJECT_CONFIG.data.output_dir) / self.filename / self.name
+        if self._writer is None or self._writer.output_dir != output_dir:
+            self._writer = OutputWriter(
+                output_dir, fsync=PROJECT_CONFIG.data.output_fsync
+            )
+        return self._writer
 
     @property
     def output_dir(self) -> Path:
@@ -44,15 +72,7 @@ class DigitizationBase(ABC):
         Returns:
             str: Output directory path
         """
-        output_dir_path = PROJECT_CONFIG.data.output_dir
-        # based on the filename, we will create a folder
-        output_dir = Path(output_dir_path) / self.filename / self.name
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # create a sub folder for images
-        images_dir = output_dir / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        return output_dir
+        return self.writer.output_dir
 
     @abstractmethod
     def process(self, input_data: Any) -> Union[Dict, Any]:
@@ -72,22 +92,13 @@ class DigitizationBase(ABC):
         raise NotImplementedError("Each digitization agent must implement process()")
 
     def export_content_to_markdown_file(self, text: str) -> Path:
-        with open(self.output_dir / f"{self.filename}.md", "w") as f:
-            f.write(text)
-
-        return self.output_dir / f"{self.filename}.md"
+        return self.writer.write_text(f"{self.filename}.md", text)
 
     def export_table_to_json_file(self, data: Dict) -> Path:
-        with open(self.output_dir / f"{self.filename}_table.json", "w") as f:
-            f.write(json.dumps(data, indent=4))
-
-        return self.output_dir / f"{self.filename}_table.json"
+        return self.writer.write_json(f"{self.filename}_table.json", data)
 
     def export_images_to_json_file(self, data: Dict) -> Path:
-        with open(self.output_dir / f"{self.filename}_images.json", "w") as f:
-            f.write(json.dumps(data, indent=4))
-
-        return self.output_dir / f"{self.filename}_images.json"
+        return self.writer.write_json(f"{self.filename}_images.json", data)
 
     def validate_input(self, input_data: Any) -> bool:
         """
@@ -101,6 +112,18 @@ class DigitizationBase(ABC):
         """
         return True  # Base implementation accepts all formats
 
+    def validate_source(self) -> bool:
+        """
+        Check the document exists and its sniffed format is one of the
+        supported formats, whatever its file name says.
+
+        Returns:
+            bool: True if the document can be processed by this agent
+        """
+        if not self.input_source.exists():
+            return False
+        return self.input_source.format.lstrip(".") in self.supported_formats
+
     def get_agent_info(self) -> Dict[str, Any]:
         """
         Get information about the digitization agent.
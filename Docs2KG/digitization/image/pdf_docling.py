@@ -1,16 +1,296 @@
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from docling.datamodel.base_models import InputFormat
+import pypdfium2 as pdfium
+from docling.datamodel.base_models import DocumentStream, InputFormat
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling_core.types.doc import ImageRefMode
+from docling_core.types.doc import DoclingDocument, ImageRefMode
 from loguru import logger
 
 from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.native.pdf_text_layer import PDFTextLayer
+from Docs2KG.digitization.source import DocumentSource
+from Docs2KG.digitization.writer import OutputWriter
 from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.timer import timer
 
-IMAGE_RESOLUTION_SCALE = 2.0
+# converter of a shard worker process, built once per worker
+_WORKER_CONVERTER: Optional[DocumentConverter] = None
+# Docling document saved next to the markdown
+DOCLING_DOCUMENT_SUFFIX = ".docling.json"
+# item lists of an exported Docling document, referenced as "#/<list>/<index>"
+DOCUMENT_ITEM_ARRAYS = ("groups", "texts", "pictures", "tables", "key_value_items")
+
+
+def build_pdf_converter(profile: Optional[str] = None) -> DocumentConverter:
+    """
+    Build a Docling converter for a pipeline profile of the pdf config.
+
+    Args:
+        profile: Profile name (text-only, tables, full, ...), defaults to the
+            configured one
+
+    Returns:
+        DocumentConverter
+    """
+    pipeline_profile = PROJECT_CONFIG.pdf.get_profile(profile)
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = pipeline_profile.do_ocr
+    pipeline_options.do_table_structure = pipeline_profile.do_table_structure
+    pipeline_options.images_scale = pipeline_profile.images_scale
+    pipeline_options.generate_page_images = pipeline_profile.generate_page_images
+    pipeline_options.generate_picture_images = pipeline_profile.generate_picture_images
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
+
+
+def open_pdf(pdf: Union[Path, bytes]) -> pdfium.PdfDocument:
+    """Open a PDF file, or a PDF held in memory, with pypdfium2."""
+    return pdfium.PdfDocument(pdf if isinstance(pdf, bytes) else str(pdf))
+
+
+def count_pdf_pages(file_path: Union[Path, bytes]) -> int:
+    pdf = open_pdf(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def split_pdf(
+    file_path: Union[Path, bytes],
+    shard_dir: Path,
+    shard_pages: int,
+    pages: Optional[List[int]] = None,
+) -> List[Tuple[Path, List[int]]]:
+    """
+    Split a PDF, or some of its pages, into files of at most `shard_pages` pages.
+
+    Args:
+        file_path: PDF to split, or its content
+        shard_dir: Folder to write the shards to
+        shard_pages: Maximum number of pages per shard
+        pages: Zero based indices of the pages to split, defaults to all
+
+    Returns:
+        List of (shard path, page numbers of its pages), pages numbered from 1
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    pdf = open_pdf(file_path)
+    shards = []
+    try:
+        pages = list(range(len(pdf))) if pages is None else pages
+        for start in range(0, len(pages), shard_pages):
+            shard_page_indices = pages[start : start + shard_pages]
+            shard = pdfium.PdfDocument.new()
+            shard.import_pages(pdf, shard_page_indices)
+            shard_path = shard_dir / f"shard_{len(shards):04d}.pdf"
+            shard.save(str(shard_path))
+            shard.close()
+            shards.append((shard_path, [index + 1 for index in shard_page_indices]))
+    finally:
+        pdf.close()
+    return shards
+
+
+def extract_pages(
+    file_path: Union[Path, bytes], pages: List[int], output_path: Path
+) -> Path:
+    """
+    Copy some pages of a PDF into a new PDF.
+
+    Args:
+        file_path: Source PDF, or its content
+        pages: Zero based page indices
+        output_path: PDF to write
+
+    Returns:
+        Path: output_path
+    """
+    pdf = open_pdf(file_path)
+    try:
+        extract = pdfium.PdfDocument.new()
+        extract.import_pages(pdf, pages)
+        extract.save(str(output_path))
+        extract.close()
+    finally:
+        pdf.close()
+    return output_path
+
+
+def document_to_markdown(document, writer: OutputWriter, images_dir: str) -> str:
+    """
+    Render a Docling document to markdown, with its images committed through
+    the writer of the output folder.
+
+    Docling writes the markdown and images in place, so they are rendered in a
+    temporary folder first and the images are then written atomically under
+    `images_dir`, replacing (never writing through) pooled hard links. Pictures
+    already saved to files, e.g. by the shard workers, are committed the same
+    way and the document is pointed at the committed files.
+
+    Args:
+        document: Docling document
+        writer: Writer of the output folder
+        images_dir: Folder of the images, relative to the output folder
+
+    Returns:
+        str: Markdown referencing the committed images
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        markdown_path = Path(tmp_dir) / "document.md"
+        artifacts_dir = Path(tmp_dir) / "images"
+        document.save_as_markdown(
+            markdown_path,
+            image_mode=ImageRefMode.REFERENCED,
+            artifacts_dir=artifacts_dir,
+        )
+        markdown = markdown_path.read_text(encoding="utf-8")
+        for image_path in sorted(artifacts_dir.rglob("*")):
+            if not image_path.is_file():
+                continue
+            relative_path = Path(images_dir) / image_path.relative_to(artifacts_dir)
+            target = writer.write_bytes(
+                relative_path.as_posix(), image_path.read_bytes()
+            )
+            markdown = markdown.replace(str(image_path), str(target))
+    for picture in document.pictures:
+        image_path = picture.image.uri if picture.image is not None else None
+        if not isinstance(image_path, Path) or not image_path.is_file():
+            continue
+        # file names carry a hash of the image, so shards do not clash
+        target = writer.write_bytes(
+            f"{images_dir}/{image_path.name}", image_path.read_bytes()
+        )
+        markdown = markdown.replace(str(image_path), str(target))
+        picture.image.uri = target
+    return markdown
+
+
+def _renumber(value: Any, offsets: Dict[str, int], page_numbers: Optional[List[int]]):
+    if isinstance(value, list):
+        return [_renumber(item, offsets, page_numbers) for item in value]
+    if not isinstance(value, dict):
+        return value
+    renumbered = {}
+    for key, item in value.items():
+        if key in ("$ref", "self_ref") and isinstance(item, str):
+            _, array, *index = item.split("/")
+            if array in offsets and index:
+                item = f"#/{array}/{int(index[0]) + offsets[array]}"
+        elif key == "page_no" and page_numbers and isinstance(item, int):
+            item = page_numbers[item - 1]
+        else:
+            item = _renumber(item, offsets, page_numbers)
+        renumbered[key] = item
+    return renumbered
+
+
+class DocumentMerger:
+    """
+    Join the Docling documents of parts of a PDF into the document of the PDF.
+
+    Parts are appended in page order as they become available, so only the
+    joined document is held, not every part.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Name of the document
+        """
+        self.merged = DoclingDocument(name=name).export_to_dict()
+
+    def append(
+        self, part: Dict[str, Any], page_numbers: Optional[List[int]] = None
+    ) -> None:
+        """
+        Append the next part.
+
+        Args:
+            part: Dict export of the Docling document of the part
+            page_numbers: Page number, in the PDF, of each page of the part (its
+                page n is page_numbers[n - 1]), None when the part is numbered
+                as the PDF already
+        """
+        merged = self.merged
+        offsets = {array: len(merged[array]) for array in DOCUMENT_ITEM_ARRAYS}
+        for array in DOCUMENT_ITEM_ARRAYS:
+            merged[array].extend(_renumber(part.get(array, []), offsets, page_numbers))
+        for node in ("body", "furniture"):
+            merged[node]["children"].extend(
+                _renumber(part[node]["children"], offsets, page_numbers)
+            )
+        for page in part.get("pages", {}).values():
+            page = _renumber(page, offsets, page_numbers)
+            merged["pages"][str(page["page_no"])] = page
+
+    def document(self) -> DoclingDocument:
+        return DoclingDocument.model_validate(self.merged)
+
+
+def plan_shard_workers(shard_pages: int, num_shards: int) -> int:
+    """
+    Number of worker processes that fit in the configured memory budget.
+
+    Args:
+        shard_pages: Pages per shard, each worker holds one shard at a time
+        num_shards: Number of shards to convert
+
+    Returns:
+        Number of workers, at least 1
+    """
+    pdf_config = PROJECT_CONFIG.pdf
+    worker_memory = (
+        pdf_config.worker_base_memory_mb + shard_pages * pdf_config.page_memory_mb
+    )
+    workers = min(
+        num_shards,
+        pdf_config.max_workers or os.cpu_count() or 1,
+        pdf_config.memory_budget_mb // worker_memory,
+    )
+    return max(1, workers)
+
+
+def _init_shard_worker(num_threads: int) -> None:
+    # share the cores between the workers instead of each using all of them
+    try:
+        import torch
+
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def _convert_shard(shard_path: str, profile: str, images_dir: str) -> Dict[str, Any]:
+    """
+    Convert one shard in a worker process and return its document as a dict.
+
+    The picture images are saved under `images_dir` and referenced by path,
+    and the page images are dropped, so the parent only receives the text and
+    layout of the shard.
+    """
+    global _WORKER_CONVERTER
+    if _WORKER_CONVERTER is None:
+        _WORKER_CONVERTER = build_pdf_converter(profile)
+    document = _WORKER_CONVERTER.convert(shard_path).document
+    document = document._with_pictures_refs(image_dir=Path(images_dir))
+    for page in document.pages.values():
+        page.image = None
+    return document.export_to_dict()
 
 
 class PDFDocling(DigitizationBase):
@@ -18,18 +298,44 @@ class PDFDocling(DigitizationBase):
     Enhanced PDFDocling class with separate exports for markdown, images, and tables.
     """
 
-    def __init__(self, file_path: Path):
+    def __init__(
+        self,
+        file_path: Union[Path, DocumentSource],
+        shard_pages: Optional[int] = None,
+        profile: Optional[str] = None,
+        text_layer: Optional[bool] = None,
+    ):
+        """
+        Args:
+            file_path: Path to the PDF, or a DocumentSource of a PDF in memory
+            shard_pages: Convert PDFs longer than this many pages in page-range
+                shards on parallel worker processes, defaults to the pdf config,
+                0 disables sharding
+            profile: Pipeline profile (text-only, tables, full, ...), defaults
+                to the pdf config
+            text_layer: Read pages with a usable text layer with pypdfium2 and
+                only convert the other pages with Docling, defaults to the pdf
+                config
+        """
         super().__init__(file_path=file_path, supported_formats=[InputFormat.PDF])
-        pipeline_options = PdfPipelineOptions()
-        pipeline_options.images_scale = IMAGE_RESOLUTION_SCALE
-        pipeline_options.generate_page_images = True
-        pipeline_options.generate_picture_images = True
-
-        self.converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
-            }
+        self.profile = profile or PROJECT_CONFIG.pdf.profile
+        self.shard_pages = (
+            PROJECT_CONFIG.pdf.shard_pages if shard_pages is None else shard_pages
         )
+        self.text_layer = (
+            PROJECT_CONFIG.pdf.text_layer if text_layer is None else text_layer
+        )
+        # Docling document of the whole PDF, whichever way its pages were
+        # converted, lets the layout KG be built from it directly instead of
+        # re-parsing the markdown
+        self.document: Optional[DoclingDocument] = None
+        # how the PDF was converted: docling, sharded, text_layer or mixed
+        self.conversion_path: Optional[str] = None
+
+    @cached_property
+    def converter(self) -> DocumentConverter:
+        # only built when a page needs Docling, born-digital PDFs never load it
+        return build_pdf_converter(self.profile)
 
     @staticmethod
     def validate_input(input_data: Union[str, Path]) -> bool:
@@ -44,31 +350,75 @@ class PDFDocling(DigitizationBase):
             logger.exception(f"Error validating input: {str(e)}")
             return False
 
+    def docling_input(self) -> Union[str, DocumentStream]:
+        """The PDF as Docling takes it: a path, or a stream of its content."""
+        if self.input_source.path is not None:
+            return str(self.input_source.path)
+        return DocumentStream(
+            name=self.input_source.name,
+            stream=io.BytesIO(self.input_source.read_bytes()),
+        )
+
     def export_markdown(self, document) -> Path:
-        """Export document content to markdown file."""
-        markdown_path = self.output_dir / f"{self.filename}.md"
-        document.save_as_markdown(
-            markdown_path,
-            image_mode=ImageRefMode.REFERENCED,
-            artifacts_dir=self.output_dir / "images",
+        """Export document content to markdown file, next to its document."""
+        self.export_document(document)
+        return self.export_content_to_markdown_file(
+            document_to_markdown(document, self.writer, "images")
+        )
+
+    def export_document(self, document: DoclingDocument) -> Path:
+        """
+        Save the Docling document as <filename>.docling.json, so the layout
+        KG can be built from it when the outputs are reused (see
+        `Docs2KG.digitization.store`). Page and picture images are left out,
+        they are exported with the markdown.
+        """
+        data = document.export_to_dict()
+        for page in data.get("pages", {}).values():
+            page["image"] = None
+        for picture in data.get("pictures", []):
+            picture["image"] = None
+        return self.writer.write_text(
+            f"{self.filename}{DOCLING_DOCUMENT_SUFFIX}", json.dumps(data)
         )
-        return markdown_path
 
     def process(self) -> Dict[str, Any]:
         """
         Process PDF document and generate all outputs.
         """
-        if not self.validate_input(self.file_path):
+        if not self.validate_source():
             raise ValueError(
                 f"Invalid input: {self.file_path}. Expected valid PDF file path or URL"
             )
 
         try:
+            if self.text_layer:
+                pipeline_profile = PROJECT_CONFIG.pdf.get_profile(self.profile)
+                text_layer = PDFTextLayer(
+                    self.input_source,
+                    min_chars=PROJECT_CONFIG.pdf.text_layer_min_chars,
+                    max_image_coverage=PROJECT_CONFIG.pdf.text_layer_max_image_coverage,
+                    figures_to_docling=pipeline_profile.generate_picture_images,
+                    tables_to_docling=pipeline_profile.do_table_structure,
+                )
+                with timer(None, "Text layer analysis", category="digitization"):
+                    usable, body_size = text_layer.analyse()
+                if any(usable):
+                    return self.process_with_text_layer(text_layer, usable, body_size)
+
+            pdf = self.input_source.path_or_bytes()
+            if self.shard_pages and count_pdf_pages(pdf) > self.shard_pages:
+                return self.process_sharded()
+
             # Convert the document
-            result = self.converter.convert(str(self.file_path))
+            with timer(None, "Docling conversion", category="digitization"):
+                result = self.converter.convert(self.docling_input())
+            self.document = result.document
+            self.conversion_path = "docling"
 
             # Generate all outputs
-            markdown_path = self.export_markdown(result.document)
+            with timer(None, "Markdown export", category="digitization"):
+                markdown_path = self.export_markdown(result.document)
             return markdown_path
 
         except FileNotFoundError:
@@ -76,6 +426,162 @@ class PDFDocling(DigitizationBase):
         except Exception as e:
             raise Exception(f"Error processing PDF: {str(e)}")
 
+    def convert_pages(
+        self, pages: List[int], merger: DocumentMerger, images_dir: Path
+    ) -> None:
+        """
+        Convert some pages with Docling and append them to a document, in
+        shards on worker processes when they are more than `shard_pages`.
+
+        Args:
+            pages: Zero based page indices
+            merger: Document the pages are appended to
+            images_dir: Folder the shard workers save picture images to, kept
+                until the markdown is exported
+        """
+        if self.shard_pages and len(pages) > self.shard_pages:
+            self.convert_sharded(merger, images_dir, pages)
+            return
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pages_pdf = extract_pages(
+                self.input_source.path_or_bytes(), pages, Path(tmp_dir) / "pages.pdf"
+            )
+            with timer(None, "Docling conversion", category="digitization"):
+                result = self.converter.convert(str(pages_pdf))
+        merger.append(result.document.export_to_dict(), [page + 1 for page in pages])
+
+    def process_with_text_layer(
+        self, text_layer: PDFTextLayer, usable: List[bool], body_size: float
+    ) -> Path:
+        """
+        Read the pages with a usable text layer directly and convert each run
+        of consecutive other pages with Docling, sharded when long.
+
+        The documents of the runs are appended in page order to the document
+        of the PDF, exported to the usual <filename>.md.
+
+        Args:
+            text_layer: Text layer digitizer of the PDF, after `analyse`
+            usable: Per page flags returned by `PDFTextLayer.analyse`
+            body_size: Body font size returned by `PDFTextLayer.analyse`
+
+        Returns:
+            Path: Path to the markdown file
+        """
+        logger.info(
+            f"{sum(usable)} of {len(usable)} pages of {self.file_path.name} "
+            f"read from the text layer"
+        )
+        merger = DocumentMerger(self.filename)
+        with tempfile.TemporaryDirectory() as images_dir:
+            page_index = 0
+            for has_text, run in itertools.groupby(usable):
+                pages = list(range(page_index, page_index + len(list(run))))
+                page_index += len(pages)
+                if has_text:
+                    with timer(None, "Text layer extraction", category="digitization"):
+                        document = text_layer.pages_to_document(pages, body_size)
+                    merger.append(document.export_to_dict())
+                else:
+                    self.convert_pages(pages, merger, Path(images_dir))
+
+            self.document = merger.document()
+            self.conversion_path = "text_layer" if all(usable) else "mixed"
+            with timer(None, "Markdown export", category="digitization"):
+                return self.export_markdown(self.document)
+
+    def convert_sharded(
+        self,
+        merger: DocumentMerger,
+        images_dir: Path,
+        pages: Optional[List[int]] = None,
+    ) -> None:
+        """
+        Convert the PDF, or some of its pages, in page-range shards on
+        parallel worker processes and append them to a document.
+
+        Each worker converts one shard at a time. The number of workers is
+        bounded by the memory budget of the pdf config. Workers save the
+        picture images to files and return the rest of their document, which
+        is appended as soon as the shards before it are; at most two shards
+        per worker are converted or waiting without being appended.
+
+        Args:
+            merger: Document the shards are appended to, in page order
+            images_dir: Folder the workers save picture images to, kept until
+                the markdown is exported
+            pages: Zero based page indices, defaults to all
+        """
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with timer(None, "Splitting PDF into shards", category="digitization"):
+                shards = split_pdf(
+                    self.input_source.path_or_bytes(),
+                    Path(shard_dir),
+                    self.shard_pages,
+                    pages,
+                )
+            workers = plan_shard_workers(self.shard_pages, len(shards))
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+            window = 2 * workers
+            logger.info(
+                f"Converting {self.file_path.name} as {len(shards)} shards of up "
+                f"to {self.shard_pages} pages on {workers} workers"
+            )
+
+            with timer(None, "Docling sharded conversion", category="digitization"):
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_shard_worker,
+                    initargs=(threads_per_worker,),
+                ) as executor:
+                    # shard index of the running conversions, and the converted
+                    # shards waiting for the ones before them
+                    running: Dict[Future, int] = {}
+                    converted: Dict[int, Dict[str, Any]] = {}
+                    submitted = appended = 0
+                    while appended < len(shards):
+                        while (
+                            submitted < len(shards)
+                            and len(running) + len(converted) < window
+                        ):
+                            shard_path = shards[submitted][0]
+                            future = executor.submit(
+                                _convert_shard,
+                                str(shard_path),
+                                self.profile,
+                                str(images_dir / shard_path.stem),
+                            )
+                            running[future] = submitted
+                            submitted += 1
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            converted[running.pop(future)] = future.result()
+                        while appended in converted:
+                            page_numbers = shards[appended][1]
+                            merger.append(converted.pop(appended), page_numbers)
+                            logger.info(
+                                f"Converted pages {page_numbers[0]}-"
+                                f"{page_numbers[-1]} of {self.file_path.name}"
+                            )
+                            appended += 1
+
+    def process_sharded(self) -> Path:
+        """
+        Convert the PDF in page-range shards on parallel worker processes and
+        join their documents in page order into the usual <filename>.md.
+
+        Returns:
+            Path: Path to the markdown file
+        """
+        merger = DocumentMerger(self.filename)
+        with tempfile.TemporaryDirectory() as images_dir:
+            self.convert_sharded(merger, Path(images_dir))
+            self.document = merger.document()
+            self.conversion_path = "sharded"
+            with timer(None, "Markdown export", category="digitization"):
+                return self.export_markdown(self.document)
+
     def __repr__(self) -> str:
         return f"PDFDocling(file_path='{self.file_path}')"
 
@@ -0,0 +1,141 @@
+"""
+Bulk ingestion of document folders and archives.
+
+`iter_documents` walks a folder, recursively if asked, and the zip and tar
+archives it finds, including archives inside archives, and yields every
+document of a supported format as a `DocumentSource`. Archive members are read
+one at a time into memory and never extracted to disk; tar archives are read as
+a stream, so compressed tarballs are decompressed once, front to back.
+
+Every source carries its provenance, the path of the file and of the member
+inside each enclosing archive joined with "!/":
+
+    corpus/2023.zip!/reports/annual.pdf
+"""
+
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Collection, Iterator, Optional
+
+from loguru import logger
+
+from Docs2KG.digitization import registry
+from Docs2KG.digitization.source import DocumentSource, sniff_zip_container
+
+ARCHIVE_SEPARATOR = "!/"
+# compressed streams are only opened as tar archives when named like one
+TAR_SUFFIXES = (".tar", ".tgz", ".tbz2", ".txz", ".tar.gz", ".tar.bz2", ".tar.xz")
+
+
+def archive_kind(source: DocumentSource) -> Optional[str]:
+    """
+    Tell whether a source is an archive to look into.
+
+    DOCX and EPUB files are zip files too, they are documents rather than
+    archives; any other zip is looked into, whatever its members are.
+
+    Args:
+        source: File or archive member
+
+    Returns:
+        "zip", "tar" or None
+    """
+    head = source.head(512)
+    if head.startswith(b"PK\x03\x04"):
+        return None if sniff_zip_container(head, source) else "zip"
+    if head[257:262] == b"ustar":
+        return "tar"
+    if source.name.lower().endswith(TAR_SUFFIXES):
+        return "tar"
+    return None
+
+
+def _iter_zip(
+    fileobj: BinaryIO, origin: str, formats: Collection[str]
+) -> Iterator[DocumentSource]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            member = DocumentSource(
+                archive.read(info),
+                name=Path(info.filename).name,
+                origin=f"{origin}{ARCHIVE_SEPARATOR}{info.filename}",
+            )
+            yield from _iter_source(member, formats)
+
+
+def _iter_tar(
+    fileobj: BinaryIO, origin: str, formats: Collection[str]
+) -> Iterator[DocumentSource]:
+    # "r|*" reads the archive as a stream, members must be read in order
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            member_file = archive.extractfile(info)
+            member = DocumentSource(
+                member_file.read(),
+                name=Path(info.name).name,
+                origin=f"{origin}{ARCHIVE_SEPARATOR}{info.name}",
+            )
+            yield from _iter_source(member, formats)
+
+
+def _iter_source(
+    source: DocumentSource, formats: Collection[str]
+) -> Iterator[DocumentSource]:
+    kind = archive_kind(source)
+    if kind is None:
+        if registry.detect_format(source) in formats:
+            yield source
+        return
+    try:
+        with source.open() as fileobj:
+            if kind == "zip":
+                yield from _iter_zip(fileobj, str(source), formats)
+            else:
+                yield from _iter_tar(fileobj, str(source), formats)
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        logger.warning(f"Skipping unreadable archive {source}: {str(e)}")
+
+
+def iter_documents(
+    input_path: Path,
+    recursive: bool = False,
+    archives: bool = True,
+    formats: Optional[Collection[str]] = None,
+) -> Iterator[DocumentSource]:
+    """
+    Iterate over the documents of a folder, an archive or a single file.
+
+    Args:
+        input_path: Folder, archive or document
+        recursive: Walk the sub folders too
+        archives: Look into zip and tar archives
+        formats: Formats to yield, e.g. {".pdf"}, defaults to all supported
+
+    Yields:
+        DocumentSource of each document, in folder and archive order. Archive
+        members are held in memory, path documents are read when used
+    """
+    formats = set(formats or registry.supported_suffixes())
+    input_path = Path(input_path)
+    if input_path.is_file():
+        paths = [input_path]
+    elif recursive:
+        paths = []
+        for folder, sub_folders, file_names in os.walk(input_path):
+            sub_folders.sort()
+            paths.extend(Path(folder) / name for name in sorted(file_names))
+    else:
+        paths = [path for path in sorted(input_path.iterdir()) if path.is_file()]
+
+    for path in paths:
+        source = DocumentSource(path)
+        if archives:
+            yield from _iter_source(source, formats)
+        elif registry.detect_format(source) in formats:
+            yield source
@@ -1,6 +1,14 @@
+import hashlib
+import multiprocessing
+import posixpath
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
+from urllib.parse import unquote, urlparse
 
 import ebooklib
 import html2text
@@ -9,6 +17,7 @@ from ebooklib import epub
 from loguru import logger
 
 from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.source import DocumentSource
 from Docs2KG.utils.config import PROJECT_CONFIG
 
 
@@ -22,26 +31,193 @@ class Chapter:
     images: List[Dict[str, str]]
 
 
+@dataclass
+class ChapterSummary:
+    """What is kept of a chapter once it has been written in streaming mode"""
+
+    title: str
+    order: int
+    image_count: int
+
+
+# image lookups of the book in a chapter worker process, set by the initializer
+_WORKER_IMAGE_NAMES: Dict[str, str] = {}
+_WORKER_IMAGE_PATHS: Dict[str, str] = {}
+
+
+def make_text_maker() -> html2text.HTML2Text:
+    text_maker = html2text.HTML2Text()
+    text_maker.ignore_links = False
+    text_maker.ignore_images = False
+    text_maker.body_width = 0
+    return text_maker
+
+
+def resolve_image(
+    img_src: str, chapter_file_name: str, image_names: Dict[str, str]
+) -> Optional[str]:
+    """
+    Find the file name of the image an <img> src refers to.
+
+    Args:
+        img_src: src attribute, relative to the chapter
+        chapter_file_name: File name of the chapter in the book
+        image_names: Image file names of the book by file name and base name
+
+    Returns:
+        File name of the image item, or None if the book has no such image
+    """
+    path = unquote(urlparse(img_src).path)
+    resolved = posixpath.normpath(
+        posixpath.join(posixpath.dirname(chapter_file_name), path)
+    )
+    return image_names.get(resolved) or image_names.get(posixpath.basename(path))
+
+
+def rewrite_chapter_images(
+    soup: BeautifulSoup,
+    chapter_id: str,
+    chapter_file_name: str,
+    image_names: Dict[str, str],
+    image_paths: Dict[str, str],
+) -> List[Dict[str, str]]:
+    """
+    Point the <img> tags of a parsed chapter to the saved image files.
+
+    Args:
+        soup: Parsed chapter, updated in place
+        chapter_id: Identifier for the chapter
+        chapter_file_name: File name of the chapter in the book
+        image_names: Image file names by file name and base name
+        image_paths: Saved path of every image file name, relative to the
+            output folder
+
+    Returns:
+        List of dictionaries containing image information
+    """
+    images = []
+    for img in soup.find_all("img"):
+        img_src = img.get("src", "")
+        if not img_src:
+            continue
+        file_name = resolve_image(img_src, chapter_file_name, image_names)
+        if file_name is None:
+            continue
+        images.append(
+            {
+                "original_src": img_src,
+                "saved_path": image_paths[file_name],
+                "alt_text": img.get("alt", ""),
+                "chapter_id": chapter_id,
+            }
+        )
+        img["src"] = image_paths[file_name]
+    return images
+
+
+def convert_chapter(
+    content: bytes,
+    order: int,
+    chapter_file_name: str,
+    image_names: Dict[str, str],
+    image_paths: Dict[str, str],
+    text_maker: Optional[html2text.HTML2Text] = None,
+) -> Chapter:
+    """
+    Convert the HTML of a chapter to markdown, parsing it once.
+
+    Args:
+        content: Chapter HTML
+        order: Chapter order number
+        chapter_file_name: File name of the chapter in the book
+        image_names: Image file names by file name and base name
+        image_paths: Saved path of every image file name
+        text_maker: HTML to text converter, a new one by default
+
+    Returns:
+        Chapter
+    """
+    soup = BeautifulSoup(content.decode("utf-8"), "html.parser")
+
+    title = soup.find("title")
+    title = title.text if title else f"Chapter {order}"
+
+    # the parsed chapter is shared, so the markdown links the saved images
+    images = rewrite_chapter_images(
+        soup, f"ch{order}", chapter_file_name, image_names, image_paths
+    )
+    markdown_content = (text_maker or make_text_maker()).handle(str(soup))
+    return Chapter(title=title, content=markdown_content, order=order, images=images)
+
+
+def _init_chapter_worker(
+    image_names: Dict[str, str], image_paths: Dict[str, str]
+) -> None:
+    global _WORKER_IMAGE_NAMES, _WORKER_IMAGE_PATHS
+    _WORKER_IMAGE_NAMES = image_names
+    _WORKER_IMAGE_PATHS = image_paths
+
+
+def _convert_chapter_in_worker(
+    content: bytes, order: int, chapter_file_name: str
+) -> Chapter:
+    return convert_chapter(
+        content, order, chapter_file_name, _WORKER_IMAGE_NAMES, _WORKER_IMAGE_PATHS
+    )
+
+
 class EPUBDigitization(DigitizationBase):
     """
     EPUB digitization agent that converts EPUB files to markdown, extracts images,
     and generates structured data.
 
     Inherits from DigitizationBase and implements EPUB-specific processing logic.
+
+    In streaming mode every chapter is appended to the markdown file as soon as
+    it is converted and only a ChapterSummary is kept, so memory stays bounded
+    by the chapters in flight rather than the size of the book. With
+    `chapter_workers` > 1 the chapters are converted on worker processes and
+    still written in book order.
     """
 
-    def __init__(self, file_path: Path):
+    def __init__(
+        self,
+        file_path: Union[Path, DocumentSource],
+        image_workers: int = 4,
+        stream: bool = False,
+        chapter_workers: int = 1,
+    ):
+        """
+        Args:
+            file_path: Path to the EPUB, or a DocumentSource of an EPUB in memory
+            image_workers: Threads writing the extracted images
+            stream: Write the markdown chapter by chapter and keep only chapter
+                summaries in memory
+            chapter_workers: Processes converting chapters, 1 converts them in
+                this process. Starting the workers takes a second or two, so
+                this only pays off for large books
+        """
         super().__init__(file_path=file_path, supported_formats=["epub"])
         self.book = None
         self.chapters: List[Chapter] = []
+        self.chapter_summaries: List[ChapterSummary] = []
         self.metadata: Dict[str, Any] = {}
-        self.image_counter = 0
+        self.image_workers = image_workers
+        self.stream = stream
+        self.chapter_workers = max(1, chapter_workers)
+        # image items of the book by saved path
+        self.image_items: Dict[str, Any] = {}
+        # image file names by file name and by base name
+        self.image_names: Dict[str, str] = {}
+        # saved path of every image, by file name, named after the content hash
+        # so that identical images share one file
+        self.image_paths: Dict[str, str] = {}
+        self.written_images: set = set()
+        self.image_writes: List[Future] = []
+        self.image_executor: Optional[ThreadPoolExecutor] = None
 
         # Configure HTML to Text converter
-        self.text_maker = html2text.HTML2Text()
-        self.text_maker.ignore_links = False
-        self.text_maker.ignore_images = False
-        self.text_maker.body_width = 0
+        self.text_maker = make_text_maker()
 
     def validate_input(self, input_data: Union[str, Path]) -> bool:
         """
@@ -71,6 +247,73 @@ class EPUBDigitization(DigitizationBase):
             logger.error(f"Error validating EPUB: {str(e)}")
             return False
 
+    def read_book(self) -> epub.EpubBook:
+        """
+        Load the book with ebooklib.
+
+        ebooklib 0.18 only opens paths, so a book in memory is copied to a
+        temporary file first.
+        """
+        if self.input_source.path is not None:
+            return epub.read_epub(str(self.input_source.path))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            book_path = Path(tmp_dir) / "book.epub"
+            with self.input_source.open() as source, open(book_path, "wb") as f:
+                shutil.copyfileobj(source, f)
+            return epub.read_epub(str(book_path))
+
+    def build_image_index(self) -> None:
+        """Index the image items of the book once and name them by content hash."""
+        self.image_items, self.image_names, self.image_paths = {}, {}, {}
+        for item in self.book.get_items_of_type(ebooklib.ITEM_IMAGE):
+            file_name = item.file_name
+            self.image_names[file_name] = file_name
+            self.image_names.setdefault(posixpath.basename(file_name), file_name)
+            digest = hashlib.sha256(item.content).hexdigest()
+            suffix = posixpath.splitext(file_name)[1] or ".jpg"
+            saved_path = f"images/image_{digest[:16]}{suffix}"
+            self.image_paths[file_name] = saved_path
+            self.image_items.setdefault(saved_path, item)
+
+    def write_images(self, images: List[Dict[str, str]]) -> None:
+        """Write the images of a chapter in the background, each file once."""
+        for image in images:
+            saved_path = image["saved_path"]
+            if saved_path in self.written_images:
+                continue
+            self.written_images.add(saved_path)
+            if self.writer.path(saved_path).exists():
+                continue
+            content = self.image_items[saved_path].content
+            if self.image_executor is None:
+                self.writer.write_bytes(saved_path, content)
+            else:
+                self.image_writes.append(
+                    self.image_executor.submit(
+                        self.writer.write_bytes, saved_path, content
+                    )
+                )
+
+    def extract_images_from_soup(
+        self, soup: BeautifulSoup, chapter_id: str, chapter_file_name: str = ""
+    ) -> List[Dict[str, str]]:
+        """
+        Save the images of a parsed chapter and point their src to the saved files.
+
+        Args:
+            soup: Parsed chapter, its <img> tags are updated in place
+            chapter_id: Identifier for the chapter
+            chapter_file_name: File name of the chapter in the book
+
+        Returns:
+            List of dictionaries containing image information
+        """
+        images = rewrite_chapter_images(
+            soup, chapter_id, chapter_file_name, self.image_names, self.image_paths
+        )
+        self.write_images(images)
+        return images
+
     def extract_images_from_chapter(
         self, chapter_content: str, chapter_id: str
     ) -> List[Dict[str, str]]:
@@ -84,41 +327,10 @@ class EPUBDigitization(DigitizationBase):
         Returns:
             List of dictionaries containing image information
         """
-        images = []
+        if not self.image_paths:
+            self.build_image_index()
         soup = BeautifulSoup(chapter_content, "html.parser")
-
-        for img in soup.find_all("img"):
-            try:
-                img_src = img.get("src", "")
-                if not img_src:
-                    continue
-
-                self.image_counter += 1
-                img_filename = f"image_{chapter_id}_{self.image_counter}.jpg"
-                img_path = self.output_dir / "images" / img_filename
-
-                for item in self.book.get_items_of_type(ebooklib.ITEM_IMAGE):
-                    if item.file_name.endswith(img_src.split("/")[-1]):
-                        with open(img_path, "wb") as f:
-                            f.write(item.content)
-
-                        images.append(
-                            {
-                                "original_src": img_src,
-                                "saved_path": str(
-                                    img_path.relative_to(self.output_dir)
-                                ),
-                                "alt_text": img.get("alt", ""),
-                                "chapter_id": chapter_id,
-                            }
-                        )
-
-                        img["src"] = str(img_path.relative_to(self.output_dir))
-
-            except Exception as e:
-                logger.error(f"Error processing image: {str(e)}")
-
-        return images
+        return self.extract_images_from_soup(soup, chapter_id)
 
     def process_chapter(self, chapter_item, order: int) -> Optional[Chapter]:
         """
@@ -132,22 +344,72 @@ class EPUBDigitization(DigitizationBase):
             Chapter object or None if processing fails
         """
         try:
-            content = chapter_item.get_content().decode("utf-8")
-            soup = BeautifulSoup(content, "html.parser")
+            chapter = convert_chapter(
+                chapter_item.get_content(),
+                order,
+                chapter_item.file_name,
+                self.image_names,
+                self.image_paths,
+                self.text_maker,
+            )
+            self.write_images(chapter.images)
+            return chapter
 
-            title = soup.find("title")
-            title = title.text if title else f"Chapter {order}"
+        except Exception as e:
+            logger.error(f"Error processing chapter: {str(e)}")
+            return None
 
-            images = self.extract_images_from_chapter(content, f"ch{order}")
-            markdown_content = self.text_maker.handle(str(soup))
+    def iter_chapters(self) -> Iterator[Chapter]:
+        """
+        Convert the chapters of the book, yielding them in book order.
 
-            return Chapter(
-                title=title, content=markdown_content, order=order, images=images
-            )
+        With several chapter workers, at most two chapters per worker are in
+        flight at any time, which bounds the memory held by pending results.
+
+        Yields:
+            Chapter
+        """
+        items = self.book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
+        if self.chapter_workers == 1:
+            for idx, item in enumerate(items):
+                chapter = self.process_chapter(item, idx)
+                if chapter:
+                    yield chapter
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.chapter_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_chapter_worker,
+            initargs=(self.image_names, self.image_paths),
+        ) as executor:
+            pending: Deque[Future] = deque()
+            for idx, item in enumerate(items):
+                pending.append(
+                    executor.submit(
+                        _convert_chapter_in_worker,
+                        item.get_content(),
+                        idx,
+                        item.file_name,
+                    )
+                )
+                if len(pending) >= 2 * self.chapter_workers:
+                    chapter = self._collect_chapter(pending.popleft())
+                    if chapter:
+                        yield chapter
+            while pending:
+                chapter = self._collect_chapter(pending.popleft())
+                if chapter:
+                    yield chapter
 
+    def _collect_chapter(self, future: Future) -> Optional[Chapter]:
+        try:
+            chapter = future.result()
         except Exception as e:
             logger.error(f"Error processing chapter: {str(e)}")
             return None
+        self.write_images(chapter.images)
+        return chapter
 
     def extract_metadata(self):
         """Extract metadata from the EPUB file."""
@@ -181,43 +443,58 @@ class EPUBDigitization(DigitizationBase):
         Returns:
             Dictionary containing paths to generated outputs
         """
-        if not self.validate_input(self.file_path):
+        if not self.validate_source():
             raise ValueError(f"Invalid EPUB file: {self.file_path}")
 
         try:
-            # Read the EPUB file
-            self.book = epub.read_epub(str(self.file_path))
+            # Read the EPUB file, the whole book is loaded before returning
+            self.book = self.read_book()
+            self.build_image_index()
+            self.image_executor = ThreadPoolExecutor(max_workers=self.image_workers)
 
             # Extract metadata
             self.extract_metadata()
 
             # Process chapters
             all_images = []
-            markdown_content = []
-
-            # Add metadata section
-            markdown_content.append("---")
-            for key, value in self.metadata.items():
-                if value:
-                    markdown_content.append(f"{key}: {value}")
-            markdown_content.append("---\n")
-
-            # Process chapters and collect content
-            for idx, item in enumerate(
-                self.book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
-            ):
-                chapter = self.process_chapter(item, idx)
-                if chapter:
-                    self.chapters.append(chapter)
-                    markdown_content.extend(
-                        [f"# {chapter.title}\n", chapter.content, "---\n"]
-                    )
+            self.chapters, self.chapter_summaries = [], []
+            markdown_path = self.writer.path(f"{self.filename}.md")
+
+            # the markdown replaces the previous one only once complete
+            with self.writer.open(f"{self.filename}.md") as markdown_file:
+                separator = ""
+
+                def write_lines(*lines: str) -> None:
+                    # same layout as joining all the lines of the book with "\n"
+                    nonlocal separator
+                    for line in lines:
+                        markdown_file.write(separator + line)
+                        separator = "\n"
+
+                # Add metadata section
+                write_lines("---")
+                for key, value in self.metadata.items():
+                    if value:
+                        write_lines(f"{key}: {value}")
+                write_lines("---\n")
+
+                # Process chapters and write them in book order
+                for chapter in self.iter_chapters():
+                    write_lines(f"# {chapter.title}\n", chapter.content, "---\n")
                     all_images.extend(chapter.images)
+                    self.chapter_summaries.append(
+                        ChapterSummary(
+                            title=chapter.title,
+                            order=chapter.order,
+                            image_count=len(chapter.images),
+                        )
+                    )
+                    if not self.stream:
+                        self.chapters.append(chapter)
 
-            # Export markdown content
-            markdown_path = self.export_content_to_markdown_file(
-                "\n".join(markdown_content)
-            )
+            # Wait for the images, raising the first write error
+            for write in self.image_writes:
+                write.result()
 
             # Export images data
             images_data = {"total_images": len(all_images), "images": all_images}
@@ -228,11 +505,11 @@ class EPUBDigitization(DigitizationBase):
                 "metadata": self.metadata,
                 "chapters": [
                     {
-                        "title": ch.title,
-                        "order": ch.order,
-                        "image_count": len(ch.images),
+                        "title": summary.title,
+                        "order": summary.order,
+                        "image_count": summary.image_count,
                     }
-                    for ch in self.chapters
+                    for summary in self.chapter_summaries
                 ],
             }
             table_json_path = self.export_table_to_json_file(structure_data)
@@ -241,13 +518,18 @@ class EPUBDigitization(DigitizationBase):
                 "markdown_path": markdown_path,
                 "images_json_path": images_json_path,
                 "table_json_path": table_json_path,
-                "total_chapters": len(self.chapters),
+                "total_chapters": len(self.chapter_summaries),
                 "total_images": len(all_images),
             }
 
         except Exception as e:
             logger.error(f"Error processing EPUB: {str(e)}")
             raise
+        finally:
+            if self.image_executor is not None:
+                self.image_executor.shutdown(wait=True)
+                self.image_executor = None
+            self.image_writes = []
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from Docs2KG.digitization.native.html_parser import HTMLDocling
+from Docs2KG.utils.config import PROJECT_CONFIG
+
+SITEMAP_NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+@dataclass
+class CrawlResult:
+    """Outcome of fetching one URL"""
+
+    url: str
+    status: str  # new, changed, unchanged or failed
+    sha256: Optional[str] = None
+    html_path: Optional[Path] = None
+    markdown_path: Optional[Path] = None
+    error: Optional[str] = None
+
+
+def url_to_filename(url: str) -> str:
+    """
+    Readable and unique name of a crawled page, from its host and path.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        str: e.g. example.com_docs_intro for https://example.com/docs/intro.html
+    """
+    parsed = urlparse(url)
+    path = re.sub(r"\.html?$", "", parsed.path)
+    name = f"{parsed.netloc}{path}"
+    if parsed.query:
+        name += "_" + hashlib.sha256(parsed.query.encode()).hexdigest()[:8]
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", name).strip("_")
+
+
+def parse_sitemap(content: bytes) -> Tuple[List[str], List[str]]:
+    """
+    Read the locations of a sitemap or sitemap index.
+
+    Args:
+        content: Sitemap XML
+
+    Returns:
+        Tuple of page URLs and nested sitemap URLs
+    """
+    root = ET.fromstring(content)
+    locations = [
+        loc.text.strip()
+        for loc in root.iter(f"{SITEMAP_NAMESPACE}loc")
+        if loc.text and loc.text.strip()
+    ]
+    if root.tag == f"{SITEMAP_NAMESPACE}sitemapindex":
+        return [], locations
+    return locations, []
+
+
+class HTMLCrawler:
+    """
+    Fetch many pages concurrently and convert them with HTMLDocling.
+
+    Pages are fetched over a shared connection pool by a bounded number of
+    threads and converted as soon as they arrive, so downloads overlap with
+    the conversion. The raw HTML is stored content-addressed by its SHA-256 in
+    the cache folder, next to an index.json recording the ETag and
+    Last-Modified of every URL. A later crawl sends them back as conditional
+    request headers, and pages answered with 304 Not Modified, or whose content
+    hash did not change, are not converted again.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_connections: int = 8,
+        timeout: int = 30,
+    ):
+        """
+        Args:
+            cache_dir: Folder of the HTML cache, defaults to
+                <output_dir>/crawl_cache
+            max_connections: Maximum number of concurrent requests
+            timeout: Timeout of a request in seconds
+        """
+        self.cache_dir = Path(
+            cache_dir or PROJECT_CONFIG.data.output_dir / "crawl_cache"
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.index: Dict[str, Dict] = (
+            json.loads(self.index_path.read_text()) if self.index_path.exists() else {}
+        )
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.cache_dir / "html" / sha256[:2] / f"{sha256}.html"
+
+    def expand_sitemap(self, sitemap_url: str) -> List[str]:
+        """
+        Collect the page URLs of a sitemap, following sitemap indexes.
+
+        Args:
+            sitemap_url: URL of the sitemap
+
+        Returns:
+            List of page URLs, without duplicates
+        """
+        urls, pending, seen = [], [sitemap_url], set()
+        while pending:
+            url = pending.pop()
+            if url in seen:
+                continue
+            seen.add(url)
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            pages, sitemaps = parse_sitemap(response.content)
+            urls.extend(pages)
+            pending.extend(sitemaps)
+        return list(dict.fromkeys(urls))
+
+    def fetch(self, url: str, force: bool = False) -> CrawlResult:
+        """
+        Fetch a page, conditionally when it was crawled before.
+
+        Args:
+            url: Page URL
+            force: Ignore the cached validators and download the page again
+
+        Returns:
+            CrawlResult
+        """
+        with self._lock:
+            entry = dict(self.index.get(url, {}))
+        cached = entry.get("sha256") and self.blob_path(entry["sha256"]).exists()
+
+        headers = {}
+        if cached and not force:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cached:
+                return CrawlResult(
+                    url, "unchanged", entry["sha256"], self.blob_path(entry["sha256"])
+                )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return CrawlResult(url, "failed", error=str(e))
+
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        html_path = self.blob_path(sha256)
+        if not html_path.exists():
+            html_path.parent.mkdir(parents=True, exist_ok=True)
+            html_path.write_bytes(content)
+
+        if not entry.get("sha256"):
+            status = "new"
+        elif entry["sha256"] == sha256 and cached:
+            status = "unchanged"
+        else:
+            status = "changed"
+        with self._lock:
+            self.index[url] = {
+                "sha256": sha256,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+            }
+        return CrawlResult(url, status, sha256, html_path)
+
+    def convert(self, result: CrawlResult) -> Path:
+        processor = HTMLDocling(result.html_path, filename=url_to_filename(result.url))
+        return processor.process()
+
+    def crawl(
+        self,
+        urls: Iterable[str],
+        convert: bool = True,
+        force: bool = False,
+    ) -> List[CrawlResult]:
+        """
+        Fetch the URLs concurrently and convert the new and changed pages.
+
+        Args:
+            urls: Page URLs
+            convert: Convert the fetched pages to markdown
+            force: Download and convert every page, even unchanged ones
+
+        Returns:
+            List of CrawlResult, in the order of the URLs
+        """
+        urls = list(dict.fromkeys(urls))
+        results: Dict[str, CrawlResult] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+                futures = {executor.submit(self.fetch, url, force): url for url in urls}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.url] = result
+                    if not convert or result.status == "failed":
+                        continue
+                    if result.status == "unchanged" and not force:
+                        continue
+                    try:
+                        result.markdown_path = self.convert(result)
+                    except Exception as e:
+                        logger.error(f"Error converting {result.url}: {e}")
+                        result.error = str(e)
+        finally:
+            self.save_index()
+
+        counts = {}
+        for result in results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        logger.info(f"Crawled {len(urls)} URLs: {counts}")
+        return [results[url] for url in urls]
+
+    def save_index(self) -> None:
+        with self._lock:
+            tmp_path = self.index_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(self.index, indent=2))
+            tmp_path.replace(self.index_path)
+
+    @staticmethod
+    def to_dict(result: CrawlResult) -> Dict:
+        return {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in asdict(result).items()
+        }
@@ -1,23 +1,46 @@
 import re
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 from urllib.parse import unquote, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment, Doctype, Tag
 from loguru import logger
-from markdownify import markdownify
+from markdownify import MarkdownConverter
 
 from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.source import DocumentSource
 from Docs2KG.utils.config import PROJECT_CONFIG
 
+try:
+    import lxml  # noqa: F401
+
+    # the C parser is several times faster than the pure Python one
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+REMOVED_TAGS = {"style", "script"}
+REMOVED_ATTRIBUTES = ("style", "class", "id")
+CSS_PATTERN = re.compile(r"/\*[\s\S]*?\*/|{\s*[^}]*}")
+
 
 class HTMLDocling(DigitizationBase):
     """
     HTMLDocling class for processing HTML content from files or URLs to markdown.
     """
 
-    def __init__(self, file_path: Union[str, Path]):
+    def __init__(
+        self,
+        file_path: Union[str, Path, DocumentSource],
+        filename: Optional[str] = None,
+    ):
+        """
+        Args:
+            file_path: HTML file or URL, or a DocumentSource of HTML in memory
+            filename: Name of the document in the outputs, defaults to the
+                file name, used by HTMLCrawler for its content-addressed files
+        """
         self.is_url = isinstance(file_path, str) and self._is_valid_url(file_path)
 
         if self.is_url:
@@ -46,6 +69,8 @@ class HTMLDocling(DigitizationBase):
             supported_formats=["html", "htm"],
         )
         self.source = file_path
+        if filename:
+            self.filename = filename
 
     def _download_and_save_html(self, url: str) -> None:
         """
@@ -90,59 +115,64 @@ class HTMLDocling(DigitizationBase):
             logger.exception(f"Error validating input: {str(e)}")
             return False
 
-    def clean_html(self, html_content: str) -> str:
-        """
-        Clean HTML content by removing styles, scripts, and unnecessary elements.
+    @staticmethod
+    def clean_soup(html_content: str) -> BeautifulSoup:
         """
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, "html.parser")
+        Parse HTML and clean it in a single traversal of the tree.
 
-        # Remove style tags and their contents
-        for style in soup.find_all("style"):
-            style.decompose()
+        Style and script elements and comments are removed, style, class and id
+        attributes dropped, and CSS left in the text (comments, rule blocks)
+        stripped. The returned tree can be handed to `MarkdownConverter`
+        directly, without serializing it and parsing it again.
 
-        # Remove script tags and their contents
-        for script in soup.find_all("script"):
-            script.decompose()
-
-        # Remove all style attributes
-        for tag in soup.find_all(True):
-            if "style" in tag.attrs:
-                del tag["style"]
-
-        # Remove class and id attributes
-        for tag in soup.find_all(True):
-            if "class" in tag.attrs:
-                del tag["class"]
-            if "id" in tag.attrs:
-                del tag["id"]
-
-        # Convert back to string
-        cleaned_html = str(soup)
+        Args:
+            html_content: Raw HTML
 
-        # Remove any remaining CSS-like content
-        cleaned_html = re.sub(r"<style[^>]*>[\s\S]*?</style>", "", cleaned_html)
-        cleaned_html = re.sub(r"/\*[\s\S]*?\*/", "", cleaned_html)
-        cleaned_html = re.sub(r"{\s*[^}]*}", "", cleaned_html)
+        Returns:
+            BeautifulSoup: Cleaned tree
+        """
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        # walk the elements in document order, the soup's own next_element
+        # is not set by every tree builder
+        node = soup.contents[0] if soup.contents else None
+        while node is not None:
+            next_node = node.next_element
+            if isinstance(node, Tag):
+                if node.name in REMOVED_TAGS:
+                    # jump over the removed element's contents
+                    next_node = node._last_descendant().next_element
+                    node.extract()
+                elif node.attrs:
+                    for attribute in REMOVED_ATTRIBUTES:
+                        node.attrs.pop(attribute, None)
+            elif isinstance(node, (Comment, Doctype)):
+                node.extract()
+            elif "{" in node or "/*" in node:
+                node.replace_with(CSS_PATTERN.sub("", node))
+            node = next_node
+        return soup
 
-        return cleaned_html
+    def clean_html(self, html_content: str) -> str:
+        """
+        Clean HTML content by removing styles, scripts, and unnecessary elements.
+        """
+        return str(self.clean_soup(html_content))
 
     def export_markdown(self, content: str) -> Path:
-        markdown_path = self.output_dir / f"{self.filename}.md"
-        markdown_path.write_text(content, encoding="utf-8")
-        return markdown_path
+        return self.writer.write_text(f"{self.filename}.md", content)
 
     def get_html_content(self) -> str:
+        content = self.input_source.read_bytes()
         try:
-            return Path(self.source).read_text(encoding="utf-8")
+            return content.decode("utf-8")
         except UnicodeDecodeError:
-            return Path(self.source).read_text(encoding="latin-1")
+            return content.decode("latin-1")
 
     def process(self) -> Path:
         """
         Process HTML document and generate markdown output.
         """
-        if not self.validate_input(self.source):
+        if not self.validate_source():
             raise ValueError(
                 f"Invalid input: {self.source}. Expected valid HTML file or URL"
             )
@@ -152,12 +182,12 @@ class HTMLDocling(DigitizationBase):
             html_content = self.get_html_content()
 
             # Clean the HTML content
-            cleaned_html = self.clean_html(html_content)
+            soup = self.clean_soup(html_content)
 
-            # Convert cleaned HTML to markdown
-            markdown_content = markdownify(
-                cleaned_html, heading_style="ATX", bullets="-", autolinks=True
-            )
+            # Convert the cleaned tree to markdown
+            markdown_content = MarkdownConverter(
+                heading_style="ATX", bullets="-", autolinks=True
+            ).convert_soup(soup)
 
             # Additional cleanup of the markdown content
             # Remove empty lines between list items
@@ -0,0 +1,444 @@
+import re
+import statistics
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from loguru import logger
+
+from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.source import DocumentSource
+
+if TYPE_CHECKING:
+    from docling_core.types.doc import DoclingDocument
+
+LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[•▪●–\-*]|\d+[.)])\s+")
+# pdfium ends lines with \r\n, or with \ufffe when it removed a hyphen
+SOFT_HYPHEN = "\ufffe"
+LINE_BREAK_PATTERN = re.compile(r"\r\n|\ufffe|$")
+# images covering less of the page than this (logos, bullets) are not figures
+MIN_FIGURE_COVERAGE = 0.02
+# horizontal or vertical rules drawn on a page before it counts as a table
+MIN_TABLE_RULES = 4
+
+
+@dataclass
+class TextLine:
+    """A line of the PDF text layer with its font size and position"""
+
+    text: str
+    font_size: float
+    top: float
+    bottom: float
+    left: float = 0.0
+    right: float = 0.0
+
+
+@dataclass
+class TextBlock:
+    """A heading, list item or paragraph assembled from lines"""
+
+    kind: str  # "heading", "list_item" or "paragraph"
+    text: str
+    lines: List[TextLine]
+    level: int = 0
+
+
+class PDFTextLayer(DigitizationBase):
+    """
+    Lightweight digitizer for born-digital PDFs that reads the embedded text
+    layer with pypdfium2 instead of running Docling's layout models.
+
+    Headings are inferred from the font size relative to the body text and
+    paragraphs from the vertical gaps between lines. `page_has_text_layer` is a
+    cheap per-page check telling whether the text layer is usable, pages failing
+    it should go through Docling instead (see `PDFDocling`). The text layer
+    carries neither tables nor images, so pages with figures or ruled tables
+    can be sent to Docling too when those are wanted.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[Path, DocumentSource],
+        min_chars: int = 200,
+        max_image_coverage: float = 0.5,
+        figures_to_docling: bool = False,
+        tables_to_docling: bool = False,
+    ):
+        """
+        Args:
+            file_path: Path to the PDF, or a DocumentSource of a PDF in memory
+            min_chars: Minimum number of characters for a page's text layer
+                to be used
+            max_image_coverage: Pages whose images cover more of the page than
+                this fraction are considered scanned or figure pages
+            figures_to_docling: Leave pages with a figure to Docling, for
+                pipelines exporting picture images
+            tables_to_docling: Leave pages with a ruled table to Docling, for
+                pipelines recognising the table structure
+        """
+        super().__init__(file_path=file_path, supported_formats=["pdf"])
+        self.min_chars = min_chars
+        self.max_image_coverage = max_image_coverage
+        self.figures_to_docling = figures_to_docling
+        self.tables_to_docling = tables_to_docling
+        # lines of the usable pages by page index, filled by `analyse`
+        self.page_lines: Dict[int, List[TextLine]] = {}
+
+    def open_pdf(self) -> pdfium.PdfDocument:
+        pdf = self.input_source.path_or_bytes()
+        return pdfium.PdfDocument(pdf if isinstance(pdf, bytes) else str(pdf))
+
+    @staticmethod
+    def _image_coverages(page: pdfium.PdfPage) -> List[float]:
+        """Fraction of the page covered by each of its images"""
+        width, height = page.get_size()
+        if not width or not height:
+            return []
+        coverages = []
+        for image in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)):
+            left, bottom, right, top = image.get_pos()
+            coverages.append(
+                max(0.0, right - left) * max(0.0, top - bottom) / (width * height)
+            )
+        return coverages
+
+    @staticmethod
+    def _has_table_rules(page: pdfium.PdfPage) -> bool:
+        """
+        Whether the page draws the horizontal or vertical rules of a table.
+
+        Tables without any rules are not detected.
+        """
+        rules = 0
+        for path in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_PATH,)):
+            left, bottom, right, top = path.get_pos()
+            width, height = right - left, top - bottom
+            if (height <= 2 and width >= 20) or (width <= 2 and height >= 20):
+                rules += 1
+                if rules >= MIN_TABLE_RULES:
+                    return True
+        return False
+
+    def page_has_text_layer(
+        self, page: pdfium.PdfPage, textpage: pdfium.PdfTextPage
+    ) -> bool:
+        """
+        Check whether a page has a text layer worth using.
+
+        The page needs at least `min_chars` characters, almost no undecodable
+        characters (broken font encodings) and must not be mostly covered by
+        images (scans with an OCR layer, full page figures). With
+        `figures_to_docling` or `tables_to_docling` it must also have no
+        figure, respectively no ruled table.
+
+        Args:
+            page: The page
+            textpage: Its text page
+
+        Returns:
+            bool: True if the text layer can be used for this page
+        """
+        text = textpage.get_text_range(count=textpage.count_chars())
+        visible = [char for char in text if not char.isspace() and char != SOFT_HYPHEN]
+        if len(visible) < self.min_chars:
+            return False
+        garbled = sum(1 for char in visible if char == "�" or not char.isprintable())
+        if garbled / len(visible) > 0.02:
+            return False
+        coverages = self._image_coverages(page)
+        if min(1.0, sum(coverages)) > self.max_image_coverage:
+            return False
+        if self.figures_to_docling and any(
+            coverage >= MIN_FIGURE_COVERAGE for coverage in coverages
+        ):
+            return False
+        return not (self.tables_to_docling and self._has_table_rules(page))
+
+    @staticmethod
+    def extract_lines(textpage: pdfium.PdfTextPage) -> List[TextLine]:
+        """
+        Split the text layer of a page into lines with their font size.
+
+        Args:
+            textpage: The text page
+
+        Returns:
+            List of TextLine in reading order
+        """
+        text = textpage.get_text_range(count=textpage.count_chars())
+        lines = []
+        offset = 0
+        for match in LINE_BREAK_PATTERN.finditer(text):
+            raw_line = text[offset : match.start()]
+            stripped = raw_line.strip()
+            if stripped:
+                index = offset + len(raw_line) - len(raw_line.lstrip())
+                last = offset + len(raw_line.rstrip()) - 1
+                left, bottom, _, top = textpage.get_charbox(index)
+                right = textpage.get_charbox(last)[2]
+                lines.append(
+                    TextLine(
+                        # pdfium drops the hyphen of words broken across lines
+                        text=stripped + ("-" if match.group() == SOFT_HYPHEN else ""),
+                        font_size=pdfium_c.FPDFText_GetFontSize(textpage.raw, index),
+                        top=top,
+                        bottom=bottom,
+                        left=left,
+                        right=max(left, right),
+                    )
+                )
+            offset = match.end()
+        return lines
+
+    @staticmethod
+    def body_font_size(lines: List[TextLine]) -> float:
+        """Most common font size, weighted by the amount of text"""
+        sizes = [
+            round(line.font_size, 1)
+            for line in lines
+            for _ in range(len(line.text))
+            if line.font_size > 0
+        ]
+        return statistics.mode(sizes) if sizes else 0.0
+
+    @staticmethod
+    def _heading_level(font_size: float, body_size: float) -> Optional[int]:
+        if body_size <= 0:
+            return None
+        ratio = font_size / body_size
+        if ratio >= 1.6:
+            return 1
+        if ratio >= 1.3:
+            return 2
+        if ratio >= 1.15:
+            return 3
+        return None
+
+    def lines_to_blocks(
+        self, lines: List[TextLine], body_size: float
+    ) -> List[TextBlock]:
+        """
+        Assemble lines into headings, list items and paragraphs.
+
+        Args:
+            lines: Lines of one page
+            body_size: Font size of the body text of the document
+
+        Returns:
+            List of TextBlock in reading order
+        """
+        blocks: List[TextBlock] = []
+        paragraph: List[str] = []
+        paragraph_lines: List[TextLine] = []
+        previous: Optional[TextLine] = None
+
+        def flush():
+            if paragraph:
+                blocks.append(
+                    TextBlock("paragraph", " ".join(paragraph), list(paragraph_lines))
+                )
+                paragraph.clear()
+                paragraph_lines.clear()
+
+        for line in lines:
+            level = self._heading_level(line.font_size, body_size)
+            if level is not None:
+                flush()
+                blocks.append(TextBlock("heading", line.text, [line], level))
+                previous = None
+                continue
+            if LIST_ITEM_PATTERN.match(line.text):
+                flush()
+                blocks.append(
+                    TextBlock(
+                        "list_item",
+                        LIST_ITEM_PATTERN.sub("", line.text, count=1),
+                        [line],
+                    )
+                )
+                previous = line
+                continue
+
+            # a blank line shows as a baseline distance well above the usual
+            # line spacing of about 1.2 times the font size
+            if previous is not None and previous.bottom - line.bottom > 1.5 * max(
+                line.font_size, 1.0
+            ):
+                flush()
+            if paragraph and paragraph[-1].endswith("-") and line.text[:1].islower():
+                # join words hyphenated across lines
+                paragraph[-1] = paragraph[-1][:-1] + line.text
+            else:
+                paragraph.append(line.text)
+            paragraph_lines.append(line)
+            previous = line
+        flush()
+        return blocks
+
+    def lines_to_markdown(self, lines: List[TextLine], body_size: float) -> str:
+        """
+        Assemble lines into markdown headings, list items and paragraphs.
+
+        Args:
+            lines: Lines of one page
+            body_size: Font size of the body text of the document
+
+        Returns:
+            str: Markdown of the page
+        """
+        markdown = []
+        for block in self.lines_to_blocks(lines, body_size):
+            if block.kind == "heading":
+                markdown.append(f"{'#' * block.level} {block.text}")
+            elif block.kind == "list_item":
+                markdown.append(f"- {block.text}")
+            else:
+                markdown.append(block.text)
+        return "\n\n".join(markdown)
+
+    def analyse(self) -> Tuple[List[bool], float]:
+        """
+        Check every page of the PDF.
+
+        The lines of the usable pages are kept in `page_lines`, so converting
+        them does not read the text layer again.
+
+        Returns:
+            Tuple of the per-page usable flags and the body font size of the
+            usable pages
+        """
+        pdf = self.open_pdf()
+        usable = []
+        self.page_lines = {}
+        try:
+            for index, page in enumerate(pdf):
+                textpage = page.get_textpage()
+                has_text = self.page_has_text_layer(page, textpage)
+                usable.append(has_text)
+                if has_text:
+                    self.page_lines[index] = self.extract_lines(textpage)
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return usable, self.body_font_size(
+            [line for lines in self.page_lines.values() for line in lines]
+        )
+
+    def lines_of_pages(self, page_indices: List[int]) -> Dict[int, List[TextLine]]:
+        """Lines of some pages, from `analyse` or read from the PDF"""
+        missing = [index for index in page_indices if index not in self.page_lines]
+        if missing:
+            pdf = self.open_pdf()
+            try:
+                for index in missing:
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    self.page_lines[index] = self.extract_lines(textpage)
+                    textpage.close()
+                    page.close()
+            finally:
+                pdf.close()
+        return {index: self.page_lines[index] for index in page_indices}
+
+    def pages_to_markdown(self, page_indices: List[int], body_size: float) -> List[str]:
+        """
+        Convert the text layer of some pages to markdown.
+
+        Args:
+            page_indices: Zero based page indices
+            body_size: Body font size returned by `analyse`
+
+        Returns:
+            List of markdown strings, one per page
+        """
+        return [
+            self.lines_to_markdown(lines, body_size)
+            for lines in self.lines_of_pages(page_indices).values()
+        ]
+
+    def pages_to_document(
+        self, page_indices: List[int], body_size: float
+    ) -> "DoclingDocument":
+        """
+        Convert the text layer of some pages to a Docling document, with the
+        page number and bounding box of every heading, list item and paragraph.
+
+        Args:
+            page_indices: Zero based page indices
+            body_size: Body font size returned by `analyse`
+
+        Returns:
+            DoclingDocument, pages numbered as in the PDF
+        """
+        from docling_core.types.doc import (
+            BoundingBox,
+            CoordOrigin,
+            DocItemLabel,
+            DoclingDocument,
+            GroupLabel,
+            ProvenanceItem,
+            Size,
+        )
+
+        document = DoclingDocument(name=self.filename)
+        pdf = self.open_pdf()
+        try:
+            sizes = {index: pdf[index].get_size() for index in page_indices}
+        finally:
+            pdf.close()
+
+        for index, lines in self.lines_of_pages(page_indices).items():
+            width, height = sizes[index]
+            document.add_page(page_no=index + 1, size=Size(width=width, height=height))
+            group = None
+            for block in self.lines_to_blocks(lines, body_size):
+                prov = ProvenanceItem(
+                    page_no=index + 1,
+                    bbox=BoundingBox(
+                        l=min(line.left for line in block.lines),
+                        t=max(line.top for line in block.lines),
+                        r=max(line.right for line in block.lines),
+                        b=min(line.bottom for line in block.lines),
+                        coord_origin=CoordOrigin.BOTTOMLEFT,
+                    ),
+                    charspan=(0, len(block.text)),
+                )
+                if block.kind == "list_item":
+                    if group is None:
+                        group = document.add_group(label=GroupLabel.LIST)
+                    document.add_list_item(block.text, prov=prov, parent=group)
+                    continue
+                group = None
+                if block.kind == "heading" and block.level == 1:
+                    document.add_title(block.text, prov=prov)
+                elif block.kind == "heading":
+                    document.add_heading(block.text, level=block.level - 1, prov=prov)
+                else:
+                    document.add_text(DocItemLabel.PARAGRAPH, block.text, prov=prov)
+        return document
+
+    def process(self) -> Path:
+        """
+        Convert the whole PDF from its text layer, pages without a usable text
+        layer are left out.
+
+        Returns:
+            Path: Path to the generated markdown file
+        """
+        usable, body_size = self.analyse()
+        pages = [index for index, has_text in enumerate(usable) if has_text]
+        if len(pages) < len(usable):
+            logger.warning(
+                f"{len(usable) - len(pages)} pages of {self.file_path.name} have no "
+                f"usable text layer and are skipped"
+            )
+        return self.export_content_to_markdown_file(
+            "\n\n".join(self.pages_to_markdown(pages, body_size))
+        )
+
+    def __repr__(self) -> str:
+        return f"PDFTextLayer(file_path='{self.file_path}')"
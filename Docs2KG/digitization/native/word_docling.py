@@ -1,10 +1,14 @@
+import hashlib
+import mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Union
 
 import mammoth
 from loguru import logger
 
 from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.source import DocumentSource
 from Docs2KG.utils.config import PROJECT_CONFIG
 
 
@@ -13,8 +17,19 @@ class DOCXMammoth(DigitizationBase):
     DOCXDocling class for processing Word documents using mammoth.
     """
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Union[Path, DocumentSource], image_workers: int = 4):
+        """
+        Args:
+            file_path: Path to the DOCX, or a DocumentSource of a DOCX in memory
+            image_workers: Threads writing the extracted images
+        """
         super().__init__(file_path=file_path, supported_formats=["docx"])
+        self.image_workers = image_workers
+        self.images: List[Dict[str, Union[str, int]]] = []
+        # saved path of every distinct image, by content hash
+        self.saved_images: Dict[str, str] = {}
+        self.image_writes: List[Future] = []
+        self.image_executor: Optional[ThreadPoolExecutor] = None
 
     @staticmethod
     def validate_input(input_data: Union[str, Path]) -> bool:
@@ -44,9 +59,46 @@ class DOCXMammoth(DigitizationBase):
         Returns:
             Path: Path to the generated markdown file
         """
-        markdown_path = self.output_dir / f"{self.filename}.md"
-        markdown_path.write_text(content, encoding="utf-8")
-        return markdown_path
+        return self.writer.write_text(f"{self.filename}.md", content)
+
+    def save_image(self, image) -> Dict[str, str]:
+        """
+        Mammoth image handler: save the image to images/ instead of inlining it
+        as a base64 data URI.
+
+        Identical images are saved once, under a name derived from their
+        content hash, and written on the image thread pool.
+
+        Args:
+            image: Mammoth image of the document
+
+        Returns:
+            Attributes of the image element, its src is the saved path
+        """
+        with image.open() as image_bytes:
+            content = image_bytes.read()
+        digest = hashlib.sha256(content).hexdigest()
+        saved_path = self.saved_images.get(digest)
+        if saved_path is None:
+            suffix = mimetypes.guess_extension(image.content_type or "") or ".bin"
+            saved_path = f"images/image_{digest[:16]}{suffix}"
+            self.saved_images[digest] = saved_path
+            if not self.writer.path(saved_path).exists():
+                self.image_writes.append(
+                    self.image_executor.submit(
+                        self.writer.write_bytes, saved_path, content
+                    )
+                )
+        self.images.append(
+            {
+                "saved_path": saved_path,
+                "content_type": image.content_type,
+                "alt_text": image.alt_text or "",
+                "sha256": digest,
+                "size": len(content),
+            }
+        )
+        return {"src": saved_path}
 
     def process(self) -> Path:
         """
@@ -59,30 +111,47 @@ class DOCXMammoth(DigitizationBase):
             ValueError: If input is not a valid DOCX file
             FileNotFoundError: If DOCX file doesn't exist
         """
-        if not self.validate_input(self.file_path):
+        if not self.validate_source():
             raise ValueError(
                 f"Invalid input: {self.file_path}. Expected valid DOCX file"
             )
 
+        self.images, self.saved_images, self.image_writes = [], {}, []
         try:
-            # Convert DOCX to markdown using mammoth
-            with open(self.file_path, "rb") as docx_file:
-                result = mammoth.convert_to_markdown(docx_file)
+            # Convert DOCX to markdown using mammoth, extracting the images
+            with ThreadPoolExecutor(
+                max_workers=self.image_workers
+            ) as self.image_executor, self.input_source.open() as docx_file:
+                result = mammoth.convert_to_markdown(
+                    docx_file, convert_image=mammoth.images.img_element(self.save_image)
+                )
                 markdown_content = result.value
+                # raise the first image write error
+                for write in self.image_writes:
+                    write.result()
 
                 # Log any conversion messages
                 if result.messages:
                     for message in result.messages:
                         logger.info(f"Conversion message: {message}")
 
-            # Save markdown content to file
+            # Save markdown content and the image manifest
             markdown_path = self.export_markdown(markdown_content)
+            self.export_images_to_json_file(
+                {
+                    "total_images": len(self.images),
+                    "unique_images": len(self.saved_images),
+                    "images": self.images,
+                }
+            )
             return markdown_path
 
         except FileNotFoundError:
             raise FileNotFoundError(f"DOCX file not found: {self.file_path}")
         except Exception as e:
             raise Exception(f"Error processing DOCX: {str(e)}")
+        finally:
+            self.image_executor = None
 
     def __repr__(self) -> str:
         return f"DOCXDocling(file_path='{self.file_path}')"
@@ -0,0 +1,118 @@
+"""
+Digitization processors by document format.
+
+Processors are registered by their "module:Class" path and imported on first
+use, so listing the supported formats does not load docling, mammoth or
+ebooklib.
+
+Installed packages add processors through the "docs2kg.digitizers" entry point
+group, the entry point name is the format and its value the processor path:
+
+    [options.entry_points]
+    docs2kg.digitizers =
+        md = my_package.markdown:MarkdownDigitization
+
+The entry points are read, not imported, when the registry is first queried;
+the plugin module is only imported when a document of its format shows up.
+"""
+
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Type, Union
+
+from loguru import logger
+
+from Docs2KG.digitization.source import DocumentSource
+from Docs2KG.utils.lazy_import import import_object
+
+ENTRY_POINT_GROUP = "docs2kg.digitizers"
+
+PROCESSORS: Dict[str, str] = {
+    ".pdf": "Docs2KG.digitization.image.pdf_docling:PDFDocling",
+    ".docx": "Docs2KG.digitization.native.word_docling:DOCXMammoth",
+    ".html": "Docs2KG.digitization.native.html_parser:HTMLDocling",
+    ".epub": "Docs2KG.digitization.native.ebook:EPUBDigitization",
+}
+_entry_points_loaded = False
+
+
+def iter_entry_points(group: str) -> Iterable[Any]:
+    """Entry points of a group, on every supported Python version."""
+    from importlib.metadata import entry_points
+
+    found = entry_points()
+    if hasattr(found, "select"):
+        return found.select(group=group)
+    return found.get(group, [])
+
+
+def register_processor(suffix: str, processor: str) -> None:
+    """
+    Register a processor for a file extension.
+
+    Args:
+        suffix: File extension including the dot, e.g. ".pdf"
+        processor: "module:Class" path of a DigitizationBase subclass
+    """
+    PROCESSORS[suffix.lower()] = processor
+
+
+def load_entry_points() -> None:
+    """Register the processors of the installed plugins, once."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in iter_entry_points(ENTRY_POINT_GROUP):
+        suffix = f".{entry_point.name.lstrip('.')}".lower()
+        if suffix in PROCESSORS and PROCESSORS[suffix] != entry_point.value:
+            logger.info(
+                f"{entry_point.value} replaces {PROCESSORS[suffix]} for {suffix}"
+            )
+        PROCESSORS[suffix] = entry_point.value
+
+
+def supported_suffixes() -> List[str]:
+    load_entry_points()
+    return list(PROCESSORS.keys())
+
+
+def detect_format(
+    document: Union[DocumentSource, Path, bytes, BinaryIO]
+) -> Optional[str]:
+    """
+    Supported format of a document, without importing its processor.
+
+    The format is sniffed from the content, so a document with a wrong or
+    missing extension still finds its processor; the extension is used when
+    the content is not recognised.
+
+    Args:
+        document: Path, content or file object of the document
+
+    Returns:
+        Format as registered, e.g. ".pdf", None if not supported
+    """
+    load_entry_points()
+    source = DocumentSource.of(document)
+    for document_format in (source.format, source.suffix):
+        if document_format in PROCESSORS:
+            return document_format
+    return None
+
+
+def get_processor_class(
+    document: Union[DocumentSource, Path, bytes, BinaryIO]
+) -> Optional[Type]:
+    """
+    Import the processor of a document's format, see `detect_format`.
+
+    Args:
+        document: Path, content or file object of the document
+
+    Returns:
+        The processor class, None if the format is not supported
+    """
+    document_format = detect_format(document)
+    if document_format is None:
+        return None
+    return import_object(PROCESSORS[document_format])
@@ -0,0 +1,248 @@
+"""
+Inputs of the digitizers and detection of their format.
+
+A document can be a local file, bytes already in memory, or a file object, for
+example a body streamed from an object store or a member read from an archive.
+`DocumentSource` gives the digitizers one interface over all of them, so they
+never need a temporary file.
+
+The format of a document is sniffed from its first bytes, the file name
+extension is only used when the content is not recognised. Plugins add formats
+with `register_sniffer`, or through the "docs2kg.sniffers" entry point group.
+"""
+
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Union
+
+from loguru import logger
+
+from Docs2KG.utils.hashing import hash_stream
+from Docs2KG.utils.lazy_import import import_object
+
+SNIFFER_ENTRY_POINT_GROUP = "docs2kg.sniffers"
+# enough for every signature below, the EPUB mimetype is at offset 30
+SNIFF_SIZE = 4096
+
+# a sniffer gets the first SNIFF_SIZE bytes and the source, for containers
+# that need more than their head, and returns a format such as ".pdf"
+Sniffer = Callable[[bytes, "DocumentSource"], Optional[str]]
+
+EPUB_MIMETYPE = b"mimetypeapplication/epub+zip"
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body")
+
+
+def sniff_pdf(head: bytes, source: "DocumentSource") -> Optional[str]:
+    # the header may follow some junk bytes, readers look in the first 1 KB
+    return ".pdf" if b"%PDF-" in head[:1024] else None
+
+
+def sniff_zip_container(head: bytes, source: "DocumentSource") -> Optional[str]:
+    if not head.startswith(b"PK\x03\x04"):
+        return None
+    if head[30:58] == EPUB_MIMETYPE:
+        return ".epub"
+    # the first member is not always the one naming the format, read the
+    # central directory for the others
+    try:
+        with source.open() as f, zipfile.ZipFile(f) as archive:
+            names = set(archive.namelist())
+    except zipfile.BadZipFile:
+        return None
+    if "word/document.xml" in names:
+        return ".docx"
+    if "META-INF/container.xml" in names:
+        return ".epub"
+    return None
+
+
+def sniff_html(head: bytes, source: "DocumentSource") -> Optional[str]:
+    # zip members stored uncompressed carry their HTML as is, and binary
+    # files may contain the markers anywhere: only trust a text head that
+    # starts with one
+    if head.startswith(b"PK\x03\x04") or b"\x00" in head:
+        return None
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(b"<?xml"):
+        text = text[text.find(b"?>") + 2 :].lstrip()
+    while text.startswith(b"<!--") and b"-->" in text:
+        text = text[text.find(b"-->") + 3 :].lstrip()
+    if text.startswith(HTML_MARKERS):
+        return ".html"
+    return None
+
+
+SNIFFERS: List[Sniffer] = [sniff_pdf, sniff_zip_container, sniff_html]
+_entry_points_loaded = False
+
+
+def register_sniffer(sniffer: Sniffer, first: bool = False) -> None:
+    """
+    Register a format sniffer.
+
+    Args:
+        sniffer: Function of the document head and source returning a format
+            such as ".pdf", or None when it does not recognise the content
+        first: Try it before the built-in sniffers
+    """
+    if first:
+        SNIFFERS.insert(0, sniffer)
+    else:
+        SNIFFERS.append(sniffer)
+
+
+def load_sniffer_entry_points() -> None:
+    """Register the sniffers of the installed plugins, once."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from Docs2KG.digitization.registry import iter_entry_points
+
+    for entry_point in iter_entry_points(SNIFFER_ENTRY_POINT_GROUP):
+        try:
+            register_sniffer(import_object(entry_point.value))
+        except Exception as e:
+            logger.warning(f"Cannot load sniffer {entry_point.value}: {str(e)}")
+
+
+def sniff_format(source: "DocumentSource") -> Optional[str]:
+    """
+    Detect the format of a document from its content.
+
+    Args:
+        source: Document to sniff
+
+    Returns:
+        Format as a file extension, e.g. ".pdf", None if not recognised
+    """
+    load_sniffer_entry_points()
+    head = source.head(SNIFF_SIZE)
+    if not head:
+        return None
+    for sniffer in SNIFFERS:
+        document_format = sniffer(head, source)
+        if document_format:
+            return document_format.lower()
+    return None
+
+
+class DocumentSource:
+    """
+    A document to digitize: a local file, bytes, or a file object.
+
+    Seekable file objects are read in place and rewound for every reader,
+    other streams are read into memory once.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, bytes, bytearray, BinaryIO],
+        name: Optional[str] = None,
+        document_format: Optional[str] = None,
+        origin: Optional[str] = None,
+    ):
+        """
+        Args:
+            source: Path, content or binary file object of the document
+            name: File name of the document, defaults to the path name or the
+                name of the file object, used for the output names
+            document_format: Format of the document, e.g. ".pdf", sniffed from
+                the content when not given
+            origin: Where the document comes from, e.g. the member path of an
+                archive (see `Docs2KG.digitization.ingest`), recorded as its
+                provenance
+        """
+        self.path: Optional[Path] = None
+        self._data: Optional[bytes] = None
+        self._stream: Optional[BinaryIO] = None
+        if isinstance(source, (str, Path)):
+            self.path = Path(source)
+            name = name or self.path.name
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = bytes(source)
+        elif hasattr(source, "read"):
+            stream_name = getattr(source, "name", None)
+            if isinstance(stream_name, str):
+                name = name or Path(stream_name).name
+            if getattr(source, "seekable", lambda: False)():
+                self._stream = source
+            else:
+                self._data = source.read()
+        else:
+            raise TypeError(f"Unsupported document source: {type(source).__name__}")
+        self.name = name or "document"
+        self.origin = origin
+        if document_format and not document_format.startswith("."):
+            document_format = f".{document_format}"
+        self._format = document_format.lower() if document_format else None
+
+    @classmethod
+    def of(
+        cls, source: Union["DocumentSource", str, Path, bytes, BinaryIO]
+    ) -> "DocumentSource":
+        return source if isinstance(source, DocumentSource) else cls(source)
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix.lower()
+
+    @property
+    def format(self) -> str:
+        """Sniffed format of the document, its extension if not recognised."""
+        if self._format is None:
+            sniffed = sniff_format(self) if self.exists() else None
+            self._format = sniffed or self.suffix
+        return self._format
+
+    def exists(self) -> bool:
+        return self.path.is_file() if self.path is not None else True
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """
+        Open the document for reading from its start.
+
+        Yields:
+            Binary file object, file objects given by the caller are not closed
+        """
+        if self.path is not None:
+            with open(self.path, "rb") as f:
+                yield f
+        elif self._stream is not None:
+            self._stream.seek(0)
+            yield self._stream
+        else:
+            yield io.BytesIO(self._data)
+
+    def head(self, size: int) -> bytes:
+        with self.open() as f:
+            return f.read(size)
+
+    def read_bytes(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        with self.open() as f:
+            return f.read()
+
+    def path_or_bytes(self) -> Union[Path, bytes]:
+        """The path of a local file, the content otherwise, for readers taking either."""
+        return self.path if self.path is not None else self.read_bytes()
+
+    def sha256(self) -> str:
+        with self.open() as f:
+            return hash_stream(f)
+
+    def __str__(self) -> str:
+        if self.origin:
+            return self.origin
+        return str(self.path) if self.path is not None else self.name
+
+    def __repr__(self) -> str:
+        return f"DocumentSource({str(self)!r})"
@@ -0,0 +1,274 @@
+"""
+Content-addressed store of the digitization outputs.
+
+Documents are identified by the SHA-256 of their bytes. The store remembers
+which output folder each (document hash, processor) pair was converted to, so
+the same document found again, under another name or in another input folder,
+is linked to the existing outputs instead of being converted again. Output
+names belong to the source they were given to: an edited document keeps its
+name and replaces its outputs, another document with the same file name gets
+the name suffixed with its hash prefix. The images of every document are
+kept once in a shared pool and hard linked into the document folders.
+
+Layout under <output_dir>/store:
+
+    index.json                 owner of every name, conversions of every hash
+    images/<ab>/<sha256><ext>  shared image pool
+"""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from loguru import logger
+
+from Docs2KG.digitization.source import DocumentSource
+from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.hashing import hash_file
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """Hard link a file, copying it when the file system does not allow it."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def processor_key(processor: Any) -> str:
+    """
+    Key of the conversion settings of a processor instance.
+
+    Outputs are only shared between conversions made by the same processor
+    with the same pipeline profile and text layer setting.
+    """
+    parts = [processor.__class__.__name__]
+    profile = getattr(processor, "profile", None)
+    if profile:
+        parts.append(profile)
+    if hasattr(processor, "text_layer"):
+        parts.append("text_layer" if processor.text_layer else "no_text_layer")
+    return ":".join(parts)
+
+
+class OutputStore:
+    """Index of the digitization outputs by document content hash."""
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root: Folder of the store, defaults to <output_dir>/store
+        """
+        self.root = Path(root or PROJECT_CONFIG.data.output_dir / "store")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+        self.index: Dict[str, Dict] = {"names": {}, "documents": {}}
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text())
+        # names used to map to the digest only, their source is unknown
+        for name, owner in self.index["names"].items():
+            if isinstance(owner, str):
+                self.index["names"][name] = {"source": None, "digest": owner}
+        self._names_by_source = {
+            owner["source"]: name
+            for name, owner in self.index["names"].items()
+            if owner["source"] is not None
+        }
+        self._lock = threading.Lock()
+
+    def document_name(self, source: Union[Path, DocumentSource], digest: str) -> str:
+        """
+        Output name of a document.
+
+        A source keeps the name it was first given, and a new content hash for
+        it replaces the old one, so an edited document updates its outputs.
+        Otherwise the name is the file stem, or the stem suffixed with the hash
+        prefix when another source with different content owns the stem.
+
+        Args:
+            source: Input document, its path or archive origin owns the name;
+                documents held in memory without either own none
+            digest: Content hash of the document
+
+        Returns:
+            str: Name used for the output folder and files
+        """
+        source = DocumentSource.of(source)
+        source_key = str(source) if source.path is not None or source.origin else None
+        stem = Path(source.name).stem
+        with self._lock:
+            names = self.index["names"]
+            if source_key in self._names_by_source:
+                name = self._names_by_source[source_key]
+                self._assign(name, source_key, digest)
+                return name
+            for name in (stem, f"{stem}-{digest[:8]}"):
+                owner = names.get(name)
+                if owner is None:
+                    self._assign(name, source_key, digest)
+                    return name
+                if owner["digest"] == digest:
+                    # same content under another path, share its outputs
+                    return name
+        raise ValueError(f"No free output name for {source}")
+
+    def _assign(self, name: str, source_key: Optional[str], digest: str) -> None:
+        """Give a name to a source, dropping the outputs of its old content"""
+        owner = self.index["names"].get(name)
+        if owner is not None and owner["digest"] != digest:
+            conversions = (
+                self.index["documents"].get(owner["digest"], {}).get("conversions", {})
+            )
+            for key in [
+                key for key, value in conversions.items() if value["name"] == name
+            ]:
+                del conversions[key]
+        self.index["names"][name] = {"source": source_key, "digest": digest}
+        if source_key is not None:
+            self._names_by_source[source_key] = name
+
+    def find(self, digest: str, key: str) -> Optional[Tuple[str, Path]]:
+        """
+        Previous conversion of a document with the same processor settings.
+
+        Args:
+            digest: Content hash of the document
+            key: `processor_key` of the processor
+
+        Returns:
+            Tuple of the document name and output folder of that conversion,
+            None if there is none or its outputs were removed
+        """
+        conversion = (
+            self.index["documents"].get(digest, {}).get("conversions", {}).get(key)
+        )
+        if conversion is None:
+            return None
+        output_dir = Path(conversion["output_dir"])
+        if not (output_dir / f"{conversion['name']}.md").exists():
+            return None
+        return conversion["name"], output_dir
+
+    def register(
+        self,
+        digest: str,
+        key: str,
+        name: str,
+        output_dir: Path,
+        source: Union[Path, DocumentSource],
+    ) -> None:
+        """Record the outputs of a conversion and pool its images."""
+        self.pool_images(output_dir)
+        with self._lock:
+            document = self.index["documents"].setdefault(
+                digest, {"sources": [], "conversions": {}}
+            )
+            if str(source) not in document["sources"]:
+                document["sources"].append(str(source))
+            document["conversions"][key] = {"name": name, "output_dir": str(output_dir)}
+        self.save()
+
+    def add_source(self, digest: str, source: Union[Path, DocumentSource]) -> None:
+        with self._lock:
+            sources = self.index["documents"][digest]["sources"]
+            if str(source) not in sources:
+                sources.append(str(source))
+        self.save()
+
+    def pool_images(self, output_dir: Path) -> None:
+        """
+        Move the images of an output folder into the shared pool and hard link
+        them back, so an image used by several documents is stored once.
+        """
+        images_dir = output_dir / "images"
+        if not images_dir.exists():
+            return
+        for image_path in images_dir.rglob("*"):
+            if not image_path.is_file() or image_path.stat().st_nlink > 1:
+                continue
+            digest = hash_file(image_path)
+            pooled = self.root / "images" / digest[:2] / f"{digest}{image_path.suffix}"
+            if not pooled.exists():
+                pooled.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(image_path), pooled)
+            link_or_copy(pooled, image_path)
+
+    @staticmethod
+    def materialize(
+        source_dir: Path, source_name: str, target_dir: Path, target_name: str
+    ) -> Path:
+        """
+        Link the outputs of a previous conversion into another output folder.
+
+        Files named after the source document are renamed after the target one,
+        images keep their names so the markdown references stay valid.
+
+        Returns:
+            Path: Markdown file in the target folder
+        """
+        for source in source_dir.rglob("*"):
+            if not source.is_file():
+                continue
+            relative = source.relative_to(source_dir)
+            if len(relative.parts) == 1 and source.name.startswith(source_name):
+                relative = Path(target_name + source.name[len(source_name) :])
+            link_or_copy(source, target_dir / relative)
+        return target_dir / f"{target_name}.md"
+
+    def save(self) -> None:
+        with self._lock:
+            tmp_path = self.index_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(self.index, indent=2))
+            tmp_path.replace(self.index_path)
+
+
+def digitize(
+    file_path: Union[Path, DocumentSource],
+    processor_class: Type,
+    store: Optional[OutputStore] = None,
+) -> Tuple[Any, Path]:
+    """
+    Convert a document, reusing the outputs of an identical document when the
+    store has them.
+
+    Args:
+        file_path: Input document, a path or a DocumentSource
+        processor_class: DigitizationBase subclass for the document
+        store: Output store, defaults to the one under the output folder
+
+    Returns:
+        Tuple of the processor and the path of the markdown output
+    """
+    store = store or OutputStore()
+    source = DocumentSource.of(file_path)
+    digest = source.sha256()
+    processor = processor_class(file_path=source)
+    # distinct documents sharing a file name get distinct output folders
+    processor.filename = store.document_name(source, digest)
+    key = processor_key(processor)
+
+    previous = store.find(digest, key)
+    if previous is not None:
+        name, source_dir = previous
+        if source_dir == processor.output_dir:
+            markdown_path = source_dir / f"{name}.md"
+        else:
+            logger.info(
+                f"{source.name} has the same content as {name}, " f"reusing its outputs"
+            )
+            markdown_path = store.materialize(
+                source_dir, name, processor.output_dir, processor.filename
+            )
+        store.add_source(digest, source)
+        return processor, markdown_path
+
+    processor.process()
+    markdown_path = processor.output_dir / f"{processor.filename}.md"
+    store.register(digest, key, processor.filename, processor.output_dir, source)
+    return processor, markdown_path
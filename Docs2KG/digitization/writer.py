@@ -0,0 +1,100 @@
+"""
+Output files of a digitized document.
+
+Every file is written to a temporary file in the same folder and renamed over
+the target, so a crash never leaves a truncated markdown or JSON file behind:
+readers see either the previous complete file or the new one.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+FSYNC_POLICIES = ("none", "file", "full")
+
+
+class OutputWriter:
+    """
+    Owns the output folder of one document and writes its files atomically.
+
+    The folder and its images/ sub folder are created once, when the writer is
+    created. The fsync policy trades durability for speed:
+
+    - none: rename only, the file is complete but may be lost on power failure
+    - file: fsync each file before the rename
+    - full: also fsync the folder after the rename, so the rename itself is durable
+    """
+
+    def __init__(self, output_dir: Path, fsync: str = "none"):
+        """
+        Args:
+            output_dir: Output folder of the document
+            fsync: One of FSYNC_POLICIES
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f"Unknown fsync policy {fsync}, must be one of {FSYNC_POLICIES}"
+            )
+        self.output_dir = Path(output_dir)
+        self.images_dir = self.output_dir / "images"
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+
+    def path(self, relative_path: str) -> Path:
+        return self.output_dir / relative_path
+
+    def _fsync_dir(self, directory: Path) -> None:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def open(self, relative_path: str, mode: str = "w") -> Iterator[IO[Any]]:
+        """
+        Open an output file for writing, it appears under its name only when
+        the block completes without error.
+
+        Args:
+            relative_path: Path of the file in the output folder
+            mode: "w" for text, "wb" for bytes
+
+        Yields:
+            File object of the temporary file
+        """
+        target = self.path(relative_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+        )
+        try:
+            encoding: Optional[str] = None if "b" in mode else "utf-8"
+            with os.fdopen(fd, mode, encoding=encoding) as f:
+                yield f
+                f.flush()
+                if self.fsync != "none":
+                    os.fsync(f.fileno())
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        if self.fsync == "full":
+            self._fsync_dir(target.parent)
+
+    def write_text(self, relative_path: str, text: str) -> Path:
+        with self.open(relative_path) as f:
+            f.write(text)
+        return self.path(relative_path)
+
+    def write_bytes(self, relative_path: str, content: bytes) -> Path:
+        with self.open(relative_path, "wb") as f:
+            f.write(content)
+        return self.path(relative_path)
+
+    def write_json(self, relative_path: str, data: Any) -> Path:
+        return self.write_text(relative_path, json.dumps(data, indent=4))
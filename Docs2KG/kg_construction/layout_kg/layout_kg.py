@@ -1,12 +1,34 @@
 import json
 import uuid
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import markdown
 from bs4 import BeautifulSoup
 
 from Docs2KG.kg_construction.base import KGConstructionBase
 from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.timer import timer
+
+if TYPE_CHECKING:
+    from docling_core.types.doc import DocItem, DoclingDocument
+
+# Docling item labels with their layout label, page headers and footers,
+# pictures and form regions are left out like in Docling's markdown export
+DOCLING_LABELS = {
+    "title": "H1",
+    "paragraph": "P",
+    "text": "P",
+    "caption": "P",
+    "footnote": "P",
+    "formula": "P",
+    "reference": "P",
+    "list_item": "LI",
+    "code": "CODE",
+    "table": "TABLE",
+    # groups
+    "list": "UL",
+    "ordered_list": "OL",
+}
 
 
 class LayoutKGConstruction(KGConstructionBase):
@@ -111,13 +133,109 @@ class LayoutKGConstruction(KGConstructionBase):
             },
         }
 
-    def construct(self, docs: List[Dict[str, str]]) -> Dict[str, Any]:
+    @staticmethod
+    def _docling_element(
+        item: "DocItem", label: str, text: str, with_provenance: bool = True
+    ) -> Dict[str, Any]:
+        element = {
+            "id": f"p_{str(uuid.uuid4())}",
+            "text": text,
+            "label": label,
+            "entities": [],
+            "relations": [],
+        }
+        if with_provenance and item.prov:
+            provenance = item.prov[0]
+            element["page"] = provenance.page_no
+            bbox = provenance.bbox
+            element["bbox"] = [bbox.l, bbox.t, bbox.r, bbox.b]
+        return element
+
+    def _process_docling_document(
+        self, document: "DoclingDocument", filename: str
+    ) -> Dict[str, Any]:
+        """
+        Extract the layout elements of a Docling document in a single walk.
+
+        This avoids exporting the document to markdown and parsing it back
+        through HTML, and keeps the page number and bounding box (in PDF
+        points, bottom-left origin) of every element.
+
+        Args:
+            document: Document returned by a Docling converter
+            filename: Name of the document
+
+        Returns:
+            dict: Structured document information with layout elements, in the
+                same format as `_process_document`
+        """
+        elements = []
+        for item, _ in document.iterate_items(with_groups=True):
+            label = item.label.value
+            if label == "section_header":
+                layout_label = f"H{min(getattr(item, 'level', 1) + 1, 6)}"
+            else:
+                layout_label = DOCLING_LABELS.get(label)
+            if layout_label is None:
+                continue
+
+            if layout_label in ("UL", "OL"):
+                text = "\n".join(
+                    child.resolve(document).text.strip()
+                    for child in item.children
+                    if hasattr(child.resolve(document), "text")
+                )
+                if text.strip():
+                    elements.append(
+                        self._docling_element(item, layout_label, text, False)
+                    )
+                continue
+            if layout_label != "TABLE":
+                text = item.text.strip()
+                if text:
+                    elements.append(self._docling_element(item, layout_label, text))
+                continue
+
+            rows = [[cell.text.strip() for cell in row] for row in item.data.grid]
+            if not any(any(row) for row in rows):
+                continue
+            elements.append(
+                self._docling_element(
+                    item, "TABLE", "\n".join(" ".join(row) for row in rows)
+                )
+            )
+            for row, cells in zip(item.data.grid, rows):
+                elements.append(
+                    self._docling_element(item, "TR", " ".join(cells), False)
+                )
+                for cell, text in zip(row, cells):
+                    if text:
+                        elements.append(
+                            self._docling_element(
+                                item, "TH" if cell.column_header else "TD", text, False
+                            )
+                        )
+
+        return {
+            "filename": filename,
+            "data": elements,
+            "metadata": {
+                "title": filename,
+                "pages": len(document.pages),
+            },
+        }
+
+    def construct(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Construct the layout knowledge graph from a list of documents.
 
         Args:
             docs: List of documents, where each document is a dict containing
-                 'content' and 'filename' keys
+                 'content' and 'filename' keys. A 'document' key holding a
+                 DoclingDocument can be given instead of 'content', its layout
+                 is then read directly from the document. An optional 'source'
+                 key, e.g. the member path of an archive, is kept in the
+                 document metadata as its provenance
 
         Returns:
             dict: Layout knowledge graph containing all processed documents
@@ -147,11 +265,22 @@ class LayoutKGConstruction(KGConstructionBase):
             json.dump(layout_schema, f, indent=2, ensure_ascii=False)
 
         for doc in docs:
-            content = doc["content"]
             filename = doc["filename"]
+            docling_document: Optional["DoclingDocument"] = doc.get("document")
 
             # Process the document
-            doc_kg = self._process_document(content, filename)
+            with timer(
+                None,
+                "Layout KG of a document",
+                category="layout",
+                args={"file": filename},
+            ):
+                if docling_document is not None:
+                    doc_kg = self._process_docling_document(docling_document, filename)
+                else:
+                    doc_kg = self._process_document(doc["content"], filename)
+            if doc.get("source"):
+                doc_kg["metadata"]["source"] = doc["source"]
 
             # Save individual document KG
             output_path = self.layout_folder / f"{filename}.json"
@@ -0,0 +1,313 @@
+"""
+Column profiles of metadata tables.
+
+A metadata column is continuous when it is numeric and most of its values are
+distinct. Counting distinct values exactly needs every value in memory, so a
+profile keeps a HyperLogLog sketch per column instead: a fixed 16 KB per
+column, filled in one pass over the data, chunk by chunk, with an error around
+1% (precision 14). Sketches of two profiles merge into the profile of both
+tables, so a profile can be updated with new rows without reading the old ones
+again.
+
+`ColumnProfiler` caches the profile of a CSV by the hash of its content.
+"""
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Docs2KG.utils.hashing import hash_file
+
+HLL_PRECISION = 14
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of unsigned 64 bit integers."""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths[high] += shift
+        values[high] >>= np.uint64(shift)
+    return lengths + (values > 0).astype(np.uint8)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64 bit hashes."""
+
+    def __init__(
+        self, precision: int = HLL_PRECISION, registers: Optional[np.ndarray] = None
+    ):
+        self.precision = precision
+        self.registers = (
+            registers
+            if registers is not None
+            else np.zeros(1 << precision, dtype=np.uint8)
+        )
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Add a batch of hashed values.
+
+        Args:
+            hashes: uint64 hashes, e.g. from `pd.util.hash_array`
+        """
+        if not len(hashes):
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        # position of the first set bit of the remainder, from the left
+        rank = (width + 1 - _bit_length(remainder)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precisions")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        # linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """
+    Hash the non-empty values of a column.
+
+    Numbers are hashed as floats, so a column read as integers in one chunk and
+    as floats in another (once an empty cell shows up) hashes the same values
+    the same way.
+    """
+    values = series.dropna()
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        array = values.to_numpy(dtype=np.float64)
+    else:
+        array = values.astype(str).to_numpy(dtype=object)
+    return pd.util.hash_array(array)
+
+
+@dataclass
+class ColumnStats:
+    """Distinct value sketch of a column"""
+
+    numeric: bool = True
+    nulls: int = 0
+    sketch: HyperLogLog = field(default_factory=HyperLogLog)
+
+    def copy(self) -> "ColumnStats":
+        return ColumnStats(
+            self.numeric,
+            self.nulls,
+            HyperLogLog(self.sketch.precision, self.sketch.registers.copy()),
+        )
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        return ColumnStats(
+            numeric=self.numeric and other.numeric,
+            nulls=self.nulls + other.nulls,
+            sketch=self.sketch.merge(other.sketch),
+        )
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Row count and distinct value sketches of the columns of a table.
+
+    Build one with `update`, chunk by chunk, or with `ColumnProfiler`.
+    """
+
+    rows: int = 0
+    columns: Dict[str, ColumnStats] = field(default_factory=dict)
+
+    def update(self, df: pd.DataFrame) -> "ColumnProfile":
+        """Add the rows of a table or chunk to the profile, in place."""
+        self.rows += len(df)
+        for column in df.columns:
+            stats = self.columns.setdefault(column, ColumnStats())
+            series = df[column]
+            stats.numeric = stats.numeric and pd.api.types.is_numeric_dtype(series)
+            stats.nulls += int(series.isna().sum())
+            stats.sketch.add_hashes(hash_values(series))
+        return self
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        """
+        Profile of the rows of both profiles, e.g. the rows already loaded and
+        an incremental update. A column missing from one side counts its rows
+        as empty.
+        """
+        columns = {}
+        for column in {**self.columns, **other.columns}:
+            mine, theirs = self.columns.get(column), other.columns.get(column)
+            if mine is not None and theirs is not None:
+                columns[column] = mine.merge(theirs)
+            else:
+                columns[column] = (mine or theirs).copy()
+                columns[column].nulls += other.rows if theirs is None else self.rows
+        return ColumnProfile(rows=self.rows + other.rows, columns=columns)
+
+    def distinct(self, column: str) -> int:
+        """Approximate number of distinct values, empty counted as one value."""
+        stats = self.columns[column]
+        return stats.sketch.count() + (1 if stats.nulls else 0)
+
+    def unique_ratio(self, column: str) -> float:
+        return self.distinct(column) / self.rows if self.rows else 0.0
+
+    def is_continuous(self, column: str, threshold: float = 0.5) -> bool:
+        return self.columns[column].numeric and self.unique_ratio(column) > threshold
+
+    def column_types(
+        self, document_id_column: str, threshold: float = 0.5
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Split the columns into continuous and categorical ones.
+
+        Args:
+            document_id_column: Column left out of both
+            threshold: Unique ratio above which a numeric column is continuous
+
+        Returns:
+            Tuple of the continuous and the categorical columns, in column order
+        """
+        continuous, categorical = [], []
+        for column in self.columns:
+            if column == document_id_column:
+                continue
+            if self.is_continuous(column, threshold):
+                continuous.append(column)
+            else:
+                categorical.append(column)
+        return continuous, categorical
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": {
+                column: {
+                    "numeric": stats.numeric,
+                    "nulls": stats.nulls,
+                    "precision": stats.sketch.precision,
+                    "registers": base64.b64encode(
+                        stats.sketch.registers.tobytes()
+                    ).decode("ascii"),
+                }
+                for column, stats in self.columns.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnProfile":
+        return cls(
+            rows=data["rows"],
+            columns={
+                column: ColumnStats(
+                    numeric=stats["numeric"],
+                    nulls=stats["nulls"],
+                    sketch=HyperLogLog(
+                        stats["precision"],
+                        np.frombuffer(
+                            base64.b64decode(stats["registers"]), dtype=np.uint8
+                        ).copy(),
+                    ),
+                )
+                for column, stats in data["columns"].items()
+            },
+        )
+
+
+class ColumnProfiler:
+    """
+    Builds column profiles and caches those of CSV files by content hash, so
+    the same file is never profiled twice.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            cache_dir: Folder of the cached profiles, no caching if None
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    @staticmethod
+    def profile_frame(df: pd.DataFrame) -> ColumnProfile:
+        return ColumnProfile().update(df)
+
+    def cache_path(
+        self,
+        csv_path: Union[str, Path],
+        max_rows: Optional[int] = None,
+        dtype: Optional[Dict[str, str]] = None,
+    ) -> Optional[Path]:
+        """Cache file of the profile of a CSV read with some settings."""
+        if self.cache_dir is None:
+            return None
+        key = hash_file(Path(csv_path))
+        if max_rows:
+            key += f"-{max_rows}"
+        if dtype:
+            dtype_key = json.dumps(dtype, sort_keys=True).encode("utf-8")
+            key += f"-{hashlib.sha256(dtype_key).hexdigest()[:8]}"
+        return self.cache_dir / f"{key}.json"
+
+    def profile_file(
+        self,
+        csv_path: Union[str, Path],
+        dtype: Optional[Dict[str, str]] = None,
+        chunk_size: int = 100_000,
+        max_rows: Optional[int] = None,
+        frame: Optional[pd.DataFrame] = None,
+    ) -> ColumnProfile:
+        """
+        Load the cached profile of a CSV, or profile it in one chunked pass.
+
+        Args:
+            csv_path: CSV file
+            dtype: Dtypes to read the columns with
+            chunk_size: Rows per chunk
+            max_rows: Only profile the first rows, None for the whole file
+            frame: The rows to profile, when the caller already read them
+
+        Returns:
+            ColumnProfile
+        """
+        cache_path = self.cache_path(csv_path, max_rows, dtype)
+        if cache_path is not None and cache_path.exists():
+            return ColumnProfile.from_dict(json.loads(cache_path.read_text()))
+
+        if frame is not None:
+            profile = self.profile_frame(frame)
+        else:
+            profile = ColumnProfile()
+            for chunk in pd.read_csv(
+                csv_path, chunksize=chunk_size, nrows=max_rows, dtype=dtype
+            ):
+                profile.update(chunk)
+
+        if cache_path is not None:
+            self.save(profile, cache_path)
+            logger.info(f"Profiled {profile.rows} rows of {Path(csv_path).name}")
+        return profile
+
+    @staticmethod
+    def save(profile: ColumnProfile, cache_path: Path) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(profile.to_dict()))
+        tmp_path.replace(cache_path)
@@ -1,9 +1,20 @@
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
+from loguru import logger
 
 from Docs2KG.kg_construction.base import KGConstructionBase
+from Docs2KG.kg_construction.metadata_kg.column_profile import (
+    ColumnProfile,
+    ColumnProfiler,
+)
+from Docs2KG.kg_construction.metadata_kg.record_writer import (
+    NODE_FIELDS,
+    RELATIONSHIP_FIELDS,
+    open_record_writer,
+)
 from Docs2KG.utils.config import PROJECT_CONFIG
 
 
@@ -16,42 +27,96 @@ class MetadataKGConstruction(KGConstructionBase):
     - for columns is continuous, we will ignore it and put them as the property of the document node
     """
 
-    def __init__(self, project_id: str):
-
+    def __init__(self, project_id: str, profiler: Optional[ColumnProfiler] = None):
+        """
+        Args:
+            project_id: Project of the KG
+            profiler: Column profiler, shared by constructions that should
+                reuse its cached profiles, defaults to one caching in the
+                project's column_profiles folder
+        """
         super().__init__(project_id)
         self.document_id_column = "name"
-        self.continuous_columns = []
-        self.categorical_columns = []
+        self.continuous_columns: List[str] = []
+        self.categorical_columns: List[str] = []
+        self.profiler = profiler or ColumnProfiler(
+            self.project_folder / "column_profiles"
+        )
+        # profile the column types were last decided from
+        self.column_profile: Optional[ColumnProfile] = None
 
-    @staticmethod
-    def _is_continuous(series: pd.Series, threshold: float = 0.5) -> bool:
+    def _identify_column_types(
+        self, df: pd.DataFrame, profile: Optional[ColumnProfile] = None
+    ) -> None:
         """
-        Determine if a column should be treated as continuous based on unique value ratio
+        Identify continuous and categorical columns in the dataframe
 
-        Args:
-            series: pandas Series to check
-            threshold: ratio threshold to determine if continuous
+        The column lists are rebuilt on every call, so an instance can
+        construct the KGs of several tables.
 
-        Returns:
-            bool: True if the column should be treated as continuous
+        Args:
+            df: input dataframe
+            profile: column profile to decide from, e.g. one merged across
+                incremental updates, defaults to the profile of df
         """
-        unique_ratio = len(series.unique()) / len(series)
-        return unique_ratio > threshold and pd.api.types.is_numeric_dtype(series)
+        if profile is None:
+            profile = self.profiler.profile_frame(df)
+        self.column_profile = profile
+        continuous, categorical = profile.column_types(self.document_id_column)
+        # keep the column order of the table, and only its columns
+        self.continuous_columns = [
+            column for column in df.columns if column in set(continuous)
+        ]
+        self.categorical_columns = [
+            column for column in df.columns if column in set(categorical)
+        ]
 
-    def _identify_column_types(self, df: pd.DataFrame) -> None:
+    def _row_values(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
         """
-        Identify continuous and categorical columns in the dataframe
+        Values of some columns as a 2D array, one row per document.
+
+        The values are taken from `df.values`, as `iterrows` did, so they keep
+        the type that frame-wide interleaving gives them: when every column is
+        numeric, integers come out as floats (e.g. doc_1.0).
 
         Args:
             df: input dataframe
+            columns: columns to take, in order
+
+        Returns:
+            Array of shape (rows, len(columns))
         """
-        for column in df.columns:
-            if column == self.document_id_column:
-                continue
-            if self._is_continuous(df[column]):
-                self.continuous_columns.append(column)
-            else:
-                self.categorical_columns.append(column)
+        positions = [df.columns.get_loc(column) for column in columns]
+        return df.values[:, positions]
+
+    @staticmethod
+    def _formats_per_value(series: pd.Series) -> bool:
+        """
+        Whether equal values of a column always format the same, so a column
+        can be formatted once per distinct value. Not true of object columns
+        (1 == 1.0) or floats (0.0 == -0.0).
+        """
+        dtype = series.dtype
+        return (
+            pd.api.types.is_integer_dtype(dtype)
+            or pd.api.types.is_bool_dtype(dtype)
+            or isinstance(dtype, pd.StringDtype)
+        )
+
+    @staticmethod
+    def _format_column(prefix: str, values: np.ndarray, factorize: bool) -> np.ndarray:
+        """
+        f"{prefix}{value}" for every value of a column, formatted once per
+        distinct value when `factorize` is set.
+        """
+        if factorize:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            formatted = np.array(
+                [f"{prefix}{value}" for value in uniques] + [f"{prefix}nan"],
+                dtype=object,
+            )
+            return formatted[codes]
+        return np.array([f"{prefix}{value}" for value in values], dtype=object)
 
     def _create_document_nodes(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
@@ -63,21 +128,26 @@ class MetadataKGConstruction(KGConstructionBase):
         Returns:
             List of document nodes with properties
         """
-        document_nodes = []
-        for _, row in df.iterrows():
-            properties = {
-                col: row[col] for col in self.continuous_columns if pd.notna(row[col])
-            }
-            node = {
-                "id": f"doc_{row[self.document_id_column]}",
+        id_column = self.document_id_column
+        columns = [id_column] + self.continuous_columns
+        values = self._row_values(df, columns)
+        present = pd.notna(values[:, 1:])
+        continuous = self.continuous_columns
+        return [
+            {
+                "id": f"doc_{row[0]}",
                 "type": "Document",
                 "properties": {
-                    self.document_id_column: row[self.document_id_column],
-                    **properties,
+                    id_column: row[0],
+                    **{
+                        column: value
+                        for column, value, keep in zip(continuous, row[1:], mask)
+                        if keep
+                    },
                 },
             }
-            document_nodes.append(node)
-        return document_nodes
+            for row, mask in zip(values, present)
+        ]
 
     def _create_metadata_nodes(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
@@ -91,41 +161,242 @@ class MetadataKGConstruction(KGConstructionBase):
         """
         metadata_nodes = []
         for column in self.categorical_columns:
-            unique_values = df[column].dropna().unique()
-            for value in unique_values:
-                node = {
+            # unique keeps the order of first appearance
+            metadata_nodes.extend(
+                {
                     "id": f"{column}_{value}",
                     "type": column,
                     "properties": {"value": value},
                 }
-                metadata_nodes.append(node)
+                for value in df[column].dropna().unique()
+            )
         return metadata_nodes
 
     def _create_relationships(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
         Create relationships between documents and their metadata values
 
+        Relationships are listed row by row, in column order within a row.
+
         Args:
             df: input dataframe
 
         Returns:
             List of relationships
         """
-        relationships = []
-        for _, row in df.iterrows():
-            doc_id = f"doc_{row[self.document_id_column]}"
-            for column in self.categorical_columns:
-                if pd.notna(row[column]):
-                    relationship = {
-                        "source": doc_id,
-                        "target": f"{column}_{row[column]}",
-                        "type": f"HAS_{column.upper()}",
-                    }
-                    relationships.append(relationship)
-        return relationships
+        if not self.categorical_columns:
+            return []
+        values = self._row_values(
+            df, [self.document_id_column] + self.categorical_columns
+        )
+        doc_ids = self._format_column(
+            "doc_",
+            values[:, 0],
+            self._formats_per_value(df[self.document_id_column]),
+        )
+        targets = np.empty((len(df), len(self.categorical_columns)), dtype=object)
+        for position, column in enumerate(self.categorical_columns):
+            targets[:, position] = self._format_column(
+                f"{column}_",
+                values[:, position + 1],
+                self._formats_per_value(df[column]),
+            )
+        relationship_types = np.array(
+            [f"HAS_{column.upper()}" for column in self.categorical_columns],
+            dtype=object,
+        )
+
+        # nonzero walks the mask in row-major order
+        rows, positions = np.nonzero(pd.notna(values[:, 1:]))
+        return [
+            {"source": source, "target": target, "type": relationship_type}
+            for source, target, relationship_type in zip(
+                doc_ids[rows].tolist(),
+                targets[rows, positions].tolist(),
+                relationship_types[positions].tolist(),
+            )
+        ]
+
+    @staticmethod
+    def _drop_unnamed_columns(df: pd.DataFrame) -> pd.DataFrame:
+        return df.loc[:, ~df.columns.str.contains("^Unnamed")]
+
+    @staticmethod
+    def infer_schema(sample: pd.DataFrame) -> Dict[str, str]:
+        """
+        Dtypes to read every chunk of a CSV with, inferred from a sample.
+
+        Nullable dtypes are used so that a column with no empty cells in the
+        sample still reads a later chunk with empty cells as the same type.
+
+        Args:
+            sample: First rows of the CSV
+
+        Returns:
+            Dtype name by column
+        """
+        schema = {}
+        for column, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                schema[column] = "boolean"
+            elif pd.api.types.is_integer_dtype(dtype):
+                schema[column] = "Int64"
+            elif pd.api.types.is_float_dtype(dtype):
+                schema[column] = "float64"
+            else:
+                schema[column] = "string"
+        return schema
+
+    @staticmethod
+    def _whole_file_integer_dtypes(
+        csv_path: Union[str, Path], columns: List[str], chunk_size: int
+    ) -> Dict[str, str]:
+        """
+        Dtypes `pd.read_csv` gives integer columns when reading the whole CSV.
+
+        A column of integers with an empty cell past the sample is read as
+        float64 by `construct`, so its values format as e.g. 1990.0 in the
+        node ids. Only these columns are scanned, a chunk at a time.
+
+        Args:
+            csv_path: Path of the CSV file
+            columns: Columns of integers in the sample
+            chunk_size: Rows per chunk
+
+        Returns:
+            float64 for the columns with empty cells, int64 for the others
+        """
+        if not columns:
+            return {}
+        with_missing = set()
+        for chunk in pd.read_csv(
+            csv_path, chunksize=chunk_size, usecols=columns, dtype="Int64"
+        ):
+            with_missing.update(
+                column for column in columns if chunk[column].isna().any()
+            )
+        return {
+            column: "float64" if column in with_missing else "int64"
+            for column in columns
+        }
+
+    def construct_stream(
+        self,
+        csv_path: Union[str, Path],
+        document_id_column: str = "name",
+        chunk_size: int = 100_000,
+        sample_rows: int = 100_000,
+        dtype: Optional[Dict[str, str]] = None,
+        output_format: str = "ndjson",
+        profile: Optional[ColumnProfile] = None,
+    ) -> Dict[str, Any]:
+        """
+        Construct the knowledge graph of a large CSV with bounded memory.
+
+        The continuous and categorical columns and the dtype of every column
+        are decided from the first `sample_rows` rows. Integer columns are
+        scanned once more for empty cells, so they are read with the dtype
+        `construct` gives them and the node ids of both are the same. The CSV
+        is then read
+        `chunk_size` rows at a time and the nodes and relationships of each
+        chunk are appended to metadata_kg.nodes.<format> and
+        metadata_kg.relationships.<format>. Only the distinct categorical
+        values are kept across chunks; their nodes are written last, so the
+        records come in the same order as the `construct` output.
+
+        Args:
+            csv_path: Path of the CSV file
+            document_id_column: Name of the column containing document IDs
+            chunk_size: Rows per chunk
+            sample_rows: Rows read to infer the schema and column types
+            dtype: Dtypes of some or all columns, overriding the inferred ones;
+                needed when the sample is not representative, e.g. a column
+                of numbers in the sample with text further down. Values of
+                an Int64 column format without ".0" even with empty cells
+            output_format: "ndjson" or "parquet" (needs pyarrow)
+            profile: Column profile to decide the column types from, e.g. the
+                profile of the previous loads merged with this file's,
+                defaults to the cached profile of the sample
+
+        Returns:
+            Paths of the nodes and relationships files and the record counts
+        """
+        sample = self._drop_unnamed_columns(
+            pd.read_csv(csv_path, nrows=sample_rows, dtype=dtype)
+        )
+        if document_id_column not in sample.columns:
+            raise ValueError(f"Input data must contain '{document_id_column}' column")
+        self.document_id_column = document_id_column
+        schema = {**self.infer_schema(sample), **(dtype or {})}
+        schema.update(
+            self._whole_file_integer_dtypes(
+                csv_path,
+                [
+                    column
+                    for column, column_dtype in schema.items()
+                    if column_dtype == "Int64" and column not in (dtype or {})
+                ],
+                chunk_size,
+            )
+        )
+        sample = sample.astype(schema)
+        if profile is None:
+            profile = self.profiler.profile_file(
+                csv_path, dtype=dtype, max_rows=sample_rows, frame=sample
+            )
+        self._identify_column_types(sample, profile)
+        del sample
+
+        # distinct values of each categorical column in order of appearance,
+        # a dict keeps them with the same equality as Series.unique
+        metadata_values: Dict[str, Dict[Any, None]] = {
+            column: {} for column in self.categorical_columns
+        }
+        rows = 0
+        with open_record_writer(
+            self.project_folder / "metadata_kg.nodes", NODE_FIELDS, output_format
+        ) as nodes, open_record_writer(
+            self.project_folder / "metadata_kg.relationships",
+            RELATIONSHIP_FIELDS,
+            output_format,
+        ) as relationships:
+            for chunk in pd.read_csv(
+                csv_path, chunksize=chunk_size, dtype=schema, usecols=list(schema)
+            ):
+                nodes.write(self._create_document_nodes(chunk))
+                relationships.write(self._create_relationships(chunk))
+                for column, values in metadata_values.items():
+                    values.update(dict.fromkeys(chunk[column].dropna().unique()))
+                rows += len(chunk)
+            for column, values in metadata_values.items():
+                nodes.write(
+                    [
+                        {
+                            "id": f"{column}_{value}",
+                            "type": column,
+                            "properties": {"value": value},
+                        }
+                        for value in values
+                    ]
+                )
+
+        logger.info(
+            f"Wrote {nodes.records} nodes and {relationships.records} relationships "
+            f"of {rows} rows to {nodes.path.name} and {relationships.path.name}"
+        )
+        return {
+            "nodes": nodes.path,
+            "relationships": relationships.path,
+            "rows": rows,
+            "node_count": nodes.records,
+            "relationship_count": relationships.records,
+        }
 
     def construct(
-        self, docs: Union[str, pd.DataFrame], document_id_column: str = "name"
+        self,
+        docs: Union[str, pd.DataFrame],
+        document_id_column: str = "name",
+        profile: Optional[ColumnProfile] = None,
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Construct knowledge graph from document metadata
@@ -133,6 +404,8 @@ class MetadataKGConstruction(KGConstructionBase):
         Args:
             docs: Either path to CSV file or pandas DataFrame containing document metadata
             document_id_column: Name of the column containing document IDs
+            profile: Column profile to decide the column types from, defaults
+                to the profile of the table, cached by file hash for CSVs
 
         Returns:
             Dictionary containing nodes and relationships for the knowledge graph
@@ -141,16 +414,19 @@ class MetadataKGConstruction(KGConstructionBase):
         if isinstance(docs, str) or isinstance(docs, Path):
             df = pd.read_csv(docs)
         else:
-            df = docs.copy()
+            df = docs
 
-        # remove unamed columns
-        df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+        # remove unamed columns, this selects a new frame so the caller's one
+        # is left untouched
+        df = self._drop_unnamed_columns(df)
         # Validate required columns
         if document_id_column not in df.columns:
             raise ValueError(f"Input data must contain '{document_id_column}' column")
         self.document_id_column = document_id_column
         # Identify column types
-        self._identify_column_types(df)
+        if profile is None and isinstance(docs, (str, Path)):
+            profile = self.profiler.profile_file(docs, frame=df)
+        self._identify_column_types(df, profile)
 
         # Create nodes and relationships
         document_nodes = self._create_document_nodes(df)
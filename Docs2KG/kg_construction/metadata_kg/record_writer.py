@@ -0,0 +1,146 @@
+"""
+Incremental writers of graph records (nodes or relationships).
+
+Large graphs are written batch by batch instead of being held in memory and
+dumped as one JSON document. NDJSON needs nothing beyond the standard library;
+Parquet needs pyarrow, which is imported only when a Parquet file is written.
+Either way the file is written under a temporary name and renamed when
+complete.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from Docs2KG.kg_construction.base import JSONEncoder
+
+OUTPUT_FORMATS = ("ndjson", "parquet")
+NODE_FIELDS = ("id", "type", "properties")
+RELATIONSHIP_FIELDS = ("source", "target", "type")
+
+
+class RecordWriter(ABC):
+    """Write records batch by batch to a file, renamed into place on close."""
+
+    suffix = ""
+
+    def __init__(self, path: Path, fields: Sequence[str]):
+        """
+        Args:
+            path: Output file, without its format suffix
+            fields: Fields of the records, dict fields are stored as JSON
+                strings in tabular formats
+        """
+        self.path = Path(f"{path}{self.suffix}")
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.fields = list(fields)
+        self.records = 0
+
+    @abstractmethod
+    def open(self) -> None:
+        """Open the temporary file"""
+        pass
+
+    @abstractmethod
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Append a batch of records"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the temporary file"""
+        pass
+
+    def __enter__(self) -> "RecordWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        elif self.tmp_path.exists():
+            self.tmp_path.unlink()
+
+
+class NDJSONRecordWriter(RecordWriter):
+    """One JSON object per line."""
+
+    suffix = ".ndjson"
+
+    def open(self) -> None:
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self.file.writelines(
+            json.dumps(record, cls=JSONEncoder, ensure_ascii=False) + "\n"
+            for record in records
+        )
+        self.records += len(records)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetRecordWriter(RecordWriter):
+    """One Parquet row group per batch, every field stored as a string."""
+
+    suffix = ".parquet"
+
+    def open(self) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Writing Parquet needs pyarrow, install it with `pip install pyarrow` "
+                "or write NDJSON instead"
+            )
+        self.pa = pa
+        self.schema = pa.schema([(field, pa.string()) for field in self.fields])
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        columns = {
+            field: [
+                (
+                    json.dumps(record[field], cls=JSONEncoder, ensure_ascii=False)
+                    if isinstance(record[field], dict)
+                    else str(record[field])
+                )
+                for record in records
+            ]
+            for field in self.fields
+        }
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+        self.records += len(records)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def open_record_writer(
+    path: Path, fields: Sequence[str], output_format: str = "ndjson"
+) -> RecordWriter:
+    """
+    Writer of a record file in one of OUTPUT_FORMATS.
+
+    Args:
+        path: Output file, without its format suffix
+        fields: Fields of the records
+        output_format: "ndjson" or "parquet"
+
+    Returns:
+        RecordWriter, to be used as a context manager
+    """
+    writers = {"ndjson": NDJSONRecordWriter, "parquet": ParquetRecordWriter}
+    if output_format not in writers:
+        raise ValueError(
+            f"Unknown output format {output_format}, must be one of {OUTPUT_FORMATS}"
+        )
+    return writers[output_format](path, fields)
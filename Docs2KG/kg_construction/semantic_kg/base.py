@@ -52,7 +52,7 @@ class SemanticKGConstructionBase(KGConstructionBase):
             entity_list_path = Path(PROJECT_CONFIG.semantic_kg.entity_list)
             if not entity_list_path.exists():
                 raise FileNotFoundError(f"Entity list not found at {entity_list_path}")
-            with timer(logger, "Loading entity list"):
+            with timer(logger, "Loading entity list", category="ner"):
                 df = pd.read_csv(entity_list_path, sep=r",(?=[^,]*$)", engine="python")
             # get all entity types
             entity_type_list = df["entity_type"].unique()
@@ -62,7 +62,7 @@ class SemanticKGConstructionBase(KGConstructionBase):
                 logger.warning(f"Ontology json not found at {ontology_json_path}")
                 ontology_entity_types = []
             else:
-                with timer(logger, "Loading ontology json"):
+                with timer(logger, "Loading ontology json", category="ner"):
                     with open(ontology_json_path, "r") as f:
                         ontology_json = json.load(f)
                 logger.info(f"Ontology json: {ontology_json}")
@@ -1,12 +1,53 @@
 import json
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
+from Docs2KG.agents.cloud import CloudAgent
 from Docs2KG.agents.manager import AgentManager
+from Docs2KG.agents.prompts import PromptTemplate
 from Docs2KG.kg_construction.semantic_kg.base import SemanticKGConstructionBase
 from Docs2KG.utils.config import PROJECT_CONFIG
+from Docs2KG.utils.timer import timer
+
+
+def ner_prompt_template(entity_types: List[str]) -> PromptTemplate:
+    """
+    Create the NER prompt template for an entity type list
+
+    The instructions and entity types form a static prefix shared by every
+    chunk, placed before the chunk text so backends can cache it.
+
+    Args:
+        entity_types: Entity types the LLM may label entities with
+
+    Returns:
+        PromptTemplate: Template with the chunk text as its `text` field
+    """
+    prefix = f"""Extract entities from the text given at the end.
+
+It should be one of the following entity types:
+{", ".join(entity_types)}
+
+Please output a list of entities in the following format via JSON:
+[
+    {{
+        "text": "entity text",
+        "label": "entity type",
+        "confidence": 1.0
+    }},
+    ...
+]
+
+entity text is the matched text
+entity type is the label of the entity
+confidence is the confidence score of the entity, it should be within [0.0, 1.0]
+You should return it as an array of JSON objects.
+
+"""
+    return PromptTemplate(prefix=prefix, body="Text:\n{text}\n")
 
 
 class NERLLMPromptExtractor(SemanticKGConstructionBase):
@@ -31,9 +72,14 @@ class NERLLMPromptExtractor(SemanticKGConstructionBase):
             project_id=project_id,
         )
 
-        self.llm_ner_extract_agent = AgentManager(agent_name, agent_type, **kwargs)
+        self.llm_ner_extract_agent = AgentManager(
+            agent_name, agent_type, stage=self.__class__.__name__, **kwargs
+        )
         self.entity_type_list = []
         self.load_entity_type()
+        self.prompt_template = self.build_prompt_template()
+        if self.entity_type_list:
+            self.llm_ner_extract_agent.cache_prefix(self.prompt_template.prefix)
 
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -56,69 +102,20 @@ class NERLLMPromptExtractor(SemanticKGConstructionBase):
         if not text or (len(self.entity_type_list) == 0):
             return []
 
-        # Split text into chunks, preserving the periods
-        text_chunks = [
-            chunk.strip() + "." for chunk in text.split(".") if chunk.strip()
-        ]
-
         # Process each chunk while tracking overall character position
         all_entities = []
         current_position = 0
 
-        for chunk in text_chunks:
-            # Create prompt for current chunk
-            chunk_prompt = f"""
-            Extract entities from the given text:
-            {chunk.lower()}
-
-            It should be one of the following entity types:
-            {", ".join(self.entity_type_list)}
-
-            Please output a list of entities in the following format via JSON:
-            [
-                    {{
-                        "text": "entity text",
-                        "label": "entity type",
-                        "confidence": 1.0
-                    }},
-                    ...
-                ]
-
-            entity text is the matched text
-            entity type is the label of the entity
-            confidence is the confidence score of the entity, it should be within [0.0, 1.0]
-            You should return it as an array of JSON objects.
-            """
-
+        for chunk in self.split_text_chunks(text):
             try:
                 # Process chunk
                 res = self.llm_ner_extract_agent.process_input(
-                    chunk_prompt, reset_session=True
+                    self.build_chunk_prompt(chunk), reset_session=True
                 )
-                res_json_str = res["response"].strip()
-                # logger.info(f"LLM response for chunk: {res_json_str}")
-
-                entities_json = json.loads(res_json_str)
-                # if the json is a dict, convert it to a list
-                if isinstance(entities_json, dict):
-                    entities_json = [entities_json]
-
-                # Verify entities for this chunk
-                verified_chunk_entities = self.verify_output_entities(
-                    chunk.lower(), entities_json
+                all_entities.extend(
+                    self.parse_chunk_response(chunk, res["response"], current_position)
                 )
 
-                logger.info(
-                    f"Verified entities for chunk: {len(verified_chunk_entities)}. \n{verified_chunk_entities}"
-                )
-                # Adjust start and end positions based on current position in overall text
-                for entity in verified_chunk_entities:
-                    entity["start"] += current_position
-                    entity["end"] += current_position
-                    entity["method"] = self.__class__.__name__
-
-                all_entities.extend(verified_chunk_entities)
-
             except Exception as e:
                 logger.error(f"Failed to extract entities from chunk: {str(e)}")
                 logger.exception(e)
@@ -132,6 +129,77 @@ class NERLLMPromptExtractor(SemanticKGConstructionBase):
         )
         return all_entities
 
+    @staticmethod
+    def split_text_chunks(text: str) -> List[str]:
+        """
+        Split text into chunks, preserving the periods
+
+        Args:
+            text: Text to split
+
+        Returns:
+            list: Non-empty chunks of the text
+        """
+        return [chunk.strip() + "." for chunk in text.split(".") if chunk.strip()]
+
+    def build_prompt_template(self) -> PromptTemplate:
+        """
+        Create the NER prompt template for the current entity type list
+
+        Returns:
+            PromptTemplate: Template with the chunk text as its `text` field
+        """
+        return ner_prompt_template(self.entity_type_list)
+
+    def build_chunk_prompt(self, chunk: str) -> str:
+        """
+        Create the NER prompt for a single chunk
+
+        Args:
+            chunk: Text chunk to extract entities from
+
+        Returns:
+            str: Prompt to send to the LLM
+        """
+        return self.prompt_template.render(text=chunk.lower())
+
+    def parse_chunk_response(
+        self, chunk: str, response: str, current_position: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse and verify the LLM response for a single chunk
+
+        Args:
+            chunk: Text chunk the response belongs to
+            response: Raw LLM response
+            current_position: Offset of the chunk within the whole text
+
+        Returns:
+            list: Verified entities with positions relative to the whole text
+        """
+        res_json_str = response.strip()
+        # logger.info(f"LLM response for chunk: {res_json_str}")
+
+        entities_json = json.loads(res_json_str)
+        # if the json is a dict, convert it to a list
+        if isinstance(entities_json, dict):
+            entities_json = [entities_json]
+
+        # Verify entities for this chunk
+        verified_chunk_entities = self.verify_output_entities(
+            chunk.lower(), entities_json
+        )
+
+        logger.info(
+            f"Verified entities for chunk: {len(verified_chunk_entities)}. \n{verified_chunk_entities}"
+        )
+        # Adjust start and end positions based on current position in overall text
+        for entity in verified_chunk_entities:
+            entity["start"] += current_position
+            entity["end"] += current_position
+            entity["method"] = self.__class__.__name__
+        return verified_chunk_entities
+
     def verify_output_entities(
         self, text, entities: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -228,19 +296,155 @@ class NERLLMPromptExtractor(SemanticKGConstructionBase):
                 logger.error(f"Document data not found in {layout_kg_path}")
                 continue
 
+            with timer(
+                logger,
+                "LLM NER of a document",
+                category="ner",
+                args={"file": layout_kg_path.name},
+            ):
+                for item in layout_kg["data"]:
+                    if "text" not in item:
+                        logger.error(f"Text not found in document item: {item}")
+                        continue
+                    text = item["text"]
+                    entities = self.extract_entities(text)
+                    # extend the extracted entities to the layout knowledge graph
+                    item["entities"].extend(entities)
+                    # remove duplicated entities based on start and end positions, text and label
+                    item["entities"] = self.unique_entities(item["entities"])
+
+            self.update_layout_kg(layout_kg_path, layout_kg)
+
+    def write_batch_file(
+        self, input_data: List[Path], batch_file: Path
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Write one Batch API request per text chunk of the layout knowledge graphs.
+
+        Args:
+            input_data: Layout knowledge graph paths to extract entities from
+            batch_file: Path of the JSONL batch input file to write
+
+        Returns:
+            dict: Manifest mapping each custom_id to its layout file, element id,
+            chunk text and chunk offset
+        """
+        agent = self.llm_ner_extract_agent.agent
+        manifest = {}
+        batch_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(batch_file, "w", encoding="utf-8") as f:
+            for layout_kg_path in input_data:
+                if not layout_kg_path.exists():
+                    logger.error(
+                        f"Layout knowledge graph not found at {layout_kg_path}"
+                    )
+                    continue
+                layout_kg = self.load_layout_kg(layout_kg_path)
+                if "data" not in layout_kg:
+                    logger.error(f"Document data not found in {layout_kg_path}")
+                    continue
+
+                for item in layout_kg["data"]:
+                    if not item.get("text") or len(self.entity_type_list) == 0:
+                        continue
+                    current_position = 0
+                    for idx, chunk in enumerate(self.split_text_chunks(item["text"])):
+                        custom_id = f"{item['id']}-{idx}"
+                        request = agent.build_batch_request(
+                            custom_id, self.build_chunk_prompt(chunk)
+                        )
+                        f.write(json.dumps(request) + "\n")
+                        manifest[custom_id] = {
+                            "layout_kg_path": layout_kg_path,
+                            "element_id": item["id"],
+                            "chunk": chunk,
+                            "position": current_position,
+                        }
+                        current_position += len(chunk)
+
+        logger.info(f"Wrote {len(manifest)} batch requests to {batch_file}")
+        return manifest
+
+    def merge_batch_results(
+        self,
+        manifest: Dict[str, Dict[str, Any]],
+        results: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """
+        Merge batch results back into the layout knowledge graphs by element id.
+
+        Args:
+            manifest: Manifest returned by `write_batch_file`
+            results: Results returned by `CloudAgent.fetch_batch_results`
+        """
+        entities_by_file: Dict[Path, Dict[str, List[Dict[str, Any]]]] = {}
+        for custom_id, request in manifest.items():
+            if custom_id not in results:
+                logger.warning(f"No batch result for {custom_id}")
+                continue
+            try:
+                entities = self.parse_chunk_response(
+                    request["chunk"],
+                    results[custom_id]["response"],
+                    request["position"],
+                )
+            except Exception as e:
+                logger.error(f"Failed to parse batch result {custom_id}: {str(e)}")
+                continue
+            file_entities = entities_by_file.setdefault(request["layout_kg_path"], {})
+            file_entities.setdefault(request["element_id"], []).extend(entities)
+
+        for layout_kg_path, element_entities in entities_by_file.items():
+            layout_kg = self.load_layout_kg(layout_kg_path)
             for item in layout_kg["data"]:
-                if "text" not in item:
-                    logger.error(f"Text not found in document item: {item}")
+                if item["id"] not in element_entities:
                     continue
-                text = item["text"]
-                entities = self.extract_entities(text)
-                # extend the extracted entities to the layout knowledge graph
-                item["entities"].extend(entities)
-                # remove duplicated entities based on start and end positions, text and label
+                item["entities"].extend(element_entities[item["id"]])
                 item["entities"] = self.unique_entities(item["entities"])
-
             self.update_layout_kg(layout_kg_path, layout_kg)
 
+    def construct_kg_batch(
+        self,
+        input_data: List[Path],
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Construct the semantic knowledge graph through the offline Batch API.
+
+        All chunk prompts are written to a JSONL file under the project batch
+        folder, submitted as one batch, and the results are merged back into
+        the layout knowledge graphs once the batch completes.
+
+        Args:
+            input_data: Layout knowledge graph paths to extract entities from
+            poll_interval: Seconds to wait between batch status checks
+            timeout: Maximum seconds to wait for the batch, None for no limit
+
+        Returns:
+            str: The id of the submitted batch, None if nothing was submitted
+        """
+        agent = self.llm_ner_extract_agent.agent
+        if not isinstance(agent, CloudAgent):
+            raise ValueError("Batch mode is only supported for cloud agents")
+
+        batch_file = (
+            self.project_folder
+            / "batch"
+            / f"ner_batch_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        )
+        manifest = self.write_batch_file(input_data, batch_file)
+        if not manifest:
+            logger.warning("No text chunks to submit, skipping batch")
+            return None
+
+        batch_id = agent.submit_batch(batch_file)
+        batch = agent.wait_for_batch(
+            batch_id, poll_interval=poll_interval, timeout=timeout
+        )
+        self.merge_batch_results(manifest, agent.fetch_batch_results(batch))
+        return batch_id
+
 
 if __name__ == "__main__":
     # Test entity extraction
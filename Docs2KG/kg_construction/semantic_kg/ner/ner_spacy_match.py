@@ -39,7 +39,7 @@ class NERSpacyMatcher(SemanticKGConstructionBase):
             entity_list_path = Path(PROJECT_CONFIG.semantic_kg.entity_list)
             if not entity_list_path.exists():
                 raise FileNotFoundError(f"Entity list not found at {entity_list_path}")
-            with timer(logger, "Loading entity list"):
+            with timer(logger, "Loading entity list", category="ner"):
                 df = pd.read_csv(entity_list_path, sep=r",(?=[^,]*$)", engine="python")
             self.entity_dict = dict(zip(df["entity"], df["entity_type"]))
             self._initialize_patterns()
@@ -191,21 +191,26 @@ class NERSpacyMatcher(SemanticKGConstructionBase):
             if not doc.exists():
                 logger.error(f"Document not found at {doc}")
                 continue
-            logger.info(f"Processing document: {doc}")
             layout_kg = self.load_layout_kg(doc)
             if "data" not in layout_kg:
                 logger.error(f"Document data not found in {doc}")
                 continue
-            for item in layout_kg["data"]:
-                if "text" not in item:
-                    logger.error(f"Text not found in document item: {item}")
-                    continue
-                text = item["text"]
-                entities = self.extract_entities(text)
-                # expand the item entities list with the extracted entities
-                item["entities"].extend(entities)
-                # then remove duplicated entities based on start and end positions, text and label
-                item["entities"] = self.unique_entities(item["entities"])
+            with timer(
+                logger,
+                "Spacy NER of a document",
+                category="ner",
+                args={"file": doc.name},
+            ):
+                for item in layout_kg["data"]:
+                    if "text" not in item:
+                        logger.error(f"Text not found in document item: {item}")
+                        continue
+                    text = item["text"]
+                    entities = self.extract_entities(text)
+                    # expand the item entities list with the extracted entities
+                    item["entities"].extend(entities)
+                    # then remove duplicated entities based on start and end positions, text and label
+                    item["entities"] = self.unique_entities(item["entities"])
 
             self.update_layout_kg(doc, layout_kg)
 
@@ -29,7 +29,9 @@ class EntityTypesLLMGenerator(SemanticKGConstructionBase):
         self, project_id: str, agent_name="phi3.5", agent_type="ollama", **kwargs
     ):
         super().__init__(project_id)
-        self.ontology_agent = AgentManager(agent_name, agent_type, **kwargs)
+        self.ontology_agent = AgentManager(
+            agent_name, agent_type, stage=self.__class__.__name__, **kwargs
+        )
         # first load project description
         self.project_description = self.load_project_description()
         self.load_entity_type()
@@ -106,7 +108,7 @@ class EntityTypesLLMGenerator(SemanticKGConstructionBase):
             logger.warning(f"Ontology json not found at {ontology_json_path}")
             ontology_entity_types = []
         else:
-            with timer(logger, "Loading ontology json"):
+            with timer(logger, "Loading ontology json", category="ner"):
                 with open(ontology_json_path, "r") as f:
                     ontology_json = json.load(f)
             logger.info(f"Ontology json: {ontology_json}")
@@ -1,6 +1,7 @@
 import os
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from loguru import logger
 from pydantic import BaseModel, Field, SecretStr
@@ -19,8 +20,6 @@ if CONFIG_FILE is None:
 else:
     CONFIG_FILE = Path(CONFIG_FILE)
 
-logger.info(f"Reading configuration from: {CONFIG_FILE}")
-
 
 class AgentOpenAIConfig(BaseModel):
     api_key: SecretStr
@@ -39,6 +38,8 @@ class AgentOLLAMAConfig(BaseModel):
     context_window: int = Field(default=4096)
     format: str = Field(default="json")
     stream: bool = Field(default=False)
+    # how long Ollama keeps the model (and its prompt cache) loaded after a request
+    keep_alive: str = Field(default="30m")
 
 
 class AgentHuggingFaceConfig(BaseModel):
@@ -49,7 +50,10 @@ class AgentHuggingFaceConfig(BaseModel):
 
 class AgentLlamaCppConfig(BaseModel):
     context_length: int = Field(default=4096)
-    num_threads: int = Field(default=1)
+    # None uses all the cores available to the process
+    num_threads: Optional[int] = Field(default=None)
+    # queued prompts reordered by shared prefix, they still run one at a time
+    sort_window: int = Field(default=8)
     gpu_layers: int = Field(default=0)
     max_tokens: int = Field(default=2000)
     top_p: float = Field(default=0.9)
@@ -58,10 +62,102 @@ class AgentLlamaCppConfig(BaseModel):
     model_path: str = Field(default="models/llama-7b.gguf")
 
 
+class AgentBackendConfig(BaseModel):
+    agent_name: str
+    agent_type: str
+    api_base: Optional[str] = Field(default=None)
+    fallback: bool = Field(default=False)
+
+
+class AgentPoolConfig(BaseModel):
+    backends: List[AgentBackendConfig] = Field(default=[])
+    failure_threshold: int = Field(default=3)
+    recovery_timeout: float = Field(default=30.0)
+
+
+class PDFPipelineProfile(BaseModel):
+    do_ocr: bool = Field(default=True)
+    do_table_structure: bool = Field(default=True)
+    generate_page_images: bool = Field(default=True)
+    generate_picture_images: bool = Field(default=True)
+    images_scale: float = Field(default=2.0)
+
+
+DEFAULT_PDF_PROFILES = {
+    # markdown text only, what the layout KG consumes
+    "text-only": PDFPipelineProfile(
+        do_ocr=False,
+        do_table_structure=False,
+        generate_page_images=False,
+        generate_picture_images=False,
+        images_scale=1.0,
+    ),
+    # text and table structure, no rendered images
+    "tables": PDFPipelineProfile(
+        do_ocr=False,
+        do_table_structure=True,
+        generate_page_images=False,
+        generate_picture_images=False,
+        images_scale=1.0,
+    ),
+    # OCR, tables, page and picture images at 2x
+    "full": PDFPipelineProfile(),
+}
+
+
+class PDFConfig(BaseModel):
+    # Docling pipeline profile used to convert PDFs, one of `profiles`
+    profile: str = Field(default="full")
+    # extra profiles, or overrides of the built-in ones
+    profiles: Dict[str, PDFPipelineProfile] = Field(default={})
+
+    def get_profile(self, name: Optional[str] = None) -> PDFPipelineProfile:
+        """
+        Get a pipeline profile by name, configured ones take precedence.
+
+        Args:
+            name: Profile name, defaults to the configured `profile`
+
+        Returns:
+            PDFPipelineProfile
+        """
+        name = name or self.profile
+        profiles = {**DEFAULT_PDF_PROFILES, **self.profiles}
+        if name not in profiles:
+            raise ValueError(
+                f"Unknown PDF profile {name}, must be one of {', '.join(profiles)}"
+            )
+        return profiles[name]
+
+    # split PDFs longer than this many pages into shards converted in parallel,
+    # 0 converts every PDF in a single pass
+    shard_pages: int = Field(default=0)
+    # None uses as many workers as the CPU count and memory budget allow
+    max_workers: Optional[int] = Field(default=None)
+    # total memory the shard workers may use
+    memory_budget_mb: int = Field(default=8192)
+    # estimated memory of a worker: loaded models plus the rendered pages
+    worker_base_memory_mb: int = Field(default=1536)
+    page_memory_mb: int = Field(default=16)
+    # read pages with a usable embedded text layer directly with pypdfium2 and
+    # only send the other pages (scans, broken encodings, and figures or tables
+    # when the profile exports them) to Docling; off by default, it pays off
+    # most with the text-only profile
+    text_layer: bool = Field(default=False)
+    # minimum number of characters for a page's text layer to be used
+    text_layer_min_chars: int = Field(default=200)
+    # pages more covered by images than this fraction go to Docling
+    text_layer_max_image_coverage: float = Field(default=0.5)
+
+
 class DataConfig(BaseModel):
     input_dir: Path = DATA_INPUT_DIR
     output_dir: Path = DATA_OUTPUT_DIR
     ontology_dir: Path = DATA_ONTOLOGY_DIR
+    # durability of the digitization outputs, which are always written to a
+    # temporary file and renamed: none, file (fsync the file) or full (fsync
+    # the file and its folder)
+    output_fsync: str = Field(default="none")
 
 
 class SemanticKGConfig(BaseModel):
@@ -76,6 +172,8 @@ class Config(BaseModel):
     ollama: AgentOLLAMAConfig
     huggingface: AgentHuggingFaceConfig
     llamacpp: AgentLlamaCppConfig
+    agent_pool: AgentPoolConfig = Field(default_factory=AgentPoolConfig)
+    pdf: PDFConfig = Field(default_factory=PDFConfig)
     data: DataConfig
     semantic_kg: SemanticKGConfig
 
@@ -97,19 +195,35 @@ def get_config() -> Config:
     Get the configuration singleton.
     The lru_cache decorator ensures this is only created once and reused.
     """
+    logger.info(f"Reading configuration from: {CONFIG_FILE}")
     try:
         config = Config.from_yaml(CONFIG_FILE)
         logger.info("Configuration loaded successfully")
+        logger.debug(config)
         return config
     except Exception as e:
         logger.error(f"Failed to load configuration: {e}")
         raise
 
 
-# Initialize configuration at startup
-PROJECT_CONFIG = get_config()
+class LazyConfig:
+    """
+    Stand-in for the configuration that only reads the YAML file on first use,
+    so importing a module does not pay for (or fail on) loading the config.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(get_config(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(get_config())
+
 
-logger.debug(PROJECT_CONFIG)
+# Loaded on first attribute access
+PROJECT_CONFIG: Config = LazyConfig()
 
 # Usage in other files:
 # from .config import config
@@ -0,0 +1,35 @@
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Union
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """
+    SHA-256 of a binary file object, read in chunks from its position.
+
+    Args:
+        stream: Binary file object
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_file(file_path: Union[str, Path]) -> str:
+    """
+    SHA-256 of a file, read in chunks.
+
+    Args:
+        file_path: Path of the file
+
+    Returns:
+        Hex digest
+    """
+    with open(file_path, "rb") as f:
+        return hash_stream(f)
@@ -0,0 +1,19 @@
+from importlib import import_module
+from typing import Any
+
+
+def import_object(path: str) -> Any:
+    """
+    Import an object from a "package.module:Name" path.
+
+    Registries keep these paths instead of the objects themselves so that heavy
+    backends (docling, spacy, llama.cpp, ...) are only imported when used.
+
+    Args:
+        path: Module path and attribute name separated by a colon
+
+    Returns:
+        The imported object
+    """
+    module_path, _, name = path.partition(":")
+    return getattr(import_module(module_path), name)
@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from loguru import logger
 from neo4j import GraphDatabase, basic_auth
@@ -8,6 +8,14 @@ from neo4j import GraphDatabase, basic_auth
 from Docs2KG.utils.config import PROJECT_CONFIG
 from Docs2KG.utils.timer import timer
 
+# metadata knowledge graph files written by MetadataKGConstruction, per format
+METADATA_KG_FILES = {
+    "json": ("metadata_kg.json",),
+    "ndjson": ("metadata_kg.nodes.ndjson", "metadata_kg.relationships.ndjson"),
+    "parquet": ("metadata_kg.nodes.parquet", "metadata_kg.relationships.parquet"),
+}
+METADATA_BATCH_SIZE = 5000
+
 
 class Neo4jTransformer:
     def __init__(
@@ -18,10 +26,20 @@ class Neo4jTransformer:
         password: str,
         database: Optional[str] = None,
         reset_database: bool = False,
+        driver: Optional[Any] = None,
+        metadata_batch_size: int = METADATA_BATCH_SIZE,
     ):
-        """Initialize the transformer with Neo4j connection details"""
+        """Initialize the transformer with Neo4j connection details
+
+        An already created driver can be passed in to share it, or to load
+        against a stand-in (e.g. the benchmark stub) instead of a server.
+        Metadata nodes and relationships are written in batches of
+        `metadata_batch_size` records.
+        """
         self.project_id = project_id
-        self.driver = GraphDatabase.driver(uri, auth=basic_auth(username, password))
+        self.driver = driver or GraphDatabase.driver(
+            uri, auth=basic_auth(username, password)
+        )
         self.database = database
         self.reset_database = reset_database
         self.layout_schema_path = (
@@ -34,6 +52,9 @@ class Neo4jTransformer:
         self.layout_schema = self._load_layout_schema()
         self.header_stack = []  # Track header hierarchy
         self.current_file_id = None
+        self.metadata_batch_size = metadata_batch_size
+        self.metadata_loaded = False
+        self.indexed_labels = set()
         if self.reset_database:
             with self.driver.session(database=self.database) as session:
                 session.run("MATCH (n) DETACH DELETE n")
@@ -43,108 +64,324 @@ class Neo4jTransformer:
         with open(self.layout_schema_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
-    def load_metadata_kg(self, session):
+    def _metadata_kg_files(self) -> Optional[Tuple[str, List[Path]]]:
         """
-        Loads a metadata knowledge graph from a JSON file into Neo4j.
-        - Creates/merges a :Project node with the given project_id if not existing.
-        - Loads all 'nodes' into :Node label. Each node's 'properties' are flattened into separate node properties.
-        - Loads all 'relationships' using a :RELATES_TO relationship.
-        """
-
-        # 1. Check the metadata_kg file exists.
-        metadata_kg_path = (
-            PROJECT_CONFIG.data.output_dir
-            / "projects"
-            / self.project_id
-            / "metadata_kg.json"
-        )
-        if not metadata_kg_path.exists():
-            logger.error(f"Metadata knowledge graph not found at {metadata_kg_path}")
-            return None
+        Newest metadata knowledge graph of the project, in any of the formats
+        `MetadataKGConstruction` writes.
 
-        # first check if the project node exists
-        project_query = """
-        MATCH (p:Project {id: $project_id})
-        RETURN p
+        Returns:
+            Tuple of the format and its files, None if there is none
         """
+        project_folder = PROJECT_CONFIG.data.output_dir / "projects" / self.project_id
+        candidates = []
+        for kg_format, names in METADATA_KG_FILES.items():
+            paths = [project_folder / name for name in names]
+            if all(path.exists() for path in paths):
+                modified = max(path.stat().st_mtime for path in paths)
+                candidates.append((modified, kg_format, paths))
+        if not candidates:
+            return None
+        _, kg_format, paths = max(candidates, key=lambda candidate: candidate[0])
+        return kg_format, paths
 
-        result = session.run(project_query, project_id=self.project_id)
-        project_node = result.single()
-        if project_node is not None:
-            logger.info(f"Project {self.project_id} already exists. Skipping load.")
+    @staticmethod
+    def _iter_metadata_records(
+        kg_format: str, paths: List[Path], key: str
+    ) -> Iterator[Dict[str, Any]]:
+        """Nodes or relationships of a metadata knowledge graph, one by one"""
+        if kg_format == "json":
+            with open(paths[0], "r", encoding="utf-8") as f:
+                yield from json.load(f)[key]
             return
+        path = paths[0] if key == "nodes" else paths[1]
+        if kg_format == "ndjson":
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            return
+        import pyarrow.parquet as pq
 
-        # 2. Merge the :Project node to ensure the label is created and the node is present.
-        #    If it already exists, we can decide whether to skip or proceed.
-        project_merge_query = """
-        MERGE (p:Project {id: $project_id})
-        ON CREATE SET p.createdAt = timestamp()
-        RETURN p
-        """
-        session.run(project_merge_query, project_id=self.project_id)
-
-        # 3. Load the JSON content
-        with open(metadata_kg_path, "r", encoding="utf-8") as f:
-            metadata_kg = json.load(f)
+        # tabular formats store the dict fields as JSON strings
+        for batch in pq.ParquetFile(path).iter_batches():
+            for record in batch.to_pylist():
+                if "properties" in record:
+                    record["properties"] = json.loads(record["properties"])
+                yield record
 
-        # 4. Insert all nodes
-        #    We flatten node["properties"] into the node so that each key in `properties`
-        #    is stored as a direct property on the node. If you prefer to store them as a single
-        #    JSON string, see the alternative approach commented below.
+    @staticmethod
+    def quote_label(label: str) -> str:
+        """Quote a label or type so it is valid in a query, whatever its characters"""
+        return "`" + label.replace("`", "``") + "`"
 
-        with timer(logger, "Loading metadata knowledge graph: Nodes"):
-            for node in metadata_kg["nodes"]:
-                # node["properties"] must be a dict of {string_key -> scalar_value}
-                # so that `SET n += $props` can distribute them as node properties.
+    def _ensure_id_index(self, session, label: str) -> None:
+        """Index the ids of a label, so MATCH and MERGE on ids are lookups"""
+        if label in self.indexed_labels:
+            return
+        session.run(
+            f"CREATE INDEX IF NOT EXISTS FOR (n:{self.quote_label(label)}) ON (n.id)"
+        )
+        self.indexed_labels.add(label)
 
-                # Example: for {"ANumber":144050}, this becomes n.ANumber = 144050
-                node_props = node["properties"] if "properties" in node else {}
+    def _upsert_metadata_nodes(
+        self, session, label: str, nodes: List[Dict], stats: Dict[str, Any]
+    ) -> None:
+        """
+        Create the new nodes of a label and update the changed ones.
 
-                # If you want each node's type to be an actual Neo4j label, you can do:
-                #   create_node_cypher = "CREATE (n:" + node["type"] + " {id: $id}) SET n += $props"
-                #   but that depends on your domain model.
+        Nodes whose properties are the same in the graph are left alone.
+        """
+        self._ensure_id_index(session, label)
+        quoted = self.quote_label(label)
+        properties = {
+            node["id"]: {
+                **node.get("properties", {}),
+                "id": node["id"],
+                "type": node.get("type", ""),
+                "project_id": self.project_id,
+            }
+            for node in nodes
+        }
+        existing = {
+            record["id"]: record["props"]
+            for record in session.run(
+                f"""
+                MATCH (n:{quoted})
+                WHERE n.id IN $ids AND n.project_id = $project_id
+                RETURN n.id AS id, properties(n) AS props
+                """,
+                ids=list(properties),
+                project_id=self.project_id,
+            )
+        }
+        rows = [
+            {"id": node_id, "props": props}
+            for node_id, props in properties.items()
+            if existing.get(node_id) != props
+        ]
+        stats["nodes_unchanged"] += len(properties) - len(rows)
+        if not rows:
+            return
+        # SET = rather than +=, so properties emptied since the last load go
+        session.run(
+            f"""
+            UNWIND $rows AS row
+            MERGE (n:{quoted} {{id: row.id, project_id: $project_id}})
+            SET n = row.props
+            """,
+            rows=rows,
+            project_id=self.project_id,
+        )
+        stats["nodes_upserted"] += len(rows)
 
-                # add project_id to node properties
-                node_props["project_id"] = self.project_id
-                create_node_cypher = (
-                    """
-                    CREATE (n:"""
-                    + node.get("type", "Node")
-                    + """{id: $id, type: $type})
-                SET n += $props
+    def _sync_metadata_relationships(
+        self,
+        session,
+        targets: Dict[str, Dict[str, str]],
+        labels: Dict[str, str],
+        loaded_sources: Set[str],
+        stats: Dict[str, Any],
+    ) -> None:
+        """
+        Bring the relationships of a batch of documents in line with the
+        metadata knowledge graph.
+
+        Missing relationships are merged, those with another type updated and
+        those to values a document no longer has deleted, along with duplicates
+        left by earlier loads.
+
+        Args:
+            session: Neo4j session
+            targets: Type of the relationship to each target, by source id
+            labels: Label of every metadata node, by id
+            loaded_sources: Sources of the earlier batches, whose relationships
+                are kept
+            stats: Load statistics, updated in place
+        """
+        by_source_label: Dict[str, List[str]] = {}
+        for source in targets:
+            if source not in labels:
+                stats["relationships_skipped"] += len(targets[source])
+                continue
+            by_source_label.setdefault(labels[source], []).append(source)
+
+        rows: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        stale = []
+        for source_label, sources in by_source_label.items():
+            found, seen = set(), set()
+            for record in session.run(
+                f"""
+                UNWIND $ids AS source_id
+                MATCH (s:{self.quote_label(source_label)}
+                       {{id: source_id, project_id: $project_id}})
+                      -[r:RELATES_TO]->(t)
+                WHERE r.project_id = $project_id
+                RETURN s.id AS source, t.id AS target, r.type AS type,
+                       elementId(r) AS element_id
+                """,
+                ids=sources,
+                project_id=self.project_id,
+            ):
+                pair = (record["source"], record["target"])
+                wanted = targets[pair[0]].get(pair[1])
+                if pair in seen or (wanted is None and pair[0] not in loaded_sources):
+                    stale.append(record["element_id"])
+                    continue
+                seen.add(pair)
+                if wanted == record["type"]:
+                    found.add(pair)
+
+            for source in sources:
+                for target, relationship_type in targets[source].items():
+                    if (source, target) in found:
+                        stats["relationships_unchanged"] += 1
+                    elif target not in labels:
+                        stats["relationships_skipped"] += 1
+                    else:
+                        rows.setdefault((source_label, labels[target]), []).append(
+                            {
+                                "source": source,
+                                "target": target,
+                                "type": relationship_type,
+                            }
+                        )
+
+        if stale:
+            session.run(
                 """
-                )
-                session.run(
-                    create_node_cypher,
-                    id=node["id"],
-                    label=node.get("type", "Node"),  # fallback empty string if no type
-                    type=node.get("type", ""),  # fallback empty string if no type
-                    props=node_props,
-                )
+                UNWIND $ids AS element_id
+                MATCH ()-[r]->() WHERE elementId(r) = element_id
+                DELETE r
+                """,
+                ids=stale,
+            )
+            stats["relationships_deleted"] += len(stale)
+        for (source_label, target_label), label_rows in rows.items():
+            session.run(
+                f"""
+                UNWIND $rows AS row
+                MATCH (s:{self.quote_label(source_label)}
+                       {{id: row.source, project_id: $project_id}})
+                MATCH (t:{self.quote_label(target_label)}
+                       {{id: row.target, project_id: $project_id}})
+                MERGE (s)-[r:RELATES_TO {{project_id: $project_id}}]->(t)
+                SET r.type = row.type
+                """,
+                rows=label_rows,
+                project_id=self.project_id,
+            )
+            stats["relationships_merged"] += len(label_rows)
 
-        with timer(logger, "Loading metadata knowledge graph: Relationships"):
-            for relation in metadata_kg["relationships"]:
-                # cypher query to match the id of the start and end nodes
-                # and create a relationship between them
-                create_relationship_cypher = """
-                MATCH (start), (end)
-                WHERE start.id = $start_id AND end.id = $end_id
-                CREATE (start)-[:RELATES_TO $props]->(end)
-                """
-                # add project_id to relationship properties
-                relation_props = (
-                    relation["properties"] if "properties" in relation else {}
-                )
-                relation_props["project_id"] = self.project_id
-                session.run(
-                    create_relationship_cypher,
-                    start_id=relation["source"],
-                    end_id=relation["target"],
-                    props=relation_props,
-                )
+    def load_metadata_kg(self, session) -> Optional[Dict[str, Any]]:
+        """
+        Load the project's metadata knowledge graph into Neo4j, incrementally.
+
+        - Merges the :Project node of the project.
+        - Indexes the id of every node label, nodes are labelled by their type.
+        - Reads the newest of metadata_kg.json and the NDJSON or Parquet files
+          of a streamed construction, record by record.
+        - Compares every batch of nodes with the graph by id, and creates or
+          updates only the new and changed ones with one UNWIND ... MERGE
+          query per label.
+        - Does the same for the :RELATES_TO relationships of every batch of
+          documents, and deletes those to values a document no longer has.
+
+        Loading the same metadata again writes nothing, loading it after new
+        rows were added writes only those.
+
+        Returns:
+            Load statistics, including the records read per second, None if
+            the project has no metadata knowledge graph
+        """
+        metadata_kg_files = self._metadata_kg_files()
+        if metadata_kg_files is None:
+            logger.error(f"Metadata knowledge graph not found for {self.project_id}")
+            return None
+        kg_format, paths = metadata_kg_files
 
-        logger.info(f"Metadata knowledge graph loaded for project {self.project_id}.")
-        return True
+        session.run(
+            """
+            MERGE (p:Project {id: $project_id})
+            ON CREATE SET p.createdAt = timestamp()
+            """,
+            project_id=self.project_id,
+        )
+        self._ensure_id_index(session, "Project")
+
+        stats = {
+            "nodes": 0,
+            "nodes_upserted": 0,
+            "nodes_unchanged": 0,
+            "relationships": 0,
+            "relationships_merged": 0,
+            "relationships_unchanged": 0,
+            "relationships_deleted": 0,
+            "relationships_skipped": 0,
+        }
+        batch_size = self.metadata_batch_size
+        labels: Dict[str, str] = {}
+        with timer(
+            logger, "Loading metadata knowledge graph", category="neo4j"
+        ) as span:
+            with timer(
+                logger, "Loading metadata knowledge graph: Nodes", category="neo4j"
+            ):
+                batches: Dict[str, List[Dict]] = {}
+                for node in self._iter_metadata_records(kg_format, paths, "nodes"):
+                    stats["nodes"] += 1
+                    label = node.get("type") or "Node"
+                    labels[node["id"]] = label
+                    batch = batches.setdefault(label, [])
+                    batch.append(node)
+                    if len(batch) >= batch_size:
+                        self._upsert_metadata_nodes(session, label, batch, stats)
+                        batches[label] = []
+                for label, batch in batches.items():
+                    if batch:
+                        self._upsert_metadata_nodes(session, label, batch, stats)
+
+            with timer(
+                logger,
+                "Loading metadata knowledge graph: Relationships",
+                category="neo4j",
+            ):
+                # a document's relationships are listed together, batches are
+                # cut between documents so each is compared with the graph once
+                targets: Dict[str, Dict[str, str]] = {}
+                loaded_sources: Set[str] = set()
+                pending = 0
+                for relation in self._iter_metadata_records(
+                    kg_format, paths, "relationships"
+                ):
+                    stats["relationships"] += 1
+                    source = relation["source"]
+                    if pending >= batch_size and source not in targets:
+                        self._sync_metadata_relationships(
+                            session, targets, labels, loaded_sources, stats
+                        )
+                        loaded_sources.update(targets)
+                        targets, pending = {}, 0
+                    targets.setdefault(source, {})[relation["target"]] = relation.get(
+                        "type", "RELATES_TO"
+                    )
+                    pending += 1
+                if targets:
+                    self._sync_metadata_relationships(
+                        session, targets, labels, loaded_sources, stats
+                    )
+
+        rows = stats["nodes"] + stats["relationships"]
+        stats["seconds"] = span.duration
+        stats["rows_per_second"] = rows / span.duration if span.duration else 0.0
+        self.metadata_loaded = True
+        logger.info(
+            f"Metadata knowledge graph loaded for project {self.project_id}: "
+            f"{stats['nodes_upserted']} of {stats['nodes']} nodes upserted, "
+            f"{stats['relationships_merged']} relationships merged and "
+            f"{stats['relationships_deleted']} deleted, "
+            f"{stats['rows_per_second']:.0f} rows/s"
+        )
+        return stats
 
     def close(self):
         """Close the Neo4j driver"""
@@ -237,8 +474,9 @@ class Neo4jTransformer:
         layout_json = json.load(open(input_path, "r", encoding="utf-8"))
 
         with self.driver.session(database=self.database) as session:
-            # Load metadata knowledge graph
-            self.load_metadata_kg(session)
+            # Load metadata knowledge graph, once for all the layout files
+            if not self.metadata_loaded:
+                self.load_metadata_kg(session)
 
             # Create file node with unique ID
             self.current_file_id = f"{self.project_id}_{layout_json['filename']}"
@@ -259,15 +497,18 @@ class Neo4jTransformer:
             self.header_stack = []
 
             # Process layout structure
-            self._create_layout(session, layout=layout_json["data"])
+            with timer(logger, "Loading layout nodes", category="neo4j"):
+                self._create_layout(session, layout=layout_json["data"])
 
             # Process entities and relations
-            for item in layout_json["data"]:
-                self._process_entities(session, item)
-                self._process_relations(session, item)
+            with timer(logger, "Loading entities and relations", category="neo4j"):
+                for item in layout_json["data"]:
+                    self._process_entities(session, item)
+                    self._process_relations(session, item)
 
             # Merge duplicate entities after all data is loaded
-            self.merge_entities()
+            with timer(logger, "Merging duplicate entities", category="neo4j"):
+                self.merge_entities()
 
     def _find_parent_node(
         self, session, current_item: Dict, previous_items: List[Dict]
@@ -319,6 +560,10 @@ class Neo4jTransformer:
                 "sequence": idx,
                 "project_id": self.project_id,
             }
+            # provenance of layouts built from a Docling document
+            for key in ("page", "bbox"):
+                if key in item:
+                    item_props[key] = item[key]
 
             label = self.sanitize_label(item.get("label", "Item"))
 
@@ -1,39 +1,256 @@
+import json
+import os
+import threading
 import time
+import tracemalloc
+from contextvars import ContextVar
 from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Profiler:
+    """
+    Collect the finished timer spans of a run.
+
+    Spans are aggregated per (category, name) and kept for the Chrome trace
+    export, which can be opened in chrome://tracing or https://ui.perfetto.dev
+    to see where each document's wall time goes.
+    """
+
+    def __init__(self, max_spans: int = 100000, enabled: bool = True):
+        """
+        Args:
+            max_spans: Maximum number of spans kept for the trace, aggregates
+                keep counting after that
+            enabled: Record the finished spans, see `enable`
+        """
+        self.max_spans = max_spans
+        self.enabled = enabled
+        self.trace_memory = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.origin = time.perf_counter()
+            self.spans: List["timer"] = []
+            self.aggregates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def enable(self) -> None:
+        """Start recording spans, from a fresh profile"""
+        self.reset()
+        self.enabled = True
+
+    def enable_memory_tracing(self) -> None:
+        """Start tracemalloc so spans also report their peak memory"""
+        self.trace_memory = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def record(self, span: "timer") -> None:
+        """
+        Add a finished span to the trace and to the aggregate of its stage.
+
+        Stages are keyed by (category, message), so messages should name the
+        stage and leave the document or item to the span args.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            aggregate = self.aggregates.setdefault(
+                (span.category, span.message),
+                {
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "self_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "peak_memory_bytes": None,
+                },
+            )
+            aggregate["count"] += 1
+            aggregate["total_seconds"] += span.duration
+            aggregate["self_seconds"] += span.self_duration
+            aggregate["max_seconds"] = max(aggregate["max_seconds"], span.duration)
+            if span.peak_memory is not None:
+                aggregate["peak_memory_bytes"] = max(
+                    aggregate["peak_memory_bytes"] or 0, span.peak_memory
+                )
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the per-stage aggregates, slowest total first.
+
+        Returns:
+            Dict with the run wall time and one entry per (category, name)
+        """
+        with self._lock:
+            stages = [
+                {"category": category, "name": name, **aggregate}
+                for (category, name), aggregate in self.aggregates.items()
+            ]
+        stages.sort(key=lambda stage: stage["total_seconds"], reverse=True)
+        return {
+            "wall_seconds": time.perf_counter() - self.origin,
+            "stages": stages,
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Export the spans in the Chrome trace event format.
+
+        Returns:
+            Dict with complete ("X") events, timestamps in microseconds
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = dict(span.args)
+            if span.peak_memory is not None:
+                args["peak_memory_bytes"] = span.peak_memory
+            events.append(
+                {
+                    "name": span.message,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start - self.origin) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, folder: Path, name: str = "profile") -> Tuple[Path, Path]:
+        """
+        Write the aggregate report and the Chrome trace of the run.
+
+        Args:
+            folder: Folder to write the files to
+            name: Base name of the files
+
+        Returns:
+            Tuple of the report path and the trace path
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        report_path = folder / f"{name}_report.json"
+        trace_path = folder / f"{name}_trace.json"
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return report_path, trace_path
+
+
+# records nothing until a run asks for a profile
+PROFILER = Profiler(enabled=False)
+
+_CURRENT_SPAN: ContextVar[Optional["timer"]] = ContextVar("timer_span", default=None)
 
 
 class timer:
     """
     util function used to log the time taken by a part of program
+
+    Timers nest: a timer opened inside another becomes one of its `sub_timers`,
+    and every finished timer is recorded as a span of the run `PROFILER`.
     """
 
-    def __init__(self, the_logger: Logger, message: str):
+    def __init__(
+        self,
+        the_logger: Logger,
+        message: str,
+        category: str = "default",
+        profiler: Optional[Profiler] = None,
+        args: Optional[Dict[str, Any]] = None,
+    ):
         """
         init the timer
 
         Args:
-            the_logger (Logger): logger object
+            the_logger (Logger): logger object, None to only record the span
             message (str): message to be logged
+            category (str): stage the span belongs to, e.g. digitization, layout
+            profiler (Profiler): profiler to record to, defaults to PROFILER
+            args (dict): details of this span, e.g. the document, logged and
+                kept in the trace but not part of the stage aggregate
 
 
         """
         self.message = message
         self.logger = the_logger
+        self.category = category
+        self.profiler = profiler or PROFILER
+        self.args = args or {}
         self.start = 0
         self.duration = 0
         self.sub_timers = []
+        self.parent: Optional["timer"] = None
+        self.thread_id = threading.get_ident()
+        self.peak_memory: Optional[int] = None
+        self._peak = 0
+        self._memory_start = 0
+        self._token = None
+
+    @property
+    def description(self) -> str:
+        """Message with the span args, as logged"""
+        if not self.args:
+            return self.message
+        details = ", ".join(f"{key}={value}" for key, value in self.args.items())
+        return f"{self.message} ({details})"
+
+    @property
+    def self_duration(self) -> float:
+        """Time spent in this span outside of its sub timers"""
+        return self.duration - sum(sub.duration for sub in self.sub_timers)
+
+    def _start_memory_tracing(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.parent is not None:
+            self.parent._peak = max(self.parent._peak, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._memory_start = current
+        self._peak = current
+
+    def _stop_memory_tracing(self) -> None:
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        self.peak_memory = self._peak - self._memory_start
+        if self.parent is not None:
+            self.parent._peak = max(self.parent._peak, self._peak)
 
     def __enter__(self):
         """
         context enters to start to write this
         """
-        self.start = time.time()
-        self.logger.info("Starting %s" % self.message)
+        self.parent = _CURRENT_SPAN.get()
+        if self.parent is not None:
+            self.parent.sub_timers.append(self)
+        self._token = _CURRENT_SPAN.set(self)
+        self.thread_id = threading.get_ident()
+        if self.profiler.trace_memory and tracemalloc.is_tracing():
+            self._start_memory_tracing()
+        if self.logger is not None:
+            self.logger.info("Starting %s" % self.description)
+        self.start = time.perf_counter()
         return self
 
     def __exit__(self, context, value, traceback):
         """
         context exit will write this
         """
-        self.duration = time.time() - self.start
-        self.logger.info(f"Finished {self.message}, that took {self.duration:.3f}")
+        self.duration = time.perf_counter() - self.start
+        _CURRENT_SPAN.reset(self._token)
+        if self.profiler.trace_memory and tracemalloc.is_tracing():
+            self._stop_memory_tracing()
+        self.profiler.record(self)
+        if self.logger is not None:
+            self.logger.info(
+                f"Finished {self.description}, that took {self.duration:.3f}"
+            )
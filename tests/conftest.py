@@ -0,0 +1,27 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# the configuration is read on first use, point it at the example one so the
+# tests run without a local config.yml
+if "CONFIG_FILE" not in os.environ:
+    with open(PROJECT_ROOT / "config.example.yml") as f:
+        example_config = yaml.safe_load(f)
+    config_dir = Path(tempfile.mkdtemp(prefix="docs2kg-tests-"))
+    example_config["data"]["output_dir"] = str(config_dir / "output")
+    (config_dir / "config.yml").write_text(yaml.safe_dump(example_config))
+    os.environ["CONFIG_FILE"] = str(config_dir / "config.yml")
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Send the outputs of the test to its own temporary folder"""
+    from Docs2KG.utils.config import get_config
+
+    monkeypatch.setattr(get_config().data, "output_dir", tmp_path / "output")
+    return tmp_path / "output"
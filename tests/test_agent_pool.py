@@ -0,0 +1,196 @@
+from types import SimpleNamespace
+
+import pytest
+
+from Docs2KG.agents import pool as agent_pool
+from Docs2KG.agents.exceptions import NoHealthyBackend
+from Docs2KG.agents.manager import AgentManager
+from Docs2KG.agents.metrics import AgentMetrics
+from Docs2KG.agents.pool import AgentBackend, AgentPool
+from Docs2KG.benchmark.fakes import FakeLLMAgent
+
+
+class FlakyAgent(FakeLLMAgent):
+    """Fake agent at an api_base that fails while its server is down"""
+
+    down = set()
+
+    def __init__(self, name, api_base=None):
+        super().__init__(name)
+        self.api_base = api_base
+
+    def process(self, input_data):
+        if self.api_base in self.down:
+            raise ConnectionError(f"{self.api_base} is down")
+        result = super().process(input_data)
+        result["api_base"] = self.api_base
+        return result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic clock of the circuit breakers, advanced by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        agent_pool,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock.now, perf_counter=lambda: clock.now),
+    )
+    return clock
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    monkeypatch.setitem(AgentManager.AGENT_TYPES, "flaky", FlakyAgent)
+    monkeypatch.setattr(FlakyAgent, "down", set())
+    return FlakyAgent
+
+
+def make_pool(*api_bases, fallback=(), failure_threshold=2, recovery_timeout=30):
+    return AgentPool(
+        [
+            AgentBackend(
+                FlakyAgent("m", api_base),
+                "flaky",
+                fallback=api_base in fallback,
+                failure_threshold=failure_threshold,
+                recovery_timeout=recovery_timeout,
+            )
+            for api_base in api_bases
+        ]
+    )
+
+
+def send(pool, prompt="hello"):
+    return pool.process(lambda backend: backend.agent.process(prompt))["api_base"]
+
+
+def test_least_outstanding_routing(flaky, clock):
+    pool = make_pool("gpu-1", "gpu-2", "gpu-3")
+    routed = []
+
+    def call(backend):
+        routed.append(backend.agent.api_base)
+        # requests sent while this one is outstanding go to the idle backends
+        if len(routed) < 3:
+            pool.process(call)
+        return backend.agent.process("hello")
+
+    pool.process(call)
+
+    assert routed == ["gpu-1", "gpu-2", "gpu-3"]
+    assert [backend.outstanding for backend in pool.backends] == [0, 0, 0]
+    # ties go to the first backend once the others are idle again
+    assert send(pool) == "gpu-1"
+
+
+def test_circuit_breaker_transitions(flaky, clock):
+    pool = make_pool("gpu-1", "gpu-2", failure_threshold=2, recovery_timeout=30)
+    backend = pool.backends[0]
+    flaky.down.add("gpu-1")
+
+    # the first failure fails over to gpu-2 but leaves the circuit closed
+    assert send(pool) == "gpu-2"
+    assert backend.state == "closed"
+    assert send(pool) == "gpu-2"
+    assert backend.state == "open"
+    assert not backend.is_available()
+    assert send(pool) == "gpu-2"
+    assert backend.total_requests == 2
+
+    clock.now += 30
+    assert backend.state == "half-open"
+    assert backend.is_available()
+
+    # a failed trial opens the circuit again straight away
+    assert send(pool) == "gpu-2"
+    assert backend.total_requests == 3
+    assert backend.state == "open"
+
+    clock.now += 30
+    flaky.down.clear()
+    assert send(pool) == "gpu-1"
+    assert backend.state == "closed"
+    assert backend.consecutive_failures == 0
+
+
+def test_half_open_lets_a_single_trial_through(flaky, clock):
+    pool = make_pool("gpu-1", "gpu-2", failure_threshold=1)
+    backend = pool.backends[0]
+    flaky.down.add("gpu-1")
+    send(pool)
+    clock.now += 30
+    flaky.down.clear()
+    routed = []
+
+    def call(current):
+        routed.append(current.agent.api_base)
+        if len(routed) == 1:
+            # the trial is in flight, gpu-1 takes no other request
+            assert not backend.is_available()
+            routed.append(send(pool))
+        return current.agent.process("hello")
+
+    pool.process(call)
+
+    assert routed == ["gpu-1", "gpu-2"]
+    assert backend.state == "closed"
+
+
+def test_fallback_only_when_no_primary_is_available(flaky, clock):
+    # listed first, so only its fallback flag keeps it from winning the ties
+    pool = make_pool("cloud", "gpu-1", fallback=("cloud",), failure_threshold=1)
+
+    assert send(pool) == "gpu-1"
+    assert send(pool) == "gpu-1"
+    assert pool.backends[0].total_requests == 0
+
+    flaky.down.add("gpu-1")
+    assert send(pool) == "cloud"
+    assert send(pool) == "cloud"
+    assert pool.backends[1].state == "open"
+
+
+def test_no_healthy_backend(flaky, clock):
+    pool = make_pool("gpu-1", "gpu-2", failure_threshold=1)
+    flaky.down.update({"gpu-1", "gpu-2"})
+
+    with pytest.raises(NoHealthyBackend, match="m@gpu-1, flaky:m@gpu-2") as error:
+        send(pool)
+    assert isinstance(error.value.__cause__, ConnectionError)
+
+    # every circuit is open, nothing is tried
+    with pytest.raises(NoHealthyBackend, match="tried: none"):
+        send(pool)
+
+
+def test_agent_manager_routes_through_the_pool(flaky, clock):
+    metrics = AgentMetrics()
+    agent_manager = AgentManager(
+        "m",
+        "flaky",
+        backends=[
+            {"agent_name": "m", "agent_type": "flaky", "api_base": "gpu-1"},
+            {"agent_name": "m", "agent_type": "flaky", "api_base": "gpu-2"},
+            {
+                "agent_name": "m",
+                "agent_type": "flaky",
+                "api_base": "cloud",
+                "fallback": True,
+            },
+        ],
+        metrics=metrics,
+    )
+    flaky.down.add("gpu-1")
+
+    assert agent_manager.process_input("hello")["api_base"] == "gpu-2"
+    flaky.down.add("gpu-2")
+    assert agent_manager.process_input("hello")["api_base"] == "cloud"
+
+    stats = {stat["backend"]: stat for stat in agent_manager.get_backend_stats()}
+    assert stats["flaky:m@gpu-1"]["failures"] == 2
+    assert stats["flaky:m@gpu-2"]["failures"] == 1
+    assert stats["flaky:m@cloud"]["fallback"]
+    assert stats["flaky:m@cloud"]["requests"] == 1
+    backends = {row["backend"] for row in metrics.summary()["stages"]}
+    assert backends == {"flaky:m@gpu-1", "flaky:m@gpu-2", "flaky:m@cloud"}
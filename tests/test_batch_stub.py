@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from Docs2KG.agents.batch_stub import LocalBatchClient
+from Docs2KG.kg_construction.semantic_kg.ner.ner_prompt_based import (
+    NERLLMPromptExtractor,
+)
+from Docs2KG.utils.config import get_config
+
+
+@pytest.fixture
+def entity_types(tmp_path, monkeypatch):
+    """Entity list and ontology of the NER extractor"""
+    entity_list = tmp_path / "entity_list.csv"
+    entity_list.write_text("entity,entity_type\ngold,mineral\nperth,location\n")
+    ontology = tmp_path / "ontology.json"
+    ontology.write_text(
+        json.dumps(
+            {
+                "entity_types": ["mineral", "location"],
+                "relation_types": [],
+                "connections": [],
+            }
+        )
+    )
+    semantic_kg = get_config().semantic_kg
+    monkeypatch.setattr(semantic_kg, "entity_list", str(entity_list))
+    monkeypatch.setattr(semantic_kg, "ontology", str(ontology))
+
+
+def mention_responder(body):
+    """Answer with the entity list words the chunk contains"""
+    text = body["messages"][0]["content"].split("Text:\n")[-1]
+    entities = [
+        {"text": word, "label": label, "confidence": 1.0}
+        for word, label in (("gold", "mineral"), ("perth", "location"))
+        if word in text
+    ]
+    return json.dumps(entities)
+
+
+def test_batch_entities_merge_into_layout_kg(output_dir, entity_types, tmp_path):
+    layout_kg_path = tmp_path / "report.json"
+    layout_kg_path.write_text(
+        json.dumps(
+            {
+                "data": [
+                    {
+                        "id": "p1",
+                        "text": "Intro. Gold was found near Perth.",
+                        "entities": [],
+                    },
+                    {"id": "p2", "text": "Nothing here.", "entities": []},
+                ]
+            }
+        )
+    )
+    extractor = NERLLMPromptExtractor(
+        "batch",
+        agent_name="gpt-4o-mini",
+        agent_type="cloud",
+        client=LocalBatchClient(mention_responder),
+    )
+    agent = extractor.llm_ner_extract_agent.agent
+
+    manifest = extractor.write_batch_file([layout_kg_path], tmp_path / "batch.jsonl")
+    batch_id = agent.submit_batch(tmp_path / "batch.jsonl")
+    batch = agent.wait_for_batch(batch_id, poll_interval=0, timeout=5)
+    extractor.merge_batch_results(manifest, agent.fetch_batch_results(batch))
+
+    assert set(manifest) == {"p1-0", "p1-1", "p2-0"}
+    layout_kg = json.loads(layout_kg_path.read_text())
+    first, second = layout_kg["data"]
+    # positions count from the chunk offset recorded in the manifest
+    chunk = manifest["p1-1"]
+    assert sorted(
+        (entity["text"], entity["label"], entity["start"])
+        for entity in first["entities"]
+    ) == [
+        ("gold", "mineral", chunk["position"] + chunk["chunk"].lower().find("gold")),
+        (
+            "perth",
+            "location",
+            chunk["position"] + chunk["chunk"].lower().find("perth"),
+        ),
+    ]
+    assert all(
+        entity["method"] == "NERLLMPromptExtractor" for entity in first["entities"]
+    )
+    assert second["entities"] == []
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from ebooklib import epub
+
+from Docs2KG.digitization.native import ebook
+from Docs2KG.digitization.native.ebook import EPUBDigitization
+from Docs2KG.digitization.source import DocumentSource
+
+
+@pytest.fixture
+def path_only_reader(monkeypatch):
+    """read_epub as in ebooklib 0.18, which only opens paths"""
+    read_epub = epub.read_epub
+
+    def read_path(name, *args, **kwargs):
+        os.path.isdir(name)  # raises TypeError on file objects
+        return read_epub(name, *args, **kwargs)
+
+    monkeypatch.setattr(ebook.epub, "read_epub", read_path)
+
+
+@pytest.fixture
+def epub_path(tmp_path):
+    book = epub.EpubBook()
+    book.set_identifier("report-1")
+    book.set_title("Field Report")
+    book.set_language("en")
+    book.add_author("Survey Team")
+    chapter = epub.EpubHtml(title="Findings", file_name="findings.xhtml")
+    chapter.content = "<h1>Findings</h1><p>Gold was found near Perth.</p>"
+    book.add_item(chapter)
+    book.toc = [chapter]
+    book.spine = [chapter]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    path = tmp_path / "report.epub"
+    epub.write_epub(str(path), book)
+    return path
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_process_epub(output_dir, path_only_reader, epub_path, in_memory):
+    source = (
+        DocumentSource(epub_path.read_bytes(), name="report.epub")
+        if in_memory
+        else epub_path
+    )
+
+    result = EPUBDigitization(source).process()
+
+    markdown = result["markdown_path"].read_text()
+    assert "title: Field Report" in markdown
+    assert "Gold was found near Perth." in markdown
+    assert result["total_chapters"] >= 1
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Docs2KG.digitization.native.html_crawler import HTMLCrawler
+
+PAGE = b"<html><body><h1>Report</h1><p>Gold near Perth.</p></body></html>"
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class Site:
+    """Pages served by the fixture server and the requests it received"""
+
+    def __init__(self):
+        # path -> (body, etag, last_modified)
+        self.pages = {}
+        self.requests = []
+
+
+@pytest.fixture
+def site():
+    site = Site()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            site.requests.append((self.path, dict(self.headers)))
+            if self.path not in site.pages:
+                self.send_error(404)
+                return
+            body, etag, last_modified = site.pages[self.path]
+            if (etag and self.headers.get("If-None-Match") == etag) or (
+                last_modified and self.headers.get("If-Modified-Since") == last_modified
+            ):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            if last_modified:
+                self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    site.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield site
+    server.shutdown()
+    server.server_close()
+
+
+def conditional_headers(site, path):
+    """Validators sent with the last request of a path"""
+    headers = [headers for request, headers in site.requests if request == path][-1]
+    return headers.get("If-None-Match"), headers.get("If-Modified-Since")
+
+
+def test_revalidation(site, output_dir, tmp_path):
+    site.pages["/etag.html"] = (PAGE, '"v1"', None)
+    site.pages["/dated.html"] = (PAGE + b"<!-- dated -->", None, LAST_MODIFIED)
+    urls = [f"{site.url}/etag.html", f"{site.url}/dated.html"]
+    cache_dir = tmp_path / "cache"
+
+    first = HTMLCrawler(cache_dir).crawl(urls)
+    assert [result.status for result in first] == ["new", "new"]
+    assert all(result.markdown_path.exists() for result in first)
+    assert conditional_headers(site, "/etag.html") == (None, None)
+
+    # a new crawler reads the validators back from index.json
+    second = HTMLCrawler(cache_dir).crawl(urls)
+    assert [result.status for result in second] == ["unchanged", "unchanged"]
+    assert [result.markdown_path for result in second] == [None, None]
+    assert [result.sha256 for result in second] == [result.sha256 for result in first]
+    assert conditional_headers(site, "/etag.html") == ('"v1"', None)
+    assert conditional_headers(site, "/dated.html") == (None, LAST_MODIFIED)
+
+    site.pages["/etag.html"] = (PAGE + b"<p>Revised.</p>", '"v2"', None)
+    third = HTMLCrawler(cache_dir).crawl(urls, convert=False)
+    assert [result.status for result in third] == ["changed", "unchanged"]
+    assert third[0].sha256 == hashlib.sha256(site.pages["/etag.html"][0]).hexdigest()
+    assert third[0].html_path.read_bytes() == site.pages["/etag.html"][0]
+
+
+def test_identical_pages_share_a_blob(site, tmp_path):
+    site.pages["/a.html"] = (PAGE, None, None)
+    site.pages["/b.html"] = (PAGE, None, None)
+    crawler = HTMLCrawler(tmp_path / "cache")
+
+    results = crawler.crawl([f"{site.url}/a.html", f"{site.url}/b.html"], convert=False)
+
+    sha256 = hashlib.sha256(PAGE).hexdigest()
+    assert [result.sha256 for result in results] == [sha256, sha256]
+    assert results[0].html_path == results[1].html_path == crawler.blob_path(sha256)
+    assert list((tmp_path / "cache" / "html").rglob("*.html")) == [
+        crawler.blob_path(sha256)
+    ]
+
+
+def test_index_records_validators(site, tmp_path):
+    site.pages["/etag.html"] = (PAGE, '"v1"', LAST_MODIFIED)
+    site.pages["/plain.html"] = (PAGE + b"<p>Plain.</p>", None, None)
+    urls = [f"{site.url}/etag.html", f"{site.url}/plain.html", f"{site.url}/gone"]
+
+    results = HTMLCrawler(tmp_path / "cache").crawl(urls, convert=False)
+
+    assert results[2].status == "failed"
+    index = json.loads((tmp_path / "cache" / "index.json").read_text())
+    assert set(index) == set(urls[:2])
+    assert index[urls[0]]["sha256"] == hashlib.sha256(PAGE).hexdigest()
+    assert index[urls[0]]["etag"] == '"v1"'
+    assert index[urls[0]]["last_modified"] == LAST_MODIFIED
+    assert index[urls[1]]["etag"] is None
+    assert index[urls[1]]["last_modified"] is None
+    assert all(entry["fetched_at"] for entry in index.values())
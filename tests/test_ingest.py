@@ -0,0 +1,81 @@
+import io
+import tarfile
+import zipfile
+
+from Docs2KG.digitization.ingest import ARCHIVE_SEPARATOR, archive_kind, iter_documents
+from Docs2KG.digitization.source import DocumentSource
+
+HTML = b"<!DOCTYPE html><html><body><p>Annual report</p></body></html>"
+
+
+def make_zip(members, compression=zipfile.ZIP_STORED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def make_tar_gz(members) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_zip_of_stored_html_is_an_archive():
+    bundle = DocumentSource(make_zip({"page.html": HTML}), name="bundle.zip")
+
+    assert bundle.format != ".html"
+    assert archive_kind(bundle) == "zip"
+
+
+def test_docx_is_a_document():
+    docx = DocumentSource(
+        make_zip({"[Content_Types].xml": b"<Types/>", "word/document.xml": b"<w/>"}),
+        name="report.docx",
+    )
+
+    assert docx.format == ".docx"
+    assert archive_kind(docx) is None
+
+
+def test_text_mentioning_html_is_not_html():
+    readme = DocumentSource(
+        b"# Notes\n\nWrap the page in <html> tags.", name="readme.md"
+    )
+
+    assert readme.format != ".html"
+
+
+def test_iter_documents_reads_stored_html_and_nested_tar_gz(tmp_path):
+    nested = make_tar_gz({"reports/annual.html": HTML, "reports/notes.txt": b"notes"})
+    corpus = tmp_path / "corpus"
+    (corpus / "c").mkdir(parents=True)
+    (corpus / "c" / "bundle.zip").write_bytes(
+        make_zip({"site/index.html": HTML, "site/old.tar.gz": nested})
+    )
+    (corpus / "readme.md").write_text("Wrap the page in <html> tags.")
+
+    documents = list(iter_documents(corpus, recursive=True, formats={".html"}))
+
+    bundle = corpus / "c" / "bundle.zip"
+    assert [str(document) for document in documents] == [
+        f"{bundle}{ARCHIVE_SEPARATOR}site/index.html",
+        f"{bundle}{ARCHIVE_SEPARATOR}site/old.tar.gz"
+        f"{ARCHIVE_SEPARATOR}reports/annual.html",
+    ]
+    assert [document.name for document in documents] == ["index.html", "annual.html"]
+    assert all(document.read_bytes() == HTML for document in documents)
+
+
+def test_iter_documents_without_archives_skips_the_zip(tmp_path):
+    (tmp_path / "bundle.zip").write_bytes(make_zip({"page.html": HTML}))
+    (tmp_path / "page.html").write_bytes(HTML)
+
+    documents = list(iter_documents(tmp_path, archives=False, formats={".html"}))
+
+    assert [document.name for document in documents] == ["page.html"]
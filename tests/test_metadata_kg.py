@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+
+from Docs2KG.kg_construction.metadata_kg.metadata_kg import MetadataKGConstruction
+
+
+def read_ndjson(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_stream_and_construct_give_same_graph(output_dir, tmp_path):
+    # the empty year is past the sample, construct reads the column as float64
+    # and its ids as year_1990.0, the grade column has no empty cell
+    rows = 40
+    frame = pd.DataFrame(
+        {
+            "name": range(rows),
+            "year": [1990 + i % 3 for i in range(rows)],
+            "grade": [i % 4 for i in range(rows)],
+            "commodity": [["gold", "iron"][i % 2] for i in range(rows)],
+        }
+    )
+    frame["year"] = frame["year"].astype(object)
+    frame.loc[rows - 1, "year"] = None
+    csv_path = tmp_path / "metadata.csv"
+    frame.to_csv(csv_path, index=False)
+
+    construction = MetadataKGConstruction("metadata")
+    graph = construction.construct(csv_path)
+    stream = construction.construct_stream(csv_path, chunk_size=7, sample_rows=10)
+    streamed_nodes = read_ndjson(stream["nodes"])
+    streamed_relationships = read_ndjson(stream["relationships"])
+
+    assert {"year", "grade"} <= set(construction.categorical_columns)
+    assert {node["id"] for node in streamed_nodes} == {
+        node["id"] for node in graph["nodes"]
+    }
+    assert {"year_1990.0", "grade_1", "doc_0"} <= {
+        node["id"] for node in streamed_nodes
+    }
+    assert [
+        (relationship["source"], relationship["target"])
+        for relationship in streamed_relationships
+    ] == [
+        (relationship["source"], relationship["target"])
+        for relationship in graph["relationships"]
+    ]
+    # whole floats and integers compare equal, so this also checks the values
+    saved = json.loads((construction.project_folder / "metadata_kg.json").read_text())
+    assert saved["nodes"] == streamed_nodes
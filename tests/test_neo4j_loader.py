@@ -0,0 +1,257 @@
+import json
+import re
+from itertools import count
+
+import pytest
+
+from Docs2KG.benchmark.fakes import StubResult
+from Docs2KG.utils.neo4j_loader import Neo4jTransformer
+
+PROJECT_ID = "metadata"
+LABEL_PATTERN = re.compile(r":`((?:[^`]|``)*)`")
+
+
+class GraphSession:
+    """
+    In-memory stand-in for a Neo4j session that understands the queries of
+    the metadata load, so repeated loads can be compared with the graph.
+    """
+
+    def __init__(self):
+        # (label, id) -> properties
+        self.nodes = {}
+        # element id -> relationship
+        self.relationships = {}
+        self.writes = []
+        self.element_ids = count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return None
+
+    def close(self):
+        return None
+
+    def session(self, database=None):
+        return self
+
+    def run(self, query, parameters=None, **kwargs):
+        query = " ".join(query.split())
+        labels = [label.replace("``", "`") for label in LABEL_PATTERN.findall(query)]
+        if query.startswith(("CREATE INDEX", "MERGE (p:Project")):
+            return StubResult()
+        if "RETURN n.id AS id" in query:
+            return StubResult(
+                [
+                    {"id": node_id, "props": dict(self.nodes[(labels[0], node_id)])}
+                    for node_id in kwargs["ids"]
+                    if (labels[0], node_id) in self.nodes
+                ]
+            )
+        if "RETURN s.id AS source" in query:
+            return StubResult(
+                [
+                    {"element_id": element_id, **relationship}
+                    for element_id, relationship in self.relationships.items()
+                    if relationship["source_label"] == labels[0]
+                    and relationship["source"] in kwargs["ids"]
+                ]
+            )
+        self.writes.append(query)
+        if query.endswith("DELETE r"):
+            for element_id in kwargs["ids"]:
+                del self.relationships[element_id]
+        elif "SET n = row.props" in query:
+            for row in kwargs["rows"]:
+                self.nodes[(labels[0], row["id"])] = dict(row["props"])
+        elif "SET r.type = row.type" in query:
+            for row in kwargs["rows"]:
+                self._merge_relationship(labels[0], row)
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+        return StubResult()
+
+    def _merge_relationship(self, source_label, row):
+        for relationship in self.relationships.values():
+            if (relationship["source"], relationship["target"]) == (
+                row["source"],
+                row["target"],
+            ):
+                relationship["type"] = row["type"]
+                return
+        self.relationships[f"r{next(self.element_ids)}"] = {
+            "source_label": source_label,
+            "source": row["source"],
+            "target": row["target"],
+            "type": row["type"],
+        }
+
+    def graph_relationships(self):
+        return {
+            (relationship["source"], relationship["target"], relationship["type"])
+            for relationship in self.relationships.values()
+        }
+
+
+def write_metadata_kg(project_folder, documents):
+    """Write a metadata_kg.json with one commodity node per value"""
+    nodes, relationships = [], []
+    for document_id, properties, commodities in documents:
+        nodes.append({"id": document_id, "type": "document", "properties": properties})
+        for commodity in commodities:
+            relationships.append(
+                {"source": document_id, "target": commodity, "type": "HAS_COMMODITY"}
+            )
+    for commodity in sorted({c for _, _, values in documents for c in values}):
+        nodes.append({"id": commodity, "type": "commodity", "properties": {}})
+    (project_folder / "metadata_kg.json").write_text(
+        json.dumps({"nodes": nodes, "relationships": relationships})
+    )
+
+
+@pytest.fixture
+def project_folder(output_dir):
+    folder = output_dir / "projects" / PROJECT_ID
+    (folder / "layout").mkdir(parents=True)
+    (folder / "layout" / "schema.json").write_text("{}")
+    return folder
+
+
+def load(session, **kwargs):
+    transformer = Neo4jTransformer(
+        PROJECT_ID, "bolt://stub", "neo4j", "neo4j", driver=session, **kwargs
+    )
+    return transformer.load_metadata_kg(session)
+
+
+def test_load_inserts_nodes_and_relationships(project_folder):
+    write_metadata_kg(
+        project_folder,
+        [("doc_0", {"year": 1990}, ["gold", "iron"]), ("doc_1", {}, ["gold"])],
+    )
+    session = GraphSession()
+
+    stats = load(session)
+
+    assert stats["nodes_upserted"] == stats["nodes"] == 4
+    assert stats["relationships_merged"] == stats["relationships"] == 3
+    assert session.nodes[("document", "doc_0")] == {
+        "year": 1990,
+        "id": "doc_0",
+        "type": "document",
+        "project_id": PROJECT_ID,
+    }
+    assert ("commodity", "iron") in session.nodes
+    assert session.graph_relationships() == {
+        ("doc_0", "gold", "HAS_COMMODITY"),
+        ("doc_0", "iron", "HAS_COMMODITY"),
+        ("doc_1", "gold", "HAS_COMMODITY"),
+    }
+
+
+def test_reload_without_changes_writes_nothing(project_folder):
+    write_metadata_kg(
+        project_folder,
+        [("doc_0", {"year": 1990}, ["gold", "iron"]), ("doc_1", {}, ["gold"])],
+    )
+    session = GraphSession()
+    load(session)
+    session.writes.clear()
+
+    stats = load(session)
+
+    assert session.writes == []
+    assert stats["nodes_unchanged"] == 4
+    assert stats["relationships_unchanged"] == 3
+    assert stats["nodes_upserted"] == stats["relationships_merged"] == 0
+    assert stats["relationships_deleted"] == 0
+
+
+def test_reload_updates_properties_and_removes_stale_relationships(project_folder):
+    write_metadata_kg(
+        project_folder,
+        [
+            ("doc_0", {"year": 1990, "grade": 2}, ["gold", "iron"]),
+            ("doc_1", {}, ["gold"]),
+        ],
+    )
+    session = GraphSession()
+    load(session)
+
+    # doc_0 loses its grade and its iron, doc_1 is left as it was
+    write_metadata_kg(
+        project_folder,
+        [("doc_0", {"year": 1991}, ["gold"]), ("doc_1", {}, ["gold"])],
+    )
+    stats = load(session)
+
+    assert session.nodes[("document", "doc_0")] == {
+        "year": 1991,
+        "id": "doc_0",
+        "type": "document",
+        "project_id": PROJECT_ID,
+    }
+    assert stats["nodes_upserted"] == 1
+    assert stats["relationships_deleted"] == 1
+    assert stats["relationships_merged"] == 0
+    assert session.graph_relationships() == {
+        ("doc_0", "gold", "HAS_COMMODITY"),
+        ("doc_1", "gold", "HAS_COMMODITY"),
+    }
+
+
+def test_sync_updates_types_and_drops_duplicates(project_folder):
+    write_metadata_kg(project_folder, [("doc_0", {}, ["gold"])])
+    session = GraphSession()
+    load(session)
+    # a duplicate left by an earlier load, with an outdated type
+    session.relationships["duplicate"] = {
+        "source_label": "document",
+        "source": "doc_0",
+        "target": "gold",
+        "type": "HAS_COMMODITY",
+    }
+    for relationship in session.relationships.values():
+        relationship["type"] = "RELATES_TO"
+    transformer = Neo4jTransformer(
+        PROJECT_ID, "bolt://stub", "neo4j", "neo4j", driver=session
+    )
+    stats = {
+        "relationships_merged": 0,
+        "relationships_unchanged": 0,
+        "relationships_deleted": 0,
+        "relationships_skipped": 0,
+    }
+
+    transformer._sync_metadata_relationships(
+        session,
+        {"doc_0": {"gold": "HAS_COMMODITY", "silver": "HAS_COMMODITY"}},
+        {"doc_0": "document", "gold": "commodity"},
+        set(),
+        stats,
+    )
+
+    assert stats == {
+        "relationships_merged": 1,
+        "relationships_unchanged": 0,
+        "relationships_deleted": 1,
+        "relationships_skipped": 1,
+    }
+    assert session.graph_relationships() == {("doc_0", "gold", "HAS_COMMODITY")}
+
+
+def test_batches_keep_relationships_of_earlier_documents(project_folder):
+    documents = [(f"doc_{i}", {"index": i}, ["gold", "iron"]) for i in range(5)]
+    write_metadata_kg(project_folder, documents)
+    session = GraphSession()
+
+    stats = load(session, metadata_batch_size=2)
+    again = load(session, metadata_batch_size=2)
+
+    assert stats["nodes_upserted"] == 7
+    assert stats["relationships_merged"] == 10
+    assert len(session.relationships) == 10
+    assert again["relationships_unchanged"] == 10
+    assert again["relationships_deleted"] == 0
@@ -0,0 +1,23 @@
+from Docs2KG.agents.metrics import AgentMetrics
+from Docs2KG.agents.ollama import OllamaAgent
+
+
+def test_prompt_cache_hit_from_evaluated_tokens():
+    # 12 prompt tokens and 3 response tokens in the context
+    context = list(range(15))
+    cached = {"context": context, "eval_count": 3, "prompt_eval_count": 4}
+    evaluated = {"context": context, "eval_count": 3, "prompt_eval_count": 12}
+
+    assert OllamaAgent.prompt_cache_hit(cached) is True
+    assert OllamaAgent.prompt_cache_hit(evaluated) is False
+    assert OllamaAgent.prompt_cache_hit({"prompt_eval_count": 4}) is None
+    assert OllamaAgent.prompt_cache_hit({"context": context, "eval_count": 3}) is None
+
+
+def test_unknown_cache_hit_is_not_counted():
+    metrics = AgentMetrics()
+    metrics.record("ner", "ollama:phi3.5", 0.1, cache_hit=None)
+    metrics.record("ner", "ollama:phi3.5", 0.1, cache_hit=True)
+    metrics.record("ner", "ollama:phi3.5", 0.1, cache_hit=False)
+
+    assert metrics.summary()["totals"]["cache_hits"] == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from Docs2KG.agents.manager import AgentManager
+from Docs2KG.benchmark.fakes import FakeLLMAgent
+from Docs2KG.benchmark.prefix_cache import (
+    benchmark_prefix_cache,
+    format_prefix_cache_table,
+)
+
+
+class CachingAgent(FakeLLMAgent):
+    """Fake agent counting the prefixes it is asked to cache"""
+
+    warm_calls = []
+
+    def __init__(self, name, api_base=None):
+        super().__init__(name)
+        self.api_base = api_base
+
+    def cache_prefix(self, prefix):
+        self.warm_calls.append((self.api_base, prefix))
+        return True
+
+
+@pytest.fixture
+def caching_agent(monkeypatch):
+    monkeypatch.setitem(AgentManager.AGENT_TYPES, "caching", CachingAgent)
+    monkeypatch.setattr(AgentManager, "_server_prefixes", {})
+    monkeypatch.setattr(CachingAgent, "warm_calls", [])
+    return CachingAgent
+
+
+def test_prefix_is_cached_once_per_server(caching_agent):
+    for _ in range(3):
+        assert AgentManager("m", "caching", api_base="http://gpu-1").cache_prefix("p")
+    AgentManager("m", "caching", api_base="http://gpu-2").cache_prefix("p")
+    AgentManager("m", "caching", api_base="http://gpu-1").cache_prefix("q")
+
+    assert caching_agent.warm_calls == [
+        ("http://gpu-1", "p"),
+        ("http://gpu-2", "p"),
+        ("http://gpu-1", "q"),
+    ]
+
+
+def test_local_agent_caches_its_own_prefixes(caching_agent):
+    first = AgentManager("m", "caching")
+    first.cache_prefix("p")
+    first.cache_prefix("p")
+    AgentManager("m", "caching").cache_prefix("p")
+
+    assert caching_agent.warm_calls == [(None, "p"), (None, "p")]
+
+
+def test_prefix_cache_benchmark(caching_agent):
+    report = benchmark_prefix_cache("m", "caching", samples=5)
+
+    assert report["samples"] == 5
+    assert report["static_last"]["median"] is not None
+    assert report["static_first_cached"]["median"] is not None
+    assert caching_agent.warm_calls and caching_agent.warm_calls[0][0] is None
+    assert "median saving" in format_prefix_cache_table(report)
@@ -0,0 +1,68 @@
+from Docs2KG.digitization.base import DigitizationBase
+from Docs2KG.digitization.store import OutputStore, digitize, processor_key
+
+
+class CopyDigitization(DigitizationBase):
+    """Digitizer writing the document text as its markdown"""
+
+    def __init__(self, file_path, text_layer: bool = False):
+        super().__init__(file_path=file_path, supported_formats=["txt"])
+        self.text_layer = text_layer
+        self.conversions = 0
+
+    def process(self):
+        self.conversions += 1
+        return self.export_content_to_markdown_file(
+            self.input_source.read_bytes().decode()
+        )
+
+
+def test_edited_document_keeps_its_name(output_dir, tmp_path):
+    store = OutputStore(tmp_path / "store")
+    page = tmp_path / "page.txt"
+    page.write_text("first version")
+    digitize(page, CopyDigitization, store)
+
+    page.write_text("second version")
+    processor, markdown_path = digitize(page, CopyDigitization, store)
+
+    assert processor.filename == "page"
+    assert processor.conversions == 1
+    assert markdown_path.read_text() == "second version"
+    assert list(store.index["names"]) == ["page"]
+
+
+def test_other_document_with_the_same_stem_gets_a_suffixed_name(output_dir, tmp_path):
+    store = OutputStore(tmp_path / "store")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "page.txt").write_text("one page")
+    (tmp_path / "b" / "page.txt").write_text("another page")
+
+    first, _ = digitize(tmp_path / "a" / "page.txt", CopyDigitization, store)
+    second, _ = digitize(tmp_path / "b" / "page.txt", CopyDigitization, store)
+    again, _ = digitize(tmp_path / "a" / "page.txt", CopyDigitization, store)
+
+    assert first.filename == again.filename == "page"
+    assert second.filename.startswith("page-")
+    assert again.conversions == 0
+
+
+def test_reverted_content_is_converted_again(output_dir, tmp_path):
+    store = OutputStore(tmp_path / "store")
+    page = tmp_path / "page.txt"
+    for text in ("first version", "second version", "first version"):
+        page.write_text(text)
+        processor, markdown_path = digitize(page, CopyDigitization, store)
+
+    assert processor.conversions == 1
+    assert markdown_path.read_text() == "first version"
+
+
+def test_processor_key_includes_the_text_layer_setting(tmp_path):
+    page = tmp_path / "page.txt"
+    page.write_text("text")
+
+    assert processor_key(CopyDigitization(page, text_layer=True)) != processor_key(
+        CopyDigitization(page, text_layer=False)
+    )